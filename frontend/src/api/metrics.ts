@@ -1,7 +1,9 @@
 // src/api/metrics.ts
 import axios from 'axios';
+import Cookies from 'js-cookie';
 
 const API_BASE_URL = 'http://localhost:8000/api/v1/monitoring';
+const STREAM_BASE_URL = API_BASE_URL.replace(/^http/, 'ws');
 
 export interface Metrics {
   id: number;
@@ -15,6 +17,12 @@ export interface Metrics {
   timestamp: string;
 }
 
+interface StreamMessage {
+  type: 'samples' | 'error';
+  samples?: Metrics[];
+  dropped?: number;
+}
+
 export const metricsApi = {
   getMetrics: async (resourceId: string): Promise<Metrics[]> => {
     try {
@@ -39,5 +47,40 @@ export const metricsApi = {
   createMetrics: async (metrics: Omit<Metrics, 'id' | 'timestamp'>): Promise<Metrics> => {
     const response = await axios.post(`${API_BASE_URL}/metrics/`, metrics);
     return response.data;
+  },
+
+  // Pushes new samples for the given resources as they are ingested. Uses a
+  // WebSocket and falls back to server-sent events if it cannot connect.
+  // Returns a function that closes the stream.
+  subscribe: (resourceIds: string[], onSamples: (samples: Metrics[]) => void): (() => void) => {
+    const params = new URLSearchParams();
+    params.set('token', Cookies.get('token') ?? '');
+    resourceIds.forEach((id) => params.append('resource_id', id));
+
+    const handle = (raw: string) => {
+      const message: StreamMessage = JSON.parse(raw);
+      if (message.type === 'samples' && message.samples?.length) {
+        onSamples(message.samples);
+      }
+    };
+
+    let closed = false;
+    let events: EventSource | null = null;
+    const socket = new WebSocket(`${STREAM_BASE_URL}/stream?${params}`);
+    let opened = false;
+    socket.onopen = () => { opened = true; };
+    socket.onmessage = (event) => handle(event.data);
+    socket.onclose = () => {
+      if (!opened && !closed) {
+        events = new EventSource(`${API_BASE_URL}/stream/sse?${params}`);
+        events.addEventListener('samples', (event) => handle((event as MessageEvent).data));
+      }
+    };
+
+    return () => {
+      closed = true;
+      socket.close();
+      events?.close();
+    };
   }
-};
\ No newline at end of file
+};
@@ -33,8 +33,17 @@ export function UserManagement() {
   const { data: users, isLoading } = useQuery<User[]>({
     queryKey: ['users'],
     queryFn: async () => {
-      const response = await api.get('/auth/users');
-      return response.data;
+      // The endpoint is keyset-paginated; follow next_cursor to the end
+      const users: User[] = [];
+      let cursor: string | null = null;
+      do {
+        const response = await api.get('/auth/users', {
+          params: { limit: 500, ...(cursor ? { cursor } : {}) },
+        });
+        users.push(...response.data.items);
+        cursor = response.data.next_cursor;
+      } while (cursor);
+      return users;
     },
   });
 
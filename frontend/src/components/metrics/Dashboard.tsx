@@ -2,8 +2,8 @@
 "use client";
 
 import { useState, useEffect } from 'react';
-import { useQuery } from '@tanstack/react-query';
-import { metricsApi } from '@/api/metrics';
+import { useQuery, useQueryClient } from '@tanstack/react-query';
+import { metricsApi, Metrics } from '@/api/metrics';
 import { MetricsChart } from './MetricsChart';
 import { NetworkMetrics } from './NetworkMetrics';
 import { ProgressCircle } from './ProgressCircle';
@@ -15,12 +15,23 @@ import { checkThresholds, Alert, playAlertSound } from '@/utils/alerts';
 
 export function Dashboard() {
   const [alertHistory, setAlertHistory] = useState<Alert[]>([]);
+  const queryClient = useQueryClient();
+  // History is loaded once; new samples arrive over the live stream
   const { data, isLoading, error } = useQuery({
     queryKey: ['metrics', 'test-server-1'],
     queryFn: () => metricsApi.getMetrics('test-server-1'),
-    refetchInterval: 5000,
+    staleTime: Infinity,
   });
 
+  useEffect(() => {
+    return metricsApi.subscribe(['test-server-1'], (samples) => {
+      queryClient.setQueryData<Metrics[]>(['metrics', 'test-server-1'], (previous = []) => {
+        const newest = [...samples].sort((a, b) => b.timestamp.localeCompare(a.timestamp));
+        return [...newest, ...previous].slice(0, Math.max(previous.length, 100));
+      });
+    });
+  }, [queryClient]);
+
   useEffect(() => {
     if (data?.[0]) {
       const latestMetrics = data[0];
@@ -24,8 +24,10 @@ export function MetricsChart({ data }: MetricsChartProps) {
             contentStyle={{ backgroundColor: 'rgb(30, 41, 59)', border: 'none' }}
           />
           <Legend />
+          {/* Samples are change points under adaptive collection: each value
+              holds until the next (newer) sample, and data is newest first */}
           <Line
-            type="monotone"
+            type="stepBefore"
             dataKey="cpu_usage"
             stroke="#8884d8"
             name="CPU Usage %"
@@ -33,7 +35,7 @@ export function MetricsChart({ data }: MetricsChartProps) {
             dot={false}
           />
           <Line
-            type="monotone"
+            type="stepBefore"
             dataKey="memory_usage"
             stroke="#82ca9d"
             name="Memory Usage %"
@@ -41,7 +43,7 @@ export function MetricsChart({ data }: MetricsChartProps) {
             dot={false}
           />
           <Line
-            type="monotone"
+            type="stepBefore"
             dataKey="disk_usage"
             stroke="#ffc658"
             name="Disk Usage %"
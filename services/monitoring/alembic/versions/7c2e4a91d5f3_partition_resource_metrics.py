@@ -0,0 +1,184 @@
+"""partition resource_metrics by time
+
+Converts resource_metrics into a TimescaleDB hypertable with native
+compression and a retention policy. When the timescaledb extension is not
+available, falls back to declarative monthly range partitioning maintained
+by resource_metrics_maintain_partitions().
+
+Revision ID: 7c2e4a91d5f3
+Revises: 0b3c0f119988
+Create Date: 2026-10-18 10:12:41.514203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e4a91d5f3'
+down_revision: Union[str, None] = '0b3c0f119988'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Creates the monthly partitions covering [now - 1 month, now + premake months)
+# and drops partitions whose whole range is older than the retention window.
+MAINTAIN_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION resource_metrics_maintain_partitions(
+    retention interval,
+    premake integer DEFAULT 3
+) RETURNS void AS $$
+DECLARE
+    month_start date;
+    partition record;
+BEGIN
+    FOR i IN -1..premake LOOP
+        month_start := date_trunc('month', now())::date + make_interval(months => i);
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF resource_metrics FOR VALUES FROM (%L) TO (%L)',
+            'resource_metrics_' || to_char(month_start, 'YYYY_MM'),
+            month_start,
+            month_start + interval '1 month'
+        );
+    END LOOP;
+
+    FOR partition IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'resource_metrics'::regclass
+          AND c.relname ~ '^resource_metrics_[0-9]{4}_[0-9]{2}$'
+    LOOP
+        IF to_date(right(partition.relname, 7), 'YYYY_MM') + interval '1 month' < now() - retention THEN
+            EXECUTE format('DROP TABLE %I', partition.relname);
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def _timescale_available() -> bool:
+    return op.get_bind().execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'timescaledb')"
+    )).scalar()
+
+
+def _upgrade_timescale() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS timescaledb")
+    op.execute(
+        "SELECT create_hypertable('resource_metrics', 'timestamp', "
+        f"chunk_time_interval => INTERVAL '{settings.METRICS_CHUNK_INTERVAL_DAYS} days', "
+        "migrate_data => true, if_not_exists => true)"
+    )
+    op.execute(
+        "ALTER TABLE resource_metrics SET ("
+        "timescaledb.compress, "
+        "timescaledb.compress_segmentby = 'resource_id', "
+        "timescaledb.compress_orderby = 'timestamp DESC')"
+    )
+    op.execute(
+        "SELECT add_compression_policy('resource_metrics', "
+        f"INTERVAL '{settings.METRICS_COMPRESS_AFTER_DAYS} days', if_not_exists => true)"
+    )
+    op.execute(
+        "SELECT add_retention_policy('resource_metrics', "
+        f"INTERVAL '{settings.METRICS_RETENTION_DAYS} days', if_not_exists => true)"
+    )
+
+
+def _upgrade_partitioned() -> None:
+    op.execute("ALTER TABLE resource_metrics RENAME TO resource_metrics_legacy")
+    op.execute("ALTER INDEX resource_metrics_pkey RENAME TO resource_metrics_legacy_pkey")
+    op.execute(
+        "CREATE TABLE resource_metrics (LIKE resource_metrics_legacy INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (timestamp)"
+    )
+    op.create_primary_key('resource_metrics_pkey', 'resource_metrics', ['id', 'timestamp'])
+    # Keep the id sequence alive once the legacy table is dropped
+    op.execute("ALTER SEQUENCE resource_metrics_id_seq OWNED BY resource_metrics.id")
+    op.execute("CREATE TABLE resource_metrics_default PARTITION OF resource_metrics DEFAULT")
+    op.execute(MAINTAIN_PARTITIONS_FUNCTION)
+
+    # Partitions for the months already holding data, then the rolling window
+    op.execute("""
+        DO $$
+        DECLARE
+            month_start date;
+        BEGIN
+            FOR month_start IN
+                SELECT DISTINCT date_trunc('month', timestamp)::date FROM resource_metrics_legacy
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF resource_metrics FOR VALUES FROM (%L) TO (%L)',
+                    'resource_metrics_' || to_char(month_start, 'YYYY_MM'),
+                    month_start,
+                    month_start + interval '1 month'
+                );
+            END LOOP;
+        END $$;
+    """)
+    op.execute("INSERT INTO resource_metrics SELECT * FROM resource_metrics_legacy")
+    op.drop_table('resource_metrics_legacy')
+    op.execute(
+        f"SELECT resource_metrics_maintain_partitions(INTERVAL '{settings.METRICS_RETENTION_DAYS} days')"
+    )
+
+
+def upgrade() -> None:
+    # Unique constraints on a partitioned table must include the partition key
+    op.drop_constraint('resource_metrics_pkey', 'resource_metrics', type_='primary')
+    op.create_primary_key('resource_metrics_pkey', 'resource_metrics', ['id', 'timestamp'])
+
+    if _timescale_available():
+        _upgrade_timescale()
+    else:
+        _upgrade_partitioned()
+
+    # (resource_id, timestamp DESC) serves every range read; it supersedes the
+    # resource_id-only index
+    op.drop_index('ix_resource_metrics_resource_id', table_name='resource_metrics', if_exists=True)
+    op.create_index(
+        'ix_resource_metrics_resource_id_timestamp',
+        'resource_metrics',
+        ['resource_id', sa.text('timestamp DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    # Rebuild a plain heap table; works for both the hypertable and the
+    # partitioned layout
+    op.create_table(
+        'resource_metrics_plain',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('resource_id', sa.String(), nullable=False),
+        sa.Column('resource_type', sa.String(), nullable=False),
+        sa.Column('cpu_usage', sa.Float(), nullable=True),
+        sa.Column('memory_usage', sa.Float(), nullable=True),
+        sa.Column('disk_usage', sa.Float(), nullable=True),
+        sa.Column('network_in', sa.Float(), nullable=True),
+        sa.Column('network_out', sa.Float(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    op.execute("""
+        INSERT INTO resource_metrics_plain
+            (id, resource_id, resource_type, cpu_usage, memory_usage, disk_usage,
+             network_in, network_out, timestamp)
+        SELECT id, resource_id, resource_type, cpu_usage, memory_usage, disk_usage,
+               network_in, network_out, timestamp
+        FROM resource_metrics
+    """)
+    op.execute("ALTER SEQUENCE resource_metrics_id_seq OWNED BY resource_metrics_plain.id")
+    op.execute(
+        "ALTER TABLE resource_metrics_plain "
+        "ALTER COLUMN id SET DEFAULT nextval('resource_metrics_id_seq')"
+    )
+    op.drop_table('resource_metrics')
+    op.execute("DROP FUNCTION IF EXISTS resource_metrics_maintain_partitions(interval, integer)")
+    op.rename_table('resource_metrics_plain', 'resource_metrics')
+    op.create_primary_key('resource_metrics_pkey', 'resource_metrics', ['id'])
+    op.create_index(op.f('ix_resource_metrics_resource_id'), 'resource_metrics', ['resource_id'], unique=False)
@@ -0,0 +1,100 @@
+"""add per-column sample counts to the metric rollups
+
+Sub-resource rows leave the columns that do not apply to them empty, so a
+rollup average can be over fewer samples than the bucket's sample_count.
+Adds <metric>_count (non-null samples) to resource_metrics_1m, _1h and _1d
+so averages are weighted by their own counts when buckets are merged and
+read.
+
+Plain tables get the columns backfilled from sample_count, which is exact
+for rows written before metric columns became optional. Continuous
+aggregates cannot gain columns, so on TimescaleDB they are recreated from
+resource_metrics; buckets whose raw chunks the retention policy has already
+dropped are not rebuilt.
+
+Revision ID: a6c3f0d2b8e4
+Revises: e4b7a2c9d1f6
+Create Date: 2026-10-18 17:41:09.652310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c3f0d2b8e4'
+down_revision: Union[str, None] = 'e4b7a2c9d1f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRICS = ('cpu_usage', 'memory_usage', 'disk_usage', 'network_in', 'network_out')
+
+# name -> (bucket width, refresh start_offset, end_offset, schedule_interval)
+ROLLUPS = {
+    'resource_metrics_1m': ('1 minute', '1 hour', '1 minute', '1 minute'),
+    'resource_metrics_1h': ('1 hour', '1 day', '1 hour', '30 minutes'),
+    'resource_metrics_1d': ('1 day', '7 days', '1 day', '1 hour'),
+}
+
+
+def _timescale_installed() -> bool:
+    return op.get_bind().execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')"
+    )).scalar()
+
+
+def _aggregate_columns(with_counts: bool) -> str:
+    return ",\n".join(
+        f"avg({m}) AS {m}_avg, min({m}) AS {m}_min, max({m}) AS {m}_max"
+        + (f", count({m}) AS {m}_count" if with_counts else "")
+        for m in METRICS
+    )
+
+
+def _recreate_continuous_aggregates(with_counts: bool) -> None:
+    # Materializing existing data cannot happen inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, (width, start_offset, end_offset, schedule) in ROLLUPS.items():
+            op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {name}")
+            op.execute(f"""
+                CREATE MATERIALIZED VIEW {name}
+                WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+                SELECT time_bucket(INTERVAL '{width}', timestamp) AS bucket,
+                       resource_id,
+                       count(*) AS sample_count,
+                       {_aggregate_columns(with_counts)}
+                FROM resource_metrics
+                GROUP BY bucket, resource_id
+                WITH DATA
+            """)
+            op.execute(f"CREATE INDEX ix_{name}_resource_id_bucket ON {name} (resource_id, bucket DESC)")
+            op.execute(
+                f"SELECT add_continuous_aggregate_policy('{name}', "
+                f"start_offset => INTERVAL '{start_offset}', "
+                f"end_offset => INTERVAL '{end_offset}', "
+                f"schedule_interval => INTERVAL '{schedule}')"
+            )
+
+
+def upgrade() -> None:
+    if _timescale_installed():
+        _recreate_continuous_aggregates(with_counts=True)
+        return
+    for name in ROLLUPS:
+        for m in METRICS:
+            op.add_column(name, sa.Column(f'{m}_count', sa.BigInteger(), nullable=False, server_default='0'))
+        op.execute(
+            f"UPDATE {name} SET "
+            + ", ".join(f"{m}_count = CASE WHEN {m}_avg IS NULL THEN 0 ELSE sample_count END" for m in METRICS)
+        )
+
+
+def downgrade() -> None:
+    if _timescale_installed():
+        _recreate_continuous_aggregates(with_counts=False)
+        return
+    for name in ROLLUPS:
+        for m in METRICS:
+            op.drop_column(name, f'{m}_count')
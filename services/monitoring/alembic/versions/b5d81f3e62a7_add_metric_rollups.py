@@ -0,0 +1,113 @@
+"""add 1m/1h/1d metric rollups
+
+Creates resource_metrics_1m, resource_metrics_1h and resource_metrics_1d
+with avg/min/max/count per metric column. On TimescaleDB these are
+real-time continuous aggregates with refresh policies; otherwise they are
+plain tables maintained incrementally by the application's RollupWorker.
+
+Revision ID: b5d81f3e62a7
+Revises: 7c2e4a91d5f3
+Create Date: 2026-10-18 11:03:27.208945
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d81f3e62a7'
+down_revision: Union[str, None] = '7c2e4a91d5f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRICS = ('cpu_usage', 'memory_usage', 'disk_usage', 'network_in', 'network_out')
+
+# name -> (bucket width, refresh start_offset, end_offset, schedule_interval)
+ROLLUPS = {
+    'resource_metrics_1m': ('1 minute', '1 hour', '1 minute', '1 minute'),
+    'resource_metrics_1h': ('1 hour', '1 day', '1 hour', '30 minutes'),
+    'resource_metrics_1d': ('1 day', '7 days', '1 day', '1 hour'),
+}
+
+
+def _timescale_installed() -> bool:
+    return op.get_bind().execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')"
+    )).scalar()
+
+
+def _aggregate_columns() -> str:
+    return ",\n".join(
+        f"avg({m}) AS {m}_avg, min({m}) AS {m}_min, max({m}) AS {m}_max"
+        for m in METRICS
+    )
+
+
+def _upgrade_continuous_aggregates() -> None:
+    # Materializing existing data cannot happen inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, (width, start_offset, end_offset, schedule) in ROLLUPS.items():
+            op.execute(f"""
+                CREATE MATERIALIZED VIEW {name}
+                WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+                SELECT time_bucket(INTERVAL '{width}', timestamp) AS bucket,
+                       resource_id,
+                       count(*) AS sample_count,
+                       {_aggregate_columns()}
+                FROM resource_metrics
+                GROUP BY bucket, resource_id
+                WITH DATA
+            """)
+            op.execute(f"CREATE INDEX ix_{name}_resource_id_bucket ON {name} (resource_id, bucket DESC)")
+            op.execute(
+                f"SELECT add_continuous_aggregate_policy('{name}', "
+                f"start_offset => INTERVAL '{start_offset}', "
+                f"end_offset => INTERVAL '{end_offset}', "
+                f"schedule_interval => INTERVAL '{schedule}')"
+            )
+
+
+def _upgrade_tables() -> None:
+    for name, (width, *_) in ROLLUPS.items():
+        op.create_table(
+            name,
+            sa.Column('resource_id', sa.String(), nullable=False),
+            sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('sample_count', sa.BigInteger(), nullable=False),
+            *(
+                sa.Column(f'{m}_{agg}', sa.Float(), nullable=True)
+                for m in METRICS
+                for agg in ('avg', 'min', 'max')
+            ),
+            sa.PrimaryKeyConstraint('resource_id', 'bucket')
+        )
+        # Backfill from whatever raw data already exists
+        seconds = {'1 minute': 60, '1 hour': 3600, '1 day': 86400}[width]
+        op.execute(f"""
+            INSERT INTO {name}
+            SELECT resource_id,
+                   to_timestamp(floor(extract(epoch FROM timestamp) / {seconds}) * {seconds}) AS bucket,
+                   count(*),
+                   {_aggregate_columns()}
+            FROM resource_metrics
+            GROUP BY 1, 2
+        """)
+
+
+def upgrade() -> None:
+    if _timescale_installed():
+        _upgrade_continuous_aggregates()
+    else:
+        _upgrade_tables()
+
+
+def downgrade() -> None:
+    if _timescale_installed():
+        with op.get_context().autocommit_block():
+            for name in ROLLUPS:
+                op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {name}")
+    else:
+        for name in ROLLUPS:
+            op.drop_table(name)
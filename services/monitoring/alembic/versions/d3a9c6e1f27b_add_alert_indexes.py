@@ -0,0 +1,49 @@
+"""add alert listing indexes
+
+Replaces the resource_id-only index on alerts with indexes matching the
+keyset-paginated listings, which order by (timestamp, id): a composite
+(resource_id, timestamp, id) index, a partial index over unresolved
+alerts and a plain (timestamp, id) index.
+
+Revision ID: d3a9c6e1f27b
+Revises: b5d81f3e62a7
+Create Date: 2026-10-18 13:41:09.662871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a9c6e1f27b'
+down_revision: Union[str, None] = 'b5d81f3e62a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_alerts_resource_id_timestamp_id',
+        'alerts',
+        ['resource_id', 'timestamp', 'id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_alerts_open_timestamp_id',
+        'alerts',
+        ['timestamp', 'id'],
+        unique=False,
+        postgresql_where=sa.text('resolved IS NULL')
+    )
+    op.create_index('ix_alerts_timestamp_id', 'alerts', ['timestamp', 'id'], unique=False)
+    # Prefix of the composite index above
+    op.drop_index('ix_alerts_resource_id', table_name='alerts')
+
+
+def downgrade() -> None:
+    op.create_index('ix_alerts_resource_id', 'alerts', ['resource_id'], unique=False)
+    op.drop_index('ix_alerts_timestamp_id', table_name='alerts')
+    op.drop_index('ix_alerts_open_timestamp_id', table_name='alerts')
+    op.drop_index('ix_alerts_resource_id_timestamp_id', table_name='alerts')
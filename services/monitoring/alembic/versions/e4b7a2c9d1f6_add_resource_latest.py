@@ -0,0 +1,48 @@
+"""add resource_latest last-value table
+
+One row per resource holding its newest sample, upserted by the
+application every few seconds. Backs the "latest for all resources" read
+and the latest read for resources the serving worker has not seen itself,
+without scanning resource_metrics.
+
+Revision ID: e4b7a2c9d1f6
+Revises: d3a9c6e1f27b
+Create Date: 2026-10-18 14:58:12.406318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7a2c9d1f6'
+down_revision: Union[str, None] = 'd3a9c6e1f27b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRICS = ('cpu_usage', 'memory_usage', 'disk_usage', 'network_in', 'network_out')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'resource_latest',
+        sa.Column('resource_id', sa.String(), nullable=False),
+        sa.Column('resource_type', sa.String(), nullable=False),
+        *(sa.Column(m, sa.Float(), nullable=True) for m in METRICS),
+        sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('resource_id'),
+    )
+    # Seed from existing samples so reads work before the first upsert
+    op.execute(f"""
+        INSERT INTO resource_latest (resource_id, resource_type, {', '.join(METRICS)}, timestamp)
+        SELECT DISTINCT ON (resource_id) resource_id, resource_type, {', '.join(METRICS)}, timestamp
+        FROM resource_metrics
+        WHERE timestamp > now() - INTERVAL '1 day'
+        ORDER BY resource_id, timestamp DESC
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('resource_latest')
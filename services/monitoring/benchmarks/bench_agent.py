@@ -0,0 +1,140 @@
+# services/monitoring/benchmarks/bench_agent.py
+"""Resource use and delivery of the push agent against a local stand-in server.
+
+Starts a stand-in for the batch endpoint (gunzips, counts NDJSON samples,
+answers like the API), runs ``python -m src.agent`` against it as a
+subprocess, and takes the server away for the middle third of the run so
+samples are spooled and replayed. Reports the agent's CPU share and peak
+RSS, connections opened, and whether every sample arrived exactly once.
+
+Run from services/monitoring:
+
+    python -m benchmarks.bench_agent --duration 60 --interval 1
+
+The default --interval of 1 s samples 15x more often than the agent's
+default, so the CPU figure is an upper bound.
+"""
+import argparse
+import gzip
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import psutil
+
+
+class StandInServer:
+    def __init__(self):
+        self.samples = []
+        self.requests = 0
+        self.connections = 0
+        self.available = True
+        self.port = None
+        self._server = None
+
+    def start(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                stand_in.connections += 1
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                if not stand_in.available:
+                    # Drop keep-alive connections that outlived the listener
+                    self.close_connection = True
+                    return
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                lines = [json.loads(line) for line in body.splitlines() if line.strip()]
+                stand_in.samples.extend(lines)
+                stand_in.requests += 1
+                payload = json.dumps({"accepted": len(lines), "rejected": 0, "errors": []}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port or 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.available = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.available = False
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--flush-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    server = StandInServer()
+    server.start()
+    spool_dir = tempfile.mkdtemp(prefix="bench-agent-spool-")
+    agent = subprocess.Popen(
+        [sys.executable, "-m", "src.agent",
+         "--server", f"http://127.0.0.1:{server.port}",
+         "--token", "bench",
+         "--resource-id", "bench-agent",
+         "--interval", str(args.interval),
+         "--flush-interval", str(args.flush_interval),
+         "--spool-dir", spool_dir,
+         "--log-level", "WARNING"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    process = psutil.Process(agent.pid)
+    # Measure steady state, not interpreter start-up
+    time.sleep(2)
+    cpu_start = sum(process.cpu_times()[:2])
+    started = time.monotonic()
+    peak_rss = 0
+    outage = (args.duration / 3, 2 * args.duration / 3)
+    spooled_peak = 0
+    while (elapsed := time.monotonic() - started) < args.duration:
+        if server.available and outage[0] <= elapsed < outage[1]:
+            server.stop()
+        elif not server.available and elapsed >= outage[1]:
+            server.start()
+        peak_rss = max(peak_rss, process.memory_info().rss)
+        spooled_peak = max(spooled_peak, sum(
+            os.path.getsize(os.path.join(spool_dir, name)) for name in os.listdir(spool_dir)
+        ))
+        time.sleep(0.25)
+    cpu = sum(process.cpu_times()[:2]) - cpu_start
+    wall = time.monotonic() - started
+
+    agent.send_signal(signal.SIGTERM)
+    agent.wait(timeout=30)
+    server.stop()
+
+    timestamps = [sample["timestamp"] for sample in server.samples]
+    left_in_spool = os.listdir(spool_dir)
+    print(f"agent cpu = {cpu / wall * 100:.2f}% of one core over {wall:.0f}s, "
+          f"peak rss = {peak_rss / 1024 / 1024:.1f} MB")
+    print(f"samples received = {len(timestamps)} ({len(set(timestamps))} distinct), "
+          f"requests = {server.requests}, connections = {server.connections}, "
+          f"peak spool = {spooled_peak} bytes, segments left = {len(left_in_spool)}")
+
+
+if __name__ == "__main__":
+    main()
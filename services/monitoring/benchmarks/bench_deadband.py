@@ -0,0 +1,146 @@
+# services/monitoring/benchmarks/bench_deadband.py
+"""Rows stored and reconstruction error: fixed-interval vs. adaptive collection.
+
+Replays a host trace recorded at 1 s resolution (the ground truth). The
+fixed collector stores a reading every --interval seconds; "deadband" runs
+DeadbandFilter at that fixed interval; "adaptive" also lets the interval
+shrink to --min-interval while values move. Every stored series is then
+read back as a step series (LOCF, as ``fill=locf`` does) and compared with
+the trace at every second. Storage scales with rows stored.
+
+The bundled trace is 30 minutes of a mostly idle host with nine short
+bursts of CPU, memory and network activity.
+
+Run from services/monitoring:
+
+    python -m benchmarks.bench_deadband --interval 15
+
+Record a fresh trace on some host with:
+
+    python -m benchmarks.bench_deadband --record trace.ndjson.gz --duration 1800
+"""
+import argparse
+import bisect
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+
+from src.core.deadband import DEFAULT_DEADBANDS, DeadbandFilter
+from src.core.host_sampler import HostSampler
+
+DEFAULT_TRACE = os.path.join(os.path.dirname(__file__), "traces", "host-1s.ndjson.gz")
+COLUMNS = tuple(DEFAULT_DEADBANDS)
+RATE_COLUMNS = ("cpu_usage", "network_in", "network_out")
+
+
+def record(path: str, duration: float):
+    sampler = HostSampler("trace", "host")
+    deadline = time.monotonic() + duration
+    next_sample = time.monotonic() + 1
+    with gzip.open(path, "wt") as f:
+        while time.monotonic() < deadline:
+            time.sleep(max(0.0, next_sample - time.monotonic()))
+            next_sample += 1
+            sample = sampler.sample()
+            f.write(json.dumps({
+                "timestamp": sample["timestamp"].isoformat(),
+                **{name: sample[name] for name in COLUMNS},
+            }) + "\n")
+
+
+def load(path: str):
+    with gzip.open(path, "rt") as f:
+        trace = [json.loads(line) for line in f]
+    for sample in trace:
+        sample["timestamp"] = datetime.fromisoformat(sample["timestamp"])
+    return trace
+
+
+def observe(trace, times, t: float, since: float = None):
+    """What a sampler reading at ``t`` reports.
+
+    Gauges are the trace value in force at ``t``; rates (CPU, network) are
+    averaged since the previous reading at ``since``, as HostSampler does.
+    """
+    i = max(0, bisect.bisect_right(times, t) - 1)
+    sample = dict(trace[i])
+    if since is not None:
+        j = max(0, bisect.bisect_right(times, since) - 1)
+        window = trace[j + 1:i + 1] or [trace[i]]
+        for name in RATE_COLUMNS:
+            sample[name] = sum(s[name] for s in window) / len(window)
+    return sample
+
+
+def fixed(trace, times, interval: float):
+    stored, previous, t = [], None, times[0]
+    while t <= times[-1]:
+        stored.append(observe(trace, times, t, previous))
+        previous, t = t, t + interval
+    return stored
+
+
+def adaptive(trace, times, interval: float, heartbeat: float, min_interval: float):
+    deadband = DeadbandFilter(heartbeat=heartbeat, base_interval=interval, min_interval=min_interval)
+    stored, observations, previous, t = [], 0, None, times[0]
+    while t <= times[-1]:
+        stored.extend(deadband.offer(observe(trace, times, t, previous)))
+        observations += 1
+        previous, t = t, t + deadband.interval
+    return stored, observations
+
+
+def errors(trace, times, stored):
+    """Mean and max absolute error of the LOCF reconstruction, per column."""
+    stored_times = [sample["timestamp"].timestamp() for sample in stored]
+    result = {}
+    for name in COLUMNS:
+        diffs = [
+            abs(stored[max(0, bisect.bisect_right(stored_times, t) - 1)][name] - sample[name])
+            for t, sample in zip(times, trace)
+        ]
+        result[name] = (sum(diffs) / len(diffs), max(diffs))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trace", default=DEFAULT_TRACE)
+    parser.add_argument("--interval", type=float, default=15.0)
+    parser.add_argument("--heartbeat", type=float, default=300.0)
+    parser.add_argument("--min-interval", type=float, default=2.0)
+    parser.add_argument("--record", help="record a 1 s trace to this path instead")
+    parser.add_argument("--duration", type=float, default=1800.0)
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.duration)
+        return
+
+    trace = load(args.trace)
+    times = [sample["timestamp"].timestamp() for sample in trace]
+    runs = {"fixed": (fixed(trace, times, args.interval), None)}
+    runs["deadband"] = adaptive(trace, times, args.interval, args.heartbeat, args.interval)
+    runs["adaptive"] = adaptive(trace, times, args.interval, args.heartbeat, args.min_interval)
+
+    print(f"trace: {len(trace)} samples over {(times[-1] - times[0]) / 60:.0f} min; "
+          f"base interval {args.interval:g}s, heartbeat {args.heartbeat:g}s, min interval {args.min_interval:g}s")
+    baseline = len(runs["fixed"][0])
+    for label, (stored, observations) in runs.items():
+        line = f"{label:9} rows stored = {len(stored):5d}"
+        if observations is not None:
+            line += f" ({observations} observations), {(1 - len(stored) / baseline) * 100:.1f}% fewer rows"
+        print(line)
+
+    run_errors = {label: errors(trace, times, stored) for label, (stored, _) in runs.items()}
+    print(f"{'LOCF error vs trace':20}" + "".join(f"{label + ' mean/max':>26}" for label in runs)
+          + f"{'deadband':>10}")
+    for name in COLUMNS:
+        print(f"{name:20}" + "".join(
+            f"{run_errors[label][name][0]:12.2f} /{run_errors[label][name][1]:12.2f}" for label in runs
+        ) + f"{DEFAULT_DEADBANDS[name]:10g}")
+
+if __name__ == "__main__":
+    main()
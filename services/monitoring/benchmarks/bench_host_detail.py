@@ -0,0 +1,111 @@
+# services/monitoring/benchmarks/bench_host_detail.py
+"""Per-tick cost of the sub-resource collectors with thousands of processes.
+
+Forks --processes idle children so the process table is the size of a busy
+host, then times one collector tick for:
+
+    naive         a fresh psutil.Process per pid, each attribute read
+                  separately (name, cpu_percent, memory_percent)
+    process_iter  psutil.process_iter with attrs, which caches Process
+                  objects and uses oneshot() internally
+    top           TopProcesses: one pass, cached Process objects and names,
+                  grouped by name
+    full tick     HostDetailSampler with every collector enabled
+
+Run from services/monitoring:
+
+    python -m benchmarks.bench_host_detail --processes 2000 --ticks 20
+"""
+import argparse
+import os
+import signal
+import statistics
+import time
+
+import psutil
+
+from src.core.host_detail import HostDetailSampler, TopProcesses
+
+
+def spawn(count: int):
+    children = []
+    for _ in range(count):
+        pid = os.fork()
+        if pid == 0:
+            signal.pause()
+            os._exit(0)
+        children.append(pid)
+    return children
+
+
+def reap(children):
+    for pid in children:
+        os.kill(pid, signal.SIGKILL)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+
+def naive_tick(count: int):
+    stats = []
+    for pid in psutil.pids():
+        try:
+            process = psutil.Process(pid)
+            stats.append((process.cpu_percent(), process.memory_percent(), process.name(), pid))
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return sorted(stats, reverse=True)[:count]
+
+
+def process_iter_tick(count: int):
+    stats = [
+        process.info
+        for process in psutil.process_iter(["pid", "name", "cpu_percent", "memory_percent"])
+    ]
+    return sorted(stats, key=lambda info: info["cpu_percent"] or 0, reverse=True)[:count]
+
+
+def timed(tick, ticks: int):
+    tick()  # warm-up: first sight of every process
+    cpu_before = time.process_time()
+    durations = []
+    for _ in range(ticks):
+        started = time.perf_counter()
+        tick()
+        durations.append(time.perf_counter() - started)
+    return durations, (time.process_time() - cpu_before) / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=2000)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    children = spawn(args.processes)
+    try:
+        total = len(psutil.pids())
+        top = TopProcesses(args.top)
+        detail = HostDetailSampler(
+            "bench", cpu_cores=True, partitions=True, interfaces=True, top_processes=args.top
+        )
+        runs = {
+            "naive": lambda: naive_tick(args.top),
+            "process_iter": lambda: process_iter_tick(args.top),
+            "top": lambda: top.collect("bench", None),
+            "full tick": lambda: detail.sample(),
+        }
+        print(f"{total} processes, {psutil.cpu_count()} CPUs, top {args.top}, {args.ticks} ticks each")
+        print(f"{'collector':14}{'median ms':>12}{'p95 ms':>10}{'cpu ms/tick':>13}{'rows':>7}")
+        for label, tick in runs.items():
+            durations, cpu = timed(tick, args.ticks)
+            durations.sort()
+            rows = len(tick())
+            print(f"{label:14}{statistics.median(durations) * 1000:12.1f}"
+                  f"{durations[int(len(durations) * 0.95) - 1] * 1000:10.1f}{cpu * 1000:13.1f}{rows:7d}")
+    finally:
+        reap(children)
+
+
+if __name__ == "__main__":
+    main()
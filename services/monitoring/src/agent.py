@@ -0,0 +1,344 @@
+# services/monitoring/src/agent.py
+"""Standalone push agent: samples this host and ships the samples to the API.
+
+    python -m src.agent --server http://monitoring.internal --username agent --password ...
+
+Samples are batched locally and sent gzip-compressed as NDJSON to
+/api/v1/monitoring/metrics/batch over one keep-alive connection. While the
+server is unreachable, batches are appended to segment files in --spool-dir
+and replayed, one request per segment, once it answers again. Delivery is
+at-least-once: a batch whose response is lost is sent again.
+
+Only the standard library and psutil are imported so the agent stays small,
+so the core modules it shares with the service (host_sampler, host_detail,
+deadband) must not import settings, pydantic or prometheus. Every option can
+also be set with the CLOUDSCALE_AGENT_* environment variable named in its help.
+"""
+import argparse
+import gzip
+import http.client
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import urllib.parse
+from typing import List, Optional
+
+from .core.deadband import DeadbandFilter, DeadbandGroup
+from .core.host_detail import HostDetailSampler
+from .core.host_sampler import HostSampler
+
+logger = logging.getLogger("src.agent")
+
+BATCH_PATH = "/api/v1/monitoring/metrics/batch"
+TOKEN_PATH = "/api/v1/auth/token"
+NEWLINE = b"\n"
+# Client errors retried later with the batch kept in the spool; other 4xx are discarded
+RETRYABLE_STATUSES = {401, 408, 425, 429}
+
+
+class Spool:
+    """Append-only NDJSON segment files holding batches the server has not taken.
+
+    Segments are named by an increasing sequence number and replayed oldest
+    first. When the spool outgrows ``max_bytes`` the oldest segments are
+    dropped, so an agent cut off for days loses its oldest samples rather
+    than filling the disk.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 1024 * 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def segments(self) -> List[str]:
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(".ndjson"))
+        return [os.path.join(self.directory, name) for name in names]
+
+    def __bool__(self) -> bool:
+        return bool(self.segments())
+
+    def append(self, lines: bytes):
+        segments = self.segments()
+        if segments and os.path.getsize(segments[-1]) < self.segment_bytes:
+            path = segments[-1]
+        else:
+            sequence = int(os.path.basename(segments[-1]).split(".")[0]) + 1 if segments else 0
+            path = os.path.join(self.directory, f"{sequence:012d}.ndjson")
+            segments.append(path)
+        with open(path, "ab") as f:
+            f.write(lines)
+        self._enforce_limit(segments)
+
+    def _enforce_limit(self, segments: List[str]):
+        sizes = [os.path.getsize(path) for path in segments]
+        total = sum(sizes)
+        # Never drop the segment just written to
+        for path, size in zip(segments[:-1], sizes):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            logger.warning(f"Spool over {self.max_bytes} bytes, dropped {path}")
+
+
+class Pusher:
+    """POSTs gzip-compressed NDJSON batches over a persistent HTTP connection."""
+
+    def __init__(
+        self,
+        server: str,
+        token: Optional[str] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        timeout: float = 10.0,
+    ):
+        url = urllib.parse.urlsplit(server)
+        self._connection_class = (
+            http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        )
+        self._netloc = url.netloc
+        self._prefix = url.path.rstrip("/")
+        self._token = token
+        self._username = username
+        self._password = password
+        self.timeout = timeout
+        self._connection: Optional[http.client.HTTPConnection] = None
+        self.connections_opened = 0
+
+    def _request(self, method: str, path: str, body: bytes, headers: dict):
+        # A reused connection may have been closed by the server while idle;
+        # that surfaces on the next request, which is then retried once fresh
+        for attempt in range(2):
+            reused = self._connection is not None
+            if not reused:
+                self._connection = self._connection_class(self._netloc, timeout=self.timeout)
+                self.connections_opened += 1
+            try:
+                self._connection.request(method, self._prefix + path, body, headers)
+                response = self._connection.getresponse()
+                return response.status, response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.close()
+                if not reused or attempt:
+                    raise
+            except Exception:
+                self.close()
+                raise
+
+    def _login(self) -> bool:
+        body = urllib.parse.urlencode({"username": self._username, "password": self._password}).encode()
+        status, payload = self._request(
+            "POST", TOKEN_PATH, body, {"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        if status != 200:
+            logger.error(f"Agent login failed with HTTP {status}")
+            return False
+        self._token = json.loads(payload)["access_token"]
+        return True
+
+    def push(self, lines: bytes) -> bool:
+        """Send one NDJSON batch; False means keep it and try again later.
+
+        Batches the server refuses outright (validation errors, payload too
+        large) are logged and reported as handled, since resending cannot help.
+        """
+        body = gzip.compress(lines, compresslevel=6)
+        try:
+            if self._token is None and self._username and not self._login():
+                return False
+            for attempt in range(2):
+                headers = {
+                    "Content-Type": "application/x-ndjson",
+                    "Content-Encoding": "gzip",
+                }
+                if self._token:
+                    headers["Authorization"] = f"Bearer {self._token}"
+                status, payload = self._request("POST", BATCH_PATH, body, headers)
+                # An expired token is renewed once when credentials are configured
+                if status == 401 and self._username and not attempt and self._login():
+                    continue
+                break
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            logger.warning(f"Push to {self._netloc} failed: {str(e)}")
+            return False
+
+        if 200 <= status < 300:
+            result = json.loads(payload)
+            if result.get("rejected"):
+                logger.warning(f"Server rejected {result['rejected']} samples: {result.get('errors')}")
+            return True
+        if 400 <= status < 500 and status not in RETRYABLE_STATUSES:
+            logger.error(f"Discarding batch refused with HTTP {status}: {payload[:500]!r}")
+            return True
+        logger.warning(f"Push to {self._netloc} failed with HTTP {status}")
+        return False
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class Agent:
+    def __init__(
+        self,
+        sampler: HostSampler,
+        pusher: Pusher,
+        spool: Spool,
+        interval: float = 15.0,
+        flush_interval: float = 30.0,
+        batch_size: int = 100,
+        deadband: Optional[DeadbandFilter] = None,
+        detail: Optional[HostDetailSampler] = None,
+    ):
+        self.sampler = sampler
+        self.pusher = pusher
+        self.spool = spool
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # Adaptive mode: store only changed samples and vary the interval
+        self.deadband = deadband
+        # Per-core, partition, interface and process rows sent with each sample
+        self.detail = detail
+        self._detail_deadbands = DeadbandGroup(
+            deadbands=deadband.deadbands, heartbeat=deadband.heartbeat,
+            base_interval=deadband.base_interval, min_interval=deadband.min_interval,
+        ) if deadband and detail else None
+        self._batch: List[bytes] = []
+        self._stop_event = threading.Event()
+
+    def collect(self):
+        sample = self.sampler.sample()
+        samples = [sample] if sample else []
+        if sample and self.deadband:
+            samples = self.deadband.offer(sample)
+        if self.detail:
+            rows = self.detail.sample(sample["timestamp"] if sample else None)
+            samples.extend(self._detail_deadbands.offer(rows) if self._detail_deadbands else rows)
+        for sample in samples:
+            line = {**sample, "timestamp": sample["timestamp"].isoformat()}
+            self._batch.append(json.dumps(line, separators=(",", ":")).encode() + NEWLINE)
+
+    def flush(self):
+        lines = b"".join(self._batch)
+        self._batch.clear()
+        if self.spool:
+            # Keep the server-side order: queue behind what is already spooled
+            if lines:
+                self.spool.append(lines)
+            self.replay()
+        elif lines and not self.pusher.push(lines):
+            self.spool.append(lines)
+            logger.warning(f"Spooled {lines.count(NEWLINE)} samples to {self.spool.directory}")
+
+    def replay(self):
+        """Send spooled segments oldest first, stopping at the first failure."""
+        for path in self.spool.segments():
+            with open(path, "rb") as f:
+                lines = f.read()
+            if lines and not self.pusher.push(lines):
+                return
+            os.remove(path)
+            logger.info(f"Replayed {lines.count(NEWLINE)} spooled samples")
+
+    def run(self):
+        """Sample every ``interval`` seconds and flush on size or age until stopped."""
+        next_sample = next_flush = time.monotonic()
+        next_flush += self.flush_interval
+        # Anything left from a previous run goes out first
+        self.flush()
+        while not self._stop_event.is_set():
+            self.collect()
+            now = time.monotonic()
+            if len(self._batch) >= self.batch_size or now >= next_flush:
+                self.flush()
+                next_flush = now + self.flush_interval
+            next_sample += self.deadband.interval if self.deadband else self.interval
+            self._stop_event.wait(max(0.0, next_sample - time.monotonic()))
+        self.flush()
+        self.pusher.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def _env(name: str, default=None):
+    return os.environ.get(f"CLOUDSCALE_AGENT_{name}", default)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Push this host's metrics to CloudScale Monitoring")
+    parser.add_argument("--server", default=_env("SERVER", "http://localhost:8000"),
+                        help="API base URL, e.g. http://nginx/ or http://monitoring:8000 (SERVER)")
+    parser.add_argument("--token", default=_env("TOKEN"), help="bearer token (TOKEN)")
+    parser.add_argument("--username", default=_env("USERNAME"),
+                        help="log in for a token, and again when it expires (USERNAME)")
+    parser.add_argument("--password", default=_env("PASSWORD"), help="(PASSWORD)")
+    parser.add_argument("--resource-id", default=_env("RESOURCE_ID", socket.gethostname()),
+                        help="defaults to the hostname (RESOURCE_ID)")
+    parser.add_argument("--resource-type", default=_env("RESOURCE_TYPE", "host"), help="(RESOURCE_TYPE)")
+    parser.add_argument("--interval", type=float, default=float(_env("INTERVAL", 15)),
+                        help="seconds between samples (INTERVAL)")
+    parser.add_argument("--flush-interval", type=float, default=float(_env("FLUSH_INTERVAL", 30)),
+                        help="seconds between pushes; keep it under the server's keep-alive timeout (FLUSH_INTERVAL)")
+    parser.add_argument("--adaptive", action="store_true", default=_env("ADAPTIVE", "") in ("1", "true"),
+                        help="skip samples within the default deadbands of the last one sent; list the resource "
+                             "in the server's METRICS_LOCF_RESOURCES so history holds values (ADAPTIVE)")
+    parser.add_argument("--heartbeat", type=float, default=float(_env("HEARTBEAT", 300)),
+                        help="adaptive mode: send a sample at least this often, in seconds (HEARTBEAT)")
+    parser.add_argument("--min-interval", type=float, default=float(_env("MIN_INTERVAL", 5)),
+                        help="adaptive mode: shortest interval while values move fast (MIN_INTERVAL)")
+    parser.add_argument("--cpu-cores", action="store_true", default=_env("CPU_CORES", "") in ("1", "true"),
+                        help="also send each logical CPU as <resource-id>:cpuN (CPU_CORES)")
+    parser.add_argument("--partitions", action="store_true", default=_env("PARTITIONS", "") in ("1", "true"),
+                        help="also send each mounted partition as <resource-id>:disk:<mountpoint> (PARTITIONS)")
+    parser.add_argument("--interfaces", action="store_true", default=_env("INTERFACES", "") in ("1", "true"),
+                        help="also send each network interface as <resource-id>:net:<name> (INTERFACES)")
+    parser.add_argument("--top-processes", type=int, default=int(_env("TOP_PROCESSES", 0)),
+                        help="also send the N busiest and N largest programs, processes "
+                             "grouped by name, as <resource-id>:proc:<name> (TOP_PROCESSES)")
+    parser.add_argument("--batch-size", type=int, default=int(_env("BATCH_SIZE", 100)),
+                        help="push early once this many samples are waiting (BATCH_SIZE)")
+    parser.add_argument("--spool-dir", default=_env("SPOOL_DIR", os.path.expanduser("~/.cloudscale-agent/spool")),
+                        help="(SPOOL_DIR)")
+    parser.add_argument("--spool-max-bytes", type=int, default=int(_env("SPOOL_MAX_BYTES", 64 * 1024 * 1024)),
+                        help="oldest spooled samples are dropped beyond this (SPOOL_MAX_BYTES)")
+    parser.add_argument("--log-level", default=_env("LOG_LEVEL", "INFO"), help="(LOG_LEVEL)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=args.log_level.upper(),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    agent = Agent(
+        HostSampler(args.resource_id, args.resource_type),
+        Pusher(args.server, args.token, args.username, args.password),
+        Spool(args.spool_dir, max_bytes=args.spool_max_bytes),
+        interval=args.interval,
+        flush_interval=args.flush_interval,
+        batch_size=args.batch_size,
+        deadband=DeadbandFilter(
+            heartbeat=args.heartbeat, base_interval=args.interval, min_interval=args.min_interval
+        ) if args.adaptive else None,
+        detail=HostDetailSampler(
+            args.resource_id,
+            cpu_cores=args.cpu_cores,
+            partitions=args.partitions,
+            interfaces=args.interfaces,
+            top_processes=args.top_processes,
+        ),
+    )
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: agent.stop())
+    logger.info(f"Pushing {args.resource_id} every {args.interval}s to {args.server}")
+    agent.run()
+
+
+if __name__ == "__main__":
+    main()
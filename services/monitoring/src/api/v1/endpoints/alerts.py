@@ -0,0 +1,94 @@
+# services/monitoring/src/api/v1/endpoints/alerts.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Literal, Optional
+import logging
+
+from ....database import get_db, get_read_db
+from ....core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from ....core.profiling import TimedRoute
+from ....crud.metrics import MetricsCRUD
+from ....schemas.metrics import (
+    AlertBulkResolve,
+    AlertBulkResolveResult,
+    AlertCreate,
+    AlertPage,
+    AlertRead,
+)
+
+router = APIRouter(route_class=TimedRoute)
+logger = logging.getLogger(__name__)
+
+@router.post("/alerts/", response_model=AlertRead)
+async def create_alert(
+    alert: AlertCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        return await MetricsCRUD.create_alert(db, alert)
+    except Exception as e:
+        logger.error(f"Error creating alert: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not create alert")
+
+@router.get("/alerts/", response_model=AlertPage)
+async def list_alerts(
+    status: Literal["open", "resolved", "all"] = "all",
+    severity: Optional[str] = None,
+    resource_id: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Newest-first alerts; follow ``next_cursor`` for older pages."""
+    try:
+        after = decode_cursor(cursor, datetime, int) if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        # One extra row tells us whether another page exists
+        alerts = await MetricsCRUD.list_alerts(
+            db,
+            limit=limit + 1,
+            status=status,
+            severity=severity,
+            resource_id=resource_id,
+            start_time=start_time,
+            end_time=end_time,
+            after=after,
+        )
+    except Exception as e:
+        logger.error(f"Error listing alerts: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not list alerts")
+
+    next_cursor = None
+    if len(alerts) > limit:
+        alerts = alerts[:limit]
+        next_cursor = encode_cursor(alerts[-1].timestamp, alerts[-1].id)
+    return {"items": alerts, "next_cursor": next_cursor}
+
+@router.post("/alerts/resolve", response_model=AlertBulkResolveResult)
+async def resolve_alerts(
+    request: AlertBulkResolve,
+    db: AsyncSession = Depends(get_db)
+):
+    """Resolve many alerts in one UPDATE; ids already resolved or unknown are skipped."""
+    try:
+        resolved = await MetricsCRUD.resolve_alerts(db, request.ids)
+    except Exception as e:
+        logger.error(f"Error resolving alerts: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not resolve alerts")
+    return {"resolved": resolved}
+
+@router.post("/alerts/{alert_id}/resolve", response_model=AlertRead)
+async def resolve_alert(
+    alert_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    alert = await MetricsCRUD.resolve_alert(db, alert_id)
+    if alert is None:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return alert
@@ -1,30 +1,39 @@
 # src/api/v1/endpoints/auth.py
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Cookie, Depends, HTTPException, Query, status, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
 from datetime import timedelta
-from typing import List, Dict
+from typing import Dict, Optional
 from ....database import get_db
 from ....core.auth import (
-    get_password_hash,
-    authenticate_user,
     create_access_token,
     get_current_active_user,
     get_current_admin_user,
+    invalidate_user_tokens,
+    password_hasher,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     verify_password,
     get_password_hash
 )
-from ....core.session import SessionManager
-from ....crud.users import create_user, get_user, update_user, delete_user
-from ....schemas.auth import Token, UserCreate, UserRead
+from ....core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from ....core.profiling import TimedRoute
+from ....core.session import session_manager
+from ....crud.users import create_user, get_user, get_users, update_user, delete_user
+from ....schemas.auth import Token, UserCreate, UserPage, UserRead, UserUpdate
 from ....models.users import User
 import logging
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 logger = logging.getLogger(__name__)
 
-session_manager = SessionManager("redis://redis:6379/0")
+async def _rehash(db: AsyncSession, user: User, new_hash: str):
+    """Store a hash produced with the current bcrypt cost; login still succeeds if this fails."""
+    try:
+        user.hashed_password = new_hash
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.warning(f"Could not rehash password for user {user.id}: {str(e)}")
 
 @router.post("/login")
 async def login(
@@ -38,11 +47,17 @@ async def login(
         result = await db.execute(stmt)
         user = result.scalar_one_or_none()
 
-        if not user or not verify_password(form_data.password, user.hashed_password):
+        valid, new_hash = (
+            await verify_password(form_data.password, user.hashed_password)
+            if user else (False, None)
+        )
+        if not valid:
             raise HTTPException(
                 status_code=401,
                 detail="Incorrect username or password"
             )
+        if new_hash:
+            await _rehash(db, user, new_hash)
 
         # Create session
         session_id = await session_manager.create_session({
@@ -93,16 +108,14 @@ async def get_current_user(
             detail="Not authenticated"
         )
 
-    session_data = await session_manager.get_session(session_id)
+    # Read and slide the expiry in one round trip
+    session_data = await session_manager.get_session(session_id, refresh=True)
     if not session_data:
         raise HTTPException(
             status_code=401,
             detail="Session expired"
         )
 
-    # Refresh session
-    await session_manager.refresh_session(session_id)
-
     return session_data
 
 @router.post("/register", response_model=Dict[str, str])
@@ -136,7 +149,7 @@ async def register_user(
         new_user = User(
             email=email,
             username=username,
-            hashed_password=get_password_hash(password)
+            hashed_password=await get_password_hash(password)
         )
         db.add(new_user)
         await db.commit()
@@ -162,12 +175,18 @@ async def login(
         result = await db.execute(stmt)
         user = result.scalar_one_or_none()
 
-        if not user or not verify_password(form_data.password, user.hashed_password):
+        valid, new_hash = (
+            await verify_password(form_data.password, user.hashed_password)
+            if user else (False, None)
+        )
+        if not valid:
             raise HTTPException(
                 status_code=401,
                 detail="Incorrect username or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        if new_hash:
+            await _rehash(db, user, new_hash)
 
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
@@ -189,15 +208,38 @@ async def read_users_me(
 ):
     return current_user
 
-@router.get("/users", response_model=List[UserRead])
+@router.get("/hashing/stats")
+async def get_hashing_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    return password_hasher.stats()
+
+@router.get("/sessions/stats")
+async def get_session_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    return session_manager.stats()
+
+@router.get("/users", response_model=UserPage)
 async def read_users(
-    skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
-    users = await get_users(db, skip=skip, limit=limit)
-    return users
+    """Users in id order; follow ``next_cursor`` for the next page."""
+    try:
+        after_id = decode_cursor(cursor, int)[0] if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # One extra row tells us whether another page exists
+    users = await get_users(db, limit=limit + 1, after_id=after_id)
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].id)
+    return {"items": users, "next_cursor": next_cursor}
 
 @router.patch("/users/{user_id}", response_model=UserRead)
 async def update_user_details(
@@ -211,6 +253,8 @@ async def update_user_details(
         raise HTTPException(status_code=404, detail="User not found")
 
     updated_user = await update_user(db, db_user, user_update)
+    # Deactivation or role changes must apply to already-issued tokens
+    await invalidate_user_tokens(user_id)
     return updated_user
 
 @router.delete("/users/{user_id}")
@@ -227,4 +271,5 @@ async def delete_user_account(
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
 
     await delete_user(db, db_user)
+    await invalidate_user_tokens(user_id)
     return {"message": "User deleted successfully"}
@@ -1,66 +1,436 @@
 # services/monitoring/src/api/v1/endpoints/metrics.py
-from fastapi import APIRouter, HTTPException
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
+from datetime import datetime, timedelta, timezone
+from fnmatch import fnmatchcase
+from typing import List, Literal, Optional
+import csv
+import io
+import json
 import logging
-import psutil
+import math
+import orjson
 
-router = APIRouter()
+from ....config import settings
+from ....database import AsyncReadSessionLocal, get_db, get_read_db
+from ....core.host_detail import SUB_RESOURCE_SEPARATOR, sub_resource_id
+from ....core.host_sampler import DEFAULT_RESOURCE_ID
+from ....core.ingestion import metrics_ingestor, IngestionQueueFull
+from ....core.latest import latest_snapshots
+from ....core.metrics_cache import metrics_cache
+from ....core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from ....core.profiling import TimedRoute, phase
+from ....core.response_cache import aligned_now, response_cache
+from ....core.sample_stream import (
+    CONTENT_ENCODINGS,
+    SampleStreamError,
+    iter_decompressed,
+    iter_json_array,
+    iter_ndjson,
+    validate_samples,
+)
+from ....core.series_format import (
+    MEDIA_TYPES,
+    UnsupportedFormat,
+    encode,
+    merge_series,
+    negotiate,
+    rows_to_columns,
+    tuples_to_columns,
+)
+from ....core.streaming import serialize_row
+from ....crud.metrics import MetricsCRUD
+from ....models.metrics import METRIC_COLUMNS
+from ....schemas.metrics import MetricsCreate, MetricsPage, MetricsRead
+
+# Cap on per-item errors echoed back so a bad batch cannot produce a huge response
+MAX_REPORTED_ERRORS = 1000
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+ROWS_ADAPTER = TypeAdapter(List[MetricsRead])
+EXPORT_COLUMNS = ("id", "resource_id", "resource_type", *METRIC_COLUMNS, "timestamp")
+
+router = APIRouter(route_class=TimedRoute)
 logger = logging.getLogger(__name__)
 
-@router.get("/metrics/{resource_id}")
-async def get_resource_metrics(resource_id: str):
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+def _stored_stepwise(resource_id: str) -> bool:
+    """Whether a resource (or its host's sub-resource) is stored with deadband suppression."""
+    host = resource_id.split(SUB_RESOURCE_SEPARATOR, 1)[0]
+    if settings.METRICS_ADAPTIVE_COLLECTION and host == DEFAULT_RESOURCE_ID:
+        return True
+    return any(fnmatchcase(host, pattern) for pattern in settings.METRICS_LOCF_RESOURCES)
+
+@router.get("/metrics/{resource_id}", response_model=List[MetricsRead])
+async def get_resource_metrics(
+    resource_id: str,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    format: Optional[Literal["json", "columnar", "arrow", "msgpack"]] = None,
+    columns: List[str] = Query(list(METRIC_COLUMNS)),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Raw samples, newest first.
+
+    Rows are returned as JSON objects by default. Columnar JSON
+    (``{"timestamp": [...], "cpu_usage": [...]}``), Arrow IPC and MessagePack
+    are chosen with the Accept header or ``format`` and are encoded straight
+    from the result tuples, skipping per-row model validation. Responses
+    carry an ETag and are cached; see ResponseCache.
+    """
     try:
-        # Generate mock data
-        mock_data = []
-        current_time = datetime.utcnow()
-
-        # Generate 10 data points
-        for i in range(10):
-            timestamp = current_time - timedelta(minutes=i*5)
-            mock_data.append({
-                "id": i+1,
-                "resource_id": resource_id,
-                "resource_type": "vm",
-                "cpu_usage": 45.5 + (i % 5),
-                "memory_usage": 60.2 + (i % 3),
-                "disk_usage": 72.8 - (i % 4),
-                "network_in": 1024.0 * (1 + i % 3),
-                "network_out": 2048.0 * (1 + i % 2),
-                "timestamp": timestamp.isoformat()
-            })
-
-        return mock_data
+        fmt = negotiate(accept, format)
+    except UnsupportedFormat as e:
+        raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE, detail=str(e))
+    unknown = set(columns) - set(METRIC_COLUMNS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(sorted(unknown))}")
+
+    end_time = _as_utc(end_time) or aligned_now()
+    start_time = _as_utc(start_time) or end_time - timedelta(seconds=settings.METRICS_DEFAULT_WINDOW)
+    if start_time > end_time:
+        raise HTTPException(status_code=400, detail="start_time must be before end_time")
+
+    async def produce():
+        cached = metrics_cache.get(resource_id, start_time, end_time)
+        if fmt == "json":
+            if cached is None:
+                # Own session: coalesced requests may outlive this one
+                async with AsyncReadSessionLocal() as session:
+                    cached = await MetricsCRUD.get_metrics(session, resource_id, start_time, end_time)
+            with phase("encode"):
+                return ROWS_ADAPTER.dump_json(ROWS_ADAPTER.validate_python(cached)), MEDIA_TYPES[fmt]
 
+        if cached is not None:
+            series = rows_to_columns(cached, columns)
+        else:
+            async with AsyncReadSessionLocal() as session:
+                rows = await MetricsCRUD.get_metrics_columns(session, resource_id, start_time, end_time, columns)
+            series = tuples_to_columns(rows, columns)
+        with phase("encode"):
+            return encode(series, fmt), MEDIA_TYPES[fmt]
+
+    key = repr(("raw", resource_id, start_time.timestamp(), end_time.timestamp(), fmt,
+                None if fmt == "json" else tuple(columns)))
+    try:
+        return await response_cache.serve(key, resource_id, end_time, produce, db, if_none_match)
     except Exception as e:
         logger.error(f"Error retrieving metrics: {str(e)}")
         raise HTTPException(status_code=500, detail="Could not retrieve metrics")
 
+@router.get("/metrics/{resource_id}/page", response_model=MetricsPage)
+async def get_resource_metrics_page(
+    resource_id: str,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Newest-first samples; follow ``next_cursor`` for older pages."""
+    end_time = _as_utc(end_time) or datetime.now(timezone.utc)
+    start_time = _as_utc(start_time) or end_time - timedelta(seconds=settings.METRICS_DEFAULT_WINDOW)
+    try:
+        after = decode_cursor(cursor, datetime, int) if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        # One extra row tells us whether another page exists
+        rows = await MetricsCRUD.get_metrics_page(db, resource_id, start_time, end_time, limit + 1, after)
+    except Exception as e:
+        logger.error(f"Error retrieving metrics page: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not retrieve metrics")
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return {"items": rows, "next_cursor": next_cursor}
+
+@router.get("/metrics/{resource_id}/export")
+async def export_resource_metrics(
+    resource_id: str,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    format: Literal["ndjson", "csv"] = "ndjson",
+):
+    """Stream every sample in the range, oldest first, as NDJSON or CSV.
+
+    Rows are read through a server-side cursor and written chunk by chunk,
+    so memory use does not grow with the size of the range.
+    """
+    end_time = _as_utc(end_time) or datetime.now(timezone.utc)
+    start_time = _as_utc(start_time) or end_time - timedelta(seconds=settings.METRICS_DEFAULT_WINDOW)
+    if start_time > end_time:
+        raise HTTPException(status_code=400, detail="start_time must be before end_time")
+
+    async def body():
+        # Own session: request-scoped dependencies are closed before the body streams
+        async with AsyncReadSessionLocal() as db:
+            if format == "csv":
+                yield ",".join(EXPORT_COLUMNS) + "\n"
+            async for chunk in MetricsCRUD.stream_metrics(db, resource_id, start_time, end_time):
+                if format == "csv":
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer, lineterminator="\n")
+                    writer.writerows(
+                        [row[name].isoformat() if name == "timestamp" else row[name] for name in EXPORT_COLUMNS]
+                        for row in chunk
+                    )
+                    yield buffer.getvalue()
+                else:
+                    yield "".join(json.dumps(serialize_row(dict(row))) + "\n" for row in chunk)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"{resource_id}-metrics.{format}"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/metrics/{resource_id}/history")
+async def get_resource_metrics_history(
+    resource_id: str,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    bucket: Optional[Literal["1m", "5m", "1h", "1d"]] = None,
+    agg: Literal["avg", "min", "max", "p95", "last"] = "avg",
+    max_points: Optional[int] = Query(None, ge=3, le=10000),
+    columns: List[str] = Query(list(METRIC_COLUMNS)),
+    fill: Optional[Literal["locf", "none"]] = None,
+    format: Optional[Literal["json", "columnar", "arrow", "msgpack"]] = None,
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Chart-ready history: SQL time buckets (``bucket``/``agg``) or LTTB (``max_points``).
+
+    ``fill=locf`` reads the samples as a step series, each value holding until
+    the next one (at most METRICS_LOCF_HORIZON), as stored by adaptive
+    collection; it is the default for resources stored that way (see
+    METRICS_LOCF_RESOURCES). It reads raw samples, so fixed-interval series
+    default to ``fill=none``, which aggregates the stored samples as they are
+    and answers from the rollups where it can.
+
+    Formats are negotiated as for raw samples. JSON keeps the query echoed
+    alongside the series; the other formats carry only the columnar table,
+    with LTTB's per-column points joined on their timestamps.
+    """
+    if (bucket is None) == (max_points is None):
+        raise HTTPException(status_code=400, detail="Specify exactly one of bucket or max_points")
+    try:
+        fmt = negotiate(accept, format)
+    except UnsupportedFormat as e:
+        raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE, detail=str(e))
+    unknown = set(columns) - set(METRIC_COLUMNS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(sorted(unknown))}")
+    if fill is None and _stored_stepwise(resource_id):
+        # Only change points are stored; averaging those alone is biased
+        fill = "locf"
+    elif fill == "none":
+        fill = None
+
+    end_time = _as_utc(end_time) or aligned_now()
+    start_time = _as_utc(start_time) or end_time - timedelta(seconds=settings.METRICS_DEFAULT_WINDOW)
+
+    async def produce():
+        # Own session: coalesced requests may outlive this one
+        async with AsyncReadSessionLocal() as session:
+            if bucket:
+                series = await MetricsCRUD.get_metrics_bucketed(
+                    session, resource_id, start_time, end_time, bucket, agg, columns,
+                    fill, settings.METRICS_LOCF_HORIZON
+                )
+                content = {"resource_id": resource_id, "bucket": bucket, "agg": agg, "fill": fill, **series}
+            else:
+                series = await MetricsCRUD.get_metrics_downsampled(
+                    session, resource_id, start_time, end_time, max_points, columns,
+                    fill, settings.METRICS_LOCF_HORIZON
+                )
+                content = {"resource_id": resource_id, "max_points": max_points, "fill": fill, "series": series}
+        with phase("encode"):
+            if fmt == "json":
+                return orjson.dumps(content), MEDIA_TYPES[fmt]
+            return encode(series if bucket else merge_series(series), fmt), MEDIA_TYPES[fmt]
+
+    key = repr(("history", resource_id, start_time.timestamp(), end_time.timestamp(),
+                bucket, agg, max_points, tuple(columns), fill, fmt))
+    try:
+        return await response_cache.serve(key, resource_id, end_time, produce, db, if_none_match)
+    except Exception as e:
+        logger.error(f"Error retrieving metrics history: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not retrieve metrics history")
+
+@router.get("/metrics/{resource_id}/children", response_model=List[MetricsRead])
+async def get_sub_resource_metrics(
+    resource_id: str,
+    kind: Optional[Literal["cpu", "disk", "net", "proc"]] = None,
+    window: int = Query(settings.METRICS_DEFAULT_WINDOW, ge=1, le=86400),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Newest sample of each sub-resource of ``resource_id`` seen in the last ``window`` seconds.
+
+    Sub-resources are the per-core (``<id>:cpu0``), partition
+    (``<id>:disk:<mountpoint>``), interface (``<id>:net:<name>``) and
+    program (``<id>:proc:<name>``, processes grouped by name) series, with
+    names percent-encoded; their history is read like any other resource's.
+    """
+    prefix = sub_resource_id(resource_id, kind or "")
+    since = datetime.now(timezone.utc) - timedelta(seconds=window)
+    try:
+        rows = await MetricsCRUD.get_latest_sub_resources(db, prefix, since)
+    except Exception as e:
+        logger.error(f"Error retrieving sub-resource metrics: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not retrieve metrics")
+    return rows
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    return {**metrics_cache.stats(), "responses": response_cache.stats(), "latest": latest_snapshots.stats()}
+
+def _latest_row(value) -> dict:
+    """A resource_latest row in the snapshot's JSON shape."""
+    return {
+        "id": None,
+        "resource_id": value.resource_id,
+        "resource_type": value.resource_type,
+        **{name: getattr(value, name) for name in METRIC_COLUMNS},
+        "timestamp": value.timestamp.isoformat(),
+    }
+
 @router.get("/")
-async def get_latest_metrics():
+async def get_latest_metrics(resource_id: str = "system", db: AsyncSession = Depends(get_read_db)):
+    """Newest sample of one resource, the host by default.
+
+    Served from this worker's in-memory snapshot, which the collector and
+    the ingestion pipeline keep current; the last-value table answers for
+    resources this worker has not seen yet.
+    """
+    snapshot = latest_snapshots.get(resource_id)
+    if snapshot is not None:
+        return snapshot
     try:
-        return {
-            "id": 1,
-            "resource_id": "system",
-            "resource_type": "host",
-            "cpu_usage": psutil.cpu_percent(),
-            "memory_usage": psutil.virtual_memory().percent,
-            "disk_usage": psutil.disk_usage('/').percent,
-            "network_in": 0,
-            "network_out": 0,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        values = await MetricsCRUD.get_latest_values(db, resource_id=resource_id)
     except Exception as e:
         logger.error(f"Error getting latest metrics: {str(e)}")
         raise HTTPException(status_code=500, detail="Could not get latest metrics")
+    if not values:
+        raise HTTPException(status_code=404, detail=f"No metrics for {resource_id}")
+    return _latest_row(values[0])
 
-@router.post("/metrics/")
-async def create_metrics(metrics: dict):
+@router.get("/latest")
+async def get_latest_metrics_all(
+    resource_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Newest sample of every resource, from the last-value table.
+
+    Where this worker holds a newer snapshot than the table (writes lag by
+    up to LATEST_FLUSH_INTERVAL), the snapshot is returned instead.
+    """
     try:
-        return {
-            **metrics,
-            "id": 1,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        values = await MetricsCRUD.get_latest_values(db, resource_type=resource_type)
     except Exception as e:
-        logger.error(f"Error creating metrics: {str(e)}")
-        raise HTTPException(status_code=500, detail="Could not create metrics")
+        logger.error(f"Error getting latest metrics: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not get latest metrics")
+    stored = {value.resource_id: value for value in values}
+    rows = {resource_id: _latest_row(value) for resource_id, value in stored.items()}
+    for snapshot in latest_snapshots.snapshots():
+        row = snapshot.row
+        if resource_type is not None and row["resource_type"] != resource_type:
+            continue
+        value = stored.get(row["resource_id"])
+        if value is None or snapshot.epoch >= value.timestamp.timestamp():
+            rows[row["resource_id"]] = row
+    return [rows[resource_id] for resource_id in sorted(rows)]
+
+@router.post("/metrics/", status_code=status.HTTP_202_ACCEPTED)
+async def create_metrics(metrics: MetricsCreate):
+    try:
+        row = metrics_ingestor.submit(metrics)
+    except IngestionQueueFull as e:
+        logger.warning(f"Rejecting metrics for {metrics.resource_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Metrics ingestion is saturated, retry later",
+            headers={"Retry-After": str(math.ceil(metrics_ingestor.flush_interval))},
+        )
+    return {
+        **row,
+        "timestamp": row["timestamp"].isoformat()
+    }
+
+@router.post("/metrics/batch")
+async def create_metrics_batch(request: Request, db: AsyncSession = Depends(get_db)):
+    """Ingest a JSON array or NDJSON stream of samples.
+
+    The body may be gzip or deflate compressed (Content-Encoding). Samples
+    are written, committed and published in INGEST_BATCH_SIZE chunks as the
+    body is parsed, so memory stays bounded by the chunk size. Invalid items
+    are skipped and reported by their position in the body; a structurally
+    unreadable body fails the request, keeping the chunks committed before
+    the fault.
+    """
+    encoding = request.headers.get("content-encoding", "identity").strip().lower()
+    if encoding not in CONTENT_ENCODINGS:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported Content-Encoding: {encoding}",
+        )
+    body = iter_decompressed(request.stream(), encoding)
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in NDJSON_CONTENT_TYPES:
+        items = iter_ndjson(body)
+    else:
+        items = iter_json_array(body)
+
+    accepted = 0
+    errors = []
+    rejected = 0
+    pending = []
+
+    async def write_pending():
+        nonlocal accepted, rejected
+        rows, chunk_errors = validate_samples(pending)
+        pending.clear()
+        rejected += len(chunk_errors)
+        errors.extend(chunk_errors[:MAX_REPORTED_ERRORS - len(errors)])
+        ids = await MetricsCRUD.create_metrics_bulk(db, rows)
+        for row, row_id in zip(rows, ids):
+            row["id"] = row_id
+        accepted += len(rows)
+        await metrics_ingestor.publish(rows)
+
+    try:
+        async for index, item, error in items:
+            if error:
+                rejected += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"index": index, "errors": [{"loc": [], "msg": error, "type": "json_invalid"}]})
+                continue
+            pending.append((index, item))
+            if len(pending) >= settings.INGEST_BATCH_SIZE:
+                await write_pending()
+        if pending:
+            await write_pending()
+    except SampleStreamError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{str(e)} ({accepted} samples before it were stored)",
+        )
+
+    return {
+        "accepted": accepted,
+        "rejected": rejected,
+        "errors": errors,
+    }
@@ -0,0 +1,115 @@
+# services/monitoring/src/api/v1/endpoints/stream.py
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+import asyncio
+import json
+import logging
+
+from ....config import settings
+from ....database import AsyncSessionLocal
+from ....core.auth import authenticate_token, get_current_active_user
+from ....core.profiling import TimedRoute
+from ....core.streaming import StreamSubscriber, stream_hub
+from ....schemas.auth import UserRead
+
+# Browsers cannot set headers on WebSocket or EventSource requests, so these
+# routes take the access token as a query parameter and are mounted without
+# the header-based auth dependency of the metrics router.
+router = APIRouter(route_class=TimedRoute)
+logger = logging.getLogger(__name__)
+
+async def _authenticate(token: Optional[str], authorization: Optional[str] = None) -> UserRead:
+    if not token and authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    async with AsyncSessionLocal() as db:
+        user = await authenticate_token(token, db)
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+def _samples_message(batch: list, dropped: int) -> str:
+    return json.dumps({"type": "samples", "samples": batch, "dropped": dropped})
+
+async def _send_batches(websocket: WebSocket, subscriber: StreamSubscriber):
+    while True:
+        batch, dropped = await subscriber.next_batch()
+        await websocket.send_text(_samples_message(batch, dropped))
+
+@router.websocket("/stream")
+async def stream_websocket(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None),
+    resource_id: List[str] = Query([]),
+):
+    """Push new samples for the subscribed resources as they are ingested.
+
+    Clients may change their subscription with
+    ``{"subscribe": [...]}`` / ``{"unsubscribe": [...]}`` messages.
+    """
+    try:
+        await _authenticate(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscriber = stream_hub.subscribe(resource_id)
+    sender = asyncio.create_task(_send_batches(websocket, subscriber))
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                subscribe = message.get("subscribe", [])
+                unsubscribe = message.get("unsubscribe", [])
+                if not isinstance(subscribe, list) or not isinstance(unsubscribe, list):
+                    raise TypeError("subscribe/unsubscribe must be lists")
+                subscriber.resource_ids.update(map(str, subscribe))
+                subscriber.resource_ids.difference_update(map(str, unsubscribe))
+            except (ValueError, AttributeError, TypeError):
+                await websocket.send_text(json.dumps({"type": "error", "detail": "Invalid subscription message"}))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        stream_hub.unsubscribe(subscriber)
+        sender.cancel()
+        try:
+            await sender
+        except (asyncio.CancelledError, Exception):
+            pass
+
+@router.get("/stream/sse")
+async def stream_sse(
+    request: Request,
+    token: Optional[str] = Query(None),
+    resource_id: List[str] = Query([]),
+    authorization: Optional[str] = Header(None),
+):
+    """Server-sent events fallback for clients that cannot use WebSockets."""
+    await _authenticate(token, authorization)
+
+    async def events():
+        subscriber = stream_hub.subscribe(resource_id)
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                batch, dropped = await subscriber.next_batch(timeout=settings.STREAM_KEEPALIVE)
+                if batch or dropped:
+                    yield f"event: samples\ndata: {_samples_message(batch, dropped)}\n\n"
+                else:
+                    # Keeps proxies from timing out an idle stream
+                    yield ": keep-alive\n\n"
+        finally:
+            stream_hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/stream/stats", dependencies=[Depends(get_current_active_user)])
+async def get_stream_stats():
+    return stream_hub.stats()
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict, List, Literal
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "CloudScale Monitoring"
@@ -20,11 +21,141 @@ class Settings(BaseSettings):
             return self.DATABASE_URL
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    # Optional streaming replica for read-only sessions (get_read_db); reads
+    # there may lag the primary by the replication delay
+    DATABASE_READ_URL: str | None = None
+
+    # Async engine / connection pool, per worker process
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_READ_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds; replace connections before server/proxy idle limits
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared statements cached per connection; set 0 behind pgbouncer in transaction mode
+    DB_STATEMENT_CACHE_SIZE: int = 500
+
+    # Validated-token cache in get_current_user; 0 disables it
+    AUTH_CACHE_MAX_SIZE: int = 10000
+    AUTH_CACHE_TTL: int = 60  # seconds, capped by the token's exp
+
+    # bcrypt runs in a dedicated thread pool of this many workers; stored
+    # hashes with a different cost are rehashed on the next successful login
+    PASSWORD_HASH_WORKERS: int = 4
+    BCRYPT_ROUNDS: int = 12
+
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    REDIS_URL: str | None = None
+    # Shared asyncio connection pool; callers wait up to the timeout for a free connection
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 5.0  # seconds
+
+    @property
+    def REDIS_URI(self) -> str:
+        if self.REDIS_URL:
+            return self.REDIS_URL
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
+
+    # Per-worker session cache in front of Redis; 0 disables it. The TTL
+    # bounds staleness if a pub/sub invalidation is missed.
+    SESSION_CACHE_MAX_SIZE: int = 10000
+    SESSION_CACHE_TTL: int = 30  # seconds
+    SESSION_REFRESH_INTERVAL: int = 300  # seconds between sliding-expiry EXPIREs
+
+    # Live metric push (WebSocket/SSE); slow clients are coalesced to the
+    # latest sample per resource once this many samples are waiting
+    STREAM_MAX_PENDING: int = 1000
+    STREAM_KEEPALIVE: int = 15  # seconds between SSE keep-alive comments
+    STREAM_REDIS_FANOUT: bool = True  # share samples across workers via pub/sub
 
     METRICS_COLLECTION_INTERVAL: int = 60  # seconds
 
+    # Adaptive collection: samples within a per-metric deadband of the last
+    # stored one are skipped, one is stored at least every
+    # METRICS_HEARTBEAT_INTERVAL seconds, and the interval shrinks towards
+    # METRICS_MIN_COLLECTION_INTERVAL while values move fast. Deadbands are a
+    # JSON object of column -> absolute change; None uses the built-in defaults.
+    METRICS_ADAPTIVE_COLLECTION: bool = False
+    METRICS_DEADBANDS: Dict[str, float] | None = None
+    METRICS_HEARTBEAT_INTERVAL: int = 300  # seconds
+    METRICS_MIN_COLLECTION_INTERVAL: int = 5  # seconds
+    # History reads with fill=locf carry a value forward at most this long, so
+    # a resource that stopped reporting shows a gap rather than a flat line.
+    METRICS_LOCF_HORIZON: int = 600  # seconds
+    # Resources stored with deadband suppression, whose history reads default
+    # to fill=locf: fnmatch patterns for the host part of the id, e.g. "web-*"
+    # for agents run with --adaptive. The collector's own resource is included
+    # while METRICS_ADAPTIVE_COLLECTION is on; everything else reads rollups.
+    METRICS_LOCF_RESOURCES: List[str] = []
+
+    # Sub-resource series stored next to the host row, as "<host>:cpu0",
+    # "<host>:disk:<mountpoint>", "<host>:net:<interface>" and
+    # "<host>:proc:<name>" (names percent-encoded); METRICS_TOP_PROCESSES
+    # keeps the N busiest programs (processes grouped by name) by CPU and the
+    # N largest by memory, 0 turns it off
+    METRICS_COLLECT_CPU_CORES: bool = False
+    METRICS_COLLECT_PARTITIONS: bool = False
+    METRICS_COLLECT_INTERFACES: bool = False
+    METRICS_TOP_PROCESSES: int = 0
+
+    # Seconds between writes of each resource's newest sample to resource_latest
+    LATEST_FLUSH_INTERVAL: float = 2.0
+
+    # Only the elected leader samples this host, evaluates alert rules and
+    # runs storage maintenance. "redis" holds a lease with a TTL; "postgres"
+    # holds an advisory lock on a dedicated connection, for deployments
+    # without Redis; "off" makes every worker lead, for a single worker.
+    # A dead leader is replaced within LEADER_LEASE_TTL + LEADER_RETRY_INTERVAL.
+    LEADER_ELECTION: Literal["redis", "postgres", "off"] = "redis"
+    LEADER_LEASE_TTL: float = 15.0  # seconds; renewed every third of it
+    LEADER_RETRY_INTERVAL: float = 2.0  # seconds between followers' attempts
+
+    # Buffered ingestion: rows are flushed when either threshold is reached
+    INGEST_BATCH_SIZE: int = 500
+    INGEST_FLUSH_INTERVAL: float = 1.0  # seconds
+    INGEST_QUEUE_MAX_SIZE: int = 50000
+    INGEST_MAX_RETRIES: int = 3
+
+    # Recent-sample cache serving dashboard reads
+    METRICS_CACHE_WINDOW: int = 1800  # seconds kept per resource
+    METRICS_CACHE_SAMPLES_PER_RESOURCE: int = 1024
+    METRICS_CACHE_MAX_SAMPLES: int = 500000  # across all resources
+    METRICS_DEFAULT_WINDOW: int = 900  # seconds, when a read gives no start_time
+
+    # HTTP caching of metric reads. Windows ending more than RESPONSE_CACHE_SETTLE
+    # seconds ago are treated as closed and may be reused by the browser for
+    # RESPONSE_CACHE_CLOSED_MAX_AGE, kept short because backfilled samples still
+    # land in them; open windows are revalidated against the latest sample.
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_ALIGN: int = 10  # seconds; defaulted window ends are rounded up to this
+    RESPONSE_CACHE_SETTLE: int = 300  # seconds
+    RESPONSE_CACHE_CLOSED_MAX_AGE: int = 60  # seconds
+
+    # Opt-in request profiling: Server-Timing phase headers, statement timing,
+    # and a PROFILE_SAMPLE_RATE fraction of requests profiled into PROFILE_DIR
+    # (pyinstrument HTML when installed, cProfile stats otherwise)
+    PROFILING_ENABLED: bool = False
+    # The slow-query log is on regardless of PROFILING_ENABLED
+    SLOW_QUERY_THRESHOLD_MS: float = 250.0  # 0 disables the slow-query log
+    SLOW_QUERY_EXPLAIN: bool = True  # log the EXPLAIN plan of slow SELECTs
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_DIR: str = "/tmp/cloudscale-profiles"
+
+    # Alert rules evaluated on ingestion, as a JSON list of
+    # {"name", "expression", "severity"}; defaults mirror the dashboard thresholds
+    ALERT_RULES: List[Dict[str, str]] | None = None
+    ALERT_FLUSH_INTERVAL: float = 5.0  # seconds
+    ALERT_MAX_PENDING: int = 10000  # queued changes before coalescing while writes fail
+
+    # resource_metrics storage layout (applied by migrations / maintenance)
+    METRICS_CHUNK_INTERVAL_DAYS: int = 1
+    METRICS_COMPRESS_AFTER_DAYS: int = 7
+    METRICS_RETENTION_DAYS: int = 90
+    ROLLUP_FLUSH_INTERVAL: float = 10.0  # seconds, in-app rollups only
+
     class Config:
         case_sensitive = True
         env_file = ".env"
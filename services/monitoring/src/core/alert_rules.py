@@ -0,0 +1,339 @@
+# services/monitoring/src/core/alert_rules.py
+import asyncio
+import logging
+import operator
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..config import settings
+from ..crud.metrics import MetricsCRUD
+from ..database import AsyncSessionLocal
+from ..models.metrics import METRIC_COLUMNS
+from .metrics_cache import to_epoch
+
+logger = logging.getLogger(__name__)
+
+# Mirrors the dashboard's warning/critical thresholds
+DEFAULT_ALERT_RULES = [
+    {"name": "cpu_usage_warning", "expression": "cpu_usage > 70 for 5m", "severity": "warning"},
+    {"name": "cpu_usage_critical", "expression": "cpu_usage > 90 for 5m", "severity": "critical"},
+    {"name": "memory_usage_warning", "expression": "memory_usage > 80 for 5m", "severity": "warning"},
+    {"name": "memory_usage_critical", "expression": "memory_usage > 90 for 5m", "severity": "critical"},
+    {"name": "disk_usage_warning", "expression": "disk_usage > 85", "severity": "warning"},
+    {"name": "disk_usage_critical", "expression": "disk_usage > 95", "severity": "critical"},
+]
+
+RULE_PATTERN = re.compile(
+    r"^\s*(?:rate\(\s*(?P<rate_metric>\w+)\s*\)|(?P<metric>\w+))"
+    r"\s*(?P<op>>=|<=|==|!=|>|<)\s*"
+    r"(?P<threshold>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+    r"(?:\s+for\s+(?P<duration>\d+(?:\.\d+)?)(?P<unit>[smhd]))?\s*$"
+)
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+FIRE = "fire"
+RESOLVE = "resolve"
+
+
+class AlertRuleError(ValueError):
+    """Raised for a rule expression that cannot be parsed or names an unknown metric."""
+
+
+class AlertRule:
+    """A parsed rule such as ``cpu_usage > 90 for 5m`` or ``rate(network_in) > 1e6``.
+
+    ``rate(m)`` compares the per-second change between consecutive samples
+    of a resource; ``for <n><s|m|h|d>`` requires the condition to hold on
+    every sample for that long before the alert fires.
+    """
+
+    __slots__ = ("name", "expression", "severity", "metric", "rate", "op", "threshold", "duration")
+
+    def __init__(self, name: str, expression: str, severity: str = "warning"):
+        match = RULE_PATTERN.match(expression)
+        if match is None:
+            raise AlertRuleError(f"Invalid alert rule {name!r}: {expression!r}")
+        metric = match["rate_metric"] or match["metric"]
+        if metric not in METRIC_COLUMNS:
+            raise AlertRuleError(
+                f"Unknown metric {metric!r} in alert rule {name!r}; expected one of {', '.join(METRIC_COLUMNS)}"
+            )
+        self.name = name
+        self.expression = expression.strip()
+        self.severity = severity
+        self.rate = match["rate_metric"] is not None
+        self.metric = metric
+        self.op = OPERATORS[match["op"]]
+        self.threshold = float(match["threshold"])
+        self.duration = float(match["duration"]) * UNITS[match["unit"]] if match["duration"] else 0.0
+
+    def __repr__(self) -> str:
+        return f"AlertRule({self.name!r}, {self.expression!r})"
+
+
+class AlertEvent:
+    __slots__ = ("kind", "resource_id", "rule", "value", "timestamp")
+
+    def __init__(self, kind: str, resource_id: str, rule: AlertRule, value: float, timestamp: float):
+        self.kind = kind
+        self.resource_id = resource_id
+        self.rule = rule
+        self.value = value
+        self.timestamp = timestamp
+
+
+class _ResourceState:
+    """Sliding-window state for one resource across all rules."""
+
+    __slots__ = ("last_ts", "last_values", "breach_since", "firing")
+
+    def __init__(self, metric_count: int, rule_count: int):
+        self.last_ts: Optional[float] = None
+        self.last_values: List[Optional[float]] = [None] * metric_count
+        # Per rule: when the current unbroken breach started, and whether it fired
+        self.breach_since: List[Optional[float]] = [None] * rule_count
+        self.firing: List[bool] = [False] * rule_count
+
+
+class AlertEvaluator:
+    """Evaluates a fixed rule set incrementally, one sample at a time.
+
+    Rules are compiled once into flat tuples indexed by metric slot, so each
+    sample costs one dict lookup per distinct metric plus a comparison per
+    rule. Only transitions are emitted: a rule fires once when its condition
+    has held for its duration and resolves once when it stops holding.
+    """
+
+    def __init__(self, rules: Iterable[AlertRule]):
+        self.rules = list(rules)
+        self.metrics = sorted({rule.metric for rule in self.rules})
+        slots = {metric: i for i, metric in enumerate(self.metrics)}
+        self._checks = [
+            (i, slots[rule.metric], rule.rate, rule.op, rule.threshold, rule.duration)
+            for i, rule in enumerate(self.rules)
+        ]
+        self._states: Dict[str, _ResourceState] = {}
+
+    def evaluate(self, row: Dict[str, Any]) -> List[AlertEvent]:
+        resource_id = row["resource_id"]
+        ts = row["timestamp"]
+        # Rows relayed by the stream hub carry ISO timestamps
+        ts = to_epoch(datetime.fromisoformat(ts) if isinstance(ts, str) else ts)
+        state = self._states.get(resource_id)
+        if state is None:
+            state = self._states[resource_id] = _ResourceState(len(self.metrics), len(self.rules))
+        elif state.last_ts is not None and ts <= state.last_ts:
+            # Late or duplicate sample: window state only moves forward
+            return []
+
+        values = [row.get(metric) for metric in self.metrics]
+        previous = state.last_values
+        elapsed = ts - state.last_ts if state.last_ts is not None else 0.0
+        breach_since = state.breach_since
+        firing = state.firing
+        events = []
+
+        for i, slot, is_rate, op, threshold, duration in self._checks:
+            value = values[slot]
+            if value is None:
+                continue
+            if is_rate:
+                before = previous[slot]
+                if before is None or elapsed <= 0:
+                    continue
+                value = (value - before) / elapsed
+
+            if op(value, threshold):
+                since = breach_since[i]
+                if since is None:
+                    since = breach_since[i] = ts
+                if not firing[i] and ts - since >= duration:
+                    firing[i] = True
+                    events.append(AlertEvent(FIRE, resource_id, self.rules[i], value, ts))
+            else:
+                breach_since[i] = None
+                if firing[i]:
+                    firing[i] = False
+                    events.append(AlertEvent(RESOLVE, resource_id, self.rules[i], value, ts))
+
+        state.last_ts = ts
+        state.last_values = values
+        return events
+
+    def mark_firing(self, resource_id: str, rule_name: str) -> bool:
+        """Restore an alert that is already open so it is not raised again."""
+        for i, rule in enumerate(self.rules):
+            if rule.name == rule_name:
+                state = self._states.get(resource_id)
+                if state is None:
+                    state = self._states[resource_id] = _ResourceState(len(self.metrics), len(self.rules))
+                state.firing[i] = True
+                return True
+        return False
+
+    @property
+    def resource_count(self) -> int:
+        return len(self._states)
+
+
+def load_rules(definitions: Optional[List[Dict[str, str]]] = None) -> List[AlertRule]:
+    definitions = definitions or settings.ALERT_RULES or DEFAULT_ALERT_RULES
+    return [
+        AlertRule(item["name"], item["expression"], item.get("severity", "warning"))
+        for item in definitions
+    ]
+
+
+class AlertEngine:
+    """Evaluates rules against ingested samples and persists alert changes.
+
+    Runs in the leader only, as a stream hub watcher so it sees samples
+    ingested by every worker; fired and resolved alerts are queued and
+    written every ``flush_interval`` seconds, one multi-row INSERT for new
+    alerts and one bulk UPDATE for resolutions. While writes fail, queued
+    changes beyond ``max_pending`` are coalesced per (resource, rule).
+    """
+
+    def __init__(
+        self,
+        rules: Optional[List[AlertRule]] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self.evaluator = AlertEvaluator(rules if rules is not None else load_rules())
+        self.flush_interval = flush_interval or settings.ALERT_FLUSH_INTERVAL
+        self.max_pending = max_pending or settings.ALERT_MAX_PENDING
+        self.is_running = False
+        self._pending: List[AlertEvent] = []
+        # (resource_id, rule name) -> id of the open alert row
+        self._open: Dict[Tuple[str, str], int] = {}
+        self._stop_event = asyncio.Event()
+
+        self.alerts_fired = 0
+        self.alerts_resolved = 0
+        self.events_coalesced = 0
+
+    def add_rows(self, rows: Iterable[Dict[str, Any]]):
+        """Ingestion listener or stream hub watcher: evaluate committed rows."""
+        evaluate = self.evaluator.evaluate
+        for row in rows:
+            events = evaluate(row)
+            if events:
+                self._pending.extend(events)
+
+    async def restore(self):
+        """Pick up alerts left open by a previous run so they are not duplicated."""
+        async with AsyncSessionLocal() as db:
+            for alert in await MetricsCRUD.get_open_alerts(db):
+                if self.evaluator.mark_firing(alert.resource_id, alert.alert_type):
+                    self._open[(alert.resource_id, alert.alert_type)] = alert.id
+
+    async def flush(self):
+        if not self._pending:
+            return
+        events, self._pending = self._pending, []
+
+        created: List[Dict[str, Any]] = []
+        unflushed: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        resolutions: List[Dict[str, Any]] = []
+        resolved_keys: List[Tuple[str, str]] = []
+        for event in events:
+            key = (event.resource_id, event.rule.name)
+            at = datetime.fromtimestamp(event.timestamp, tz=timezone.utc)
+            if event.kind == FIRE:
+                row = {
+                    "resource_id": event.resource_id,
+                    "alert_type": event.rule.name,
+                    "severity": event.rule.severity,
+                    "message": f"{event.rule.expression} (value {event.value:.2f})",
+                    "timestamp": at,
+                    "resolved": None,
+                }
+                created.append(row)
+                unflushed[key] = row
+            elif key in unflushed:
+                # Fired and resolved within one flush: write it already closed
+                unflushed.pop(key)["resolved"] = at
+            elif key in self._open:
+                resolutions.append({"id": self._open[key], "resolved": at})
+                resolved_keys.append(key)
+
+        try:
+            async with AsyncSessionLocal() as db:
+                ids = await MetricsCRUD.create_alerts_bulk(db, created, commit=False)
+                await MetricsCRUD.resolve_alerts_bulk(db, resolutions, commit=False)
+                await db.commit()
+        except Exception:
+            # Keep the transitions for the next attempt
+            self._pending = events + self._pending
+            if len(self._pending) > self.max_pending:
+                self._coalesce()
+            raise
+
+        for key in resolved_keys:
+            self._open.pop(key, None)
+        for row, alert_id in zip(created, ids):
+            if row["resolved"] is None:
+                self._open[(row["resource_id"], row["alert_type"])] = alert_id
+        self.alerts_fired += len(created)
+        self.alerts_resolved += len(resolutions) + sum(1 for row in created if row["resolved"])
+
+    def _coalesce(self):
+        """Keep the first and, if it differs in kind, the last change per (resource, rule).
+
+        An alert that fired and resolved repeatedly is then written as one
+        alert spanning those episodes, and the open/resolved state after the
+        flush is the same as if every change had been written.
+        """
+        first: Dict[Tuple[str, str], AlertEvent] = {}
+        last: Dict[Tuple[str, str], AlertEvent] = {}
+        for event in self._pending:
+            key = (event.resource_id, event.rule.name)
+            first.setdefault(key, event)
+            last[key] = event
+        kept = []
+        for key, event in first.items():
+            kept.append(event)
+            if last[key].kind != event.kind:
+                kept.append(last[key])
+        self.events_coalesced += len(self._pending) - len(kept)
+        self._pending = kept
+
+    async def start(self):
+        """Flush queued alert changes periodically until stopped."""
+        self.is_running = True
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.error(f"Error writing alerts: {str(e)}")
+        finally:
+            self.is_running = False
+
+    async def stop(self):
+        self._stop_event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rules": len(self.evaluator.rules),
+            "resources": self.evaluator.resource_count,
+            "open_alerts": len(self._open),
+            "pending_events": len(self._pending),
+            "events_coalesced": self.events_coalesced,
+            "alerts_fired": self.alerts_fired,
+            "alerts_resolved": self.alerts_resolved,
+        }
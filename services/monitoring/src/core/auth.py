@@ -1,29 +1,229 @@
 # src/core/auth.py
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Dict, Optional, Set, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from redis.asyncio import Redis
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
 from ..database import get_db
 from ..crud.users import get_user_by_username
-from ..schemas.auth import TokenData
+from ..schemas.auth import TokenData, UserRead
+from .redis_client import redis_client
+import hashlib
+import logging
 import os
+import time
+
+logger = logging.getLogger(__name__)
 
 # to be moved to environment variables
 SECRET_KEY = "your-secret-key-here"  # In production, use a secure secret key
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min/max to the configured cost makes passlib flag any other cost
+# for rehashing, in either direction
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+class TokenCache:
+    """Bounded TTL cache of validated access tokens to user principals.
+
+    Entries are keyed by a hash of the token, never outlive the token's own
+    ``exp`` claim, and can be dropped per user when an account changes.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, UserRead]]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[UserRead]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                self._discard(key, entry[1].id)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, token: str, principal: UserRead, token_exp: float):
+        if self.max_size <= 0:
+            return
+        key = self._key(token)
+        self._entries[key] = (min(time.time() + self.ttl, token_exp), principal)
+        self._entries.move_to_end(key)
+        self._by_user.setdefault(principal.id, set()).add(key)
+        while len(self._entries) > self.max_size:
+            old_key, (_, old_principal) = self._entries.popitem(last=False)
+            self._discard(old_key, old_principal.id)
+
+    def invalidate_user(self, user_id: int):
+        for key in self._by_user.pop(user_id, set()):
+            self._entries.pop(key, None)
+
+    def _discard(self, key: str, user_id: int):
+        self._entries.pop(key, None)
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
+
+    def clear(self):
+        self._entries.clear()
+        self._by_user.clear()
+
+token_cache = TokenCache(settings.AUTH_CACHE_MAX_SIZE, settings.AUTH_CACHE_TTL)
+
+TOKEN_INVALIDATION_CHANNEL = "auth:invalidate"
+
+class TokenInvalidator:
+    """Drops a user's cached principals in every worker.
+
+    Invalidations apply to this worker's cache at once and are broadcast
+    over Redis pub/sub; each worker's listener applies the others'. After a
+    lost subscription the whole cache is cleared, since invalidations may
+    have been missed.
+    """
+
+    def __init__(self, client: Optional[Redis] = None, cache: Optional[TokenCache] = None):
+        self.redis = client or redis_client
+        self.cache = cache
+        self._stop_event = asyncio.Event()
+        self.is_listening = False
+
+    def _cache(self) -> TokenCache:
+        return self.cache if self.cache is not None else token_cache
+
+    async def invalidate(self, user_id: int):
+        self._cache().invalidate_user(user_id)
+        try:
+            await self.redis.publish(TOKEN_INVALIDATION_CHANNEL, str(user_id))
+        except Exception as e:
+            # Other workers' entries still expire after AUTH_CACHE_TTL
+            logger.error(f"Error publishing token invalidation: {str(e)}")
+
+    async def start(self):
+        """Apply invalidations published by other workers until stopped."""
+        self.is_listening = True
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    await self._listen()
+                except Exception as e:
+                    logger.error(f"Token invalidation listener failed: {str(e)}")
+                    self._cache().clear()
+                    try:
+                        await asyncio.wait_for(self._stop_event.wait(), timeout=1.0)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self.is_listening = False
+
+    async def _listen(self):
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(TOKEN_INVALIDATION_CHANNEL)
+            while not self._stop_event.is_set():
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None:
+                    self._cache().invalidate_user(int(message["data"]))
+        finally:
+            await pubsub.aclose()
+
+    async def stop(self):
+        self._stop_event.set()
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+token_invalidator = TokenInvalidator()
+
+async def invalidate_user_tokens(user_id: int):
+    """Forget cached principals for a user, in every worker, after it is updated or deleted."""
+    await token_invalidator.invalidate(user_id)
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated, bounded thread pool.
+
+    bcrypt releases the GIL, so hashing here keeps the event loop responsive
+    while at most ``max_workers`` hashes run at once; further calls wait in
+    the pool's queue and that wait is recorded.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int):
+        self.context = context
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self.pending = 0
+        self.completed = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    async def _run(self, func: Callable, *args):
+        submitted = time.perf_counter()
+
+        def timed():
+            return time.perf_counter() - submitted, func(*args)
+
+        self.pending += 1
+        try:
+            waited, result = await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self.pending -= 1
+        # Counters are only touched on the event loop thread
+        self.completed += 1
+        self.queue_wait_total += waited
+        self.queue_wait_max = max(self.queue_wait_max, waited)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Check a password; also return a new hash when the stored one uses outdated settings."""
+        return await self._run(self.context.verify_and_update, password, hashed)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "completed": self.completed,
+            "queue_wait_avg": self.queue_wait_total / self.completed if self.completed else 0.0,
+            "queue_wait_max": self.queue_wait_max,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+password_hasher = PasswordHasher(pwd_context, settings.PASSWORD_HASH_WORKERS)
+
+async def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Returns (valid, new_hash); new_hash is set when the stored hash should be replaced."""
+    return await password_hasher.verify_and_update(plain_password, hashed_password)
+
+async def get_password_hash(password: str) -> str:
+    return await password_hasher.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -38,7 +238,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
-):
+) -> UserRead:
+    return await authenticate_token(token, db)
+
+async def authenticate_token(token: str, db: AsyncSession) -> UserRead:
+    """Resolve a bearer token to its user; raises 401 if it is not valid.
+
+    Also used where the token cannot arrive in a header (WebSocket, SSE).
+    """
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -55,7 +266,10 @@ async def get_current_user(
     user = await get_user_by_username(db, username=token_data.username)
     if user is None:
         raise credentials_exception
-    return user
+
+    principal = UserRead.model_validate(user)
+    token_cache.set(token, principal, payload.get("exp", 0))
+    return principal
 
 async def get_current_active_user(current_user = Depends(get_current_user)):
     if not current_user.is_active:
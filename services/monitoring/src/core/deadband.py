@@ -0,0 +1,111 @@
+# services/monitoring/src/core/deadband.py
+from typing import Any, Dict, List, Mapping, Optional
+
+# Smallest change per metric worth storing: percentage points for the usage
+# columns, bytes per second for network throughput
+DEFAULT_DEADBANDS = {
+    "cpu_usage": 2.0,
+    "memory_usage": 1.0,
+    "disk_usage": 0.5,
+    "network_in": 50_000.0,
+    "network_out": 50_000.0,
+}
+
+class DeadbandFilter:
+    """Change-based suppression and adaptive sampling for one series.
+
+    A sample is stored only when some metric moved more than its deadband
+    since the last stored sample, or when ``heartbeat`` seconds have passed
+    since then; readers carry the last stored value forward (LOCF), so the
+    heartbeat also tells a quiet series apart from a silent one. When a
+    change ends a suppressed stretch, the last suppressed sample is stored
+    too, so the plateau's end and the step are both kept.
+
+    ``interval`` halves, down to ``min_interval``, while any metric moves
+    fast enough to cross its deadband within ``base_interval``, and doubles
+    back towards ``base_interval`` once values settle.
+    """
+
+    def __init__(
+        self,
+        deadbands: Optional[Mapping[str, float]] = None,
+        heartbeat: float = 300.0,
+        base_interval: float = 60.0,
+        min_interval: float = 5.0,
+    ):
+        self.deadbands = dict(DEFAULT_DEADBANDS if deadbands is None else deadbands)
+        self.heartbeat = heartbeat
+        self.base_interval = base_interval
+        self.min_interval = min(min_interval, base_interval)
+        self.interval = base_interval
+        self._stored: Optional[Dict[str, Any]] = None
+        self._previous: Optional[Dict[str, Any]] = None
+        self._previous_suppressed = False
+
+    @staticmethod
+    def _moved(a: Optional[float], b: Optional[float], deadband: float) -> bool:
+        if a is None or b is None:
+            return a is not b
+        return abs(a - b) > deadband
+
+    def _adapt(self, sample: Dict[str, Any]):
+        previous = self._previous
+        if previous is None:
+            return
+        elapsed = (sample["timestamp"] - previous["timestamp"]).total_seconds()
+        if elapsed <= 0:
+            return
+        # Change projected over one base interval
+        scale = self.base_interval / elapsed
+        fast = any(
+            sample.get(name) is not None and previous.get(name) is not None
+            and abs(sample[name] - previous[name]) * scale > deadband
+            for name, deadband in self.deadbands.items()
+        )
+        if fast:
+            self.interval = max(self.min_interval, self.interval / 2)
+        else:
+            self.interval = min(self.base_interval, self.interval * 2)
+
+    def offer(self, sample: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Samples to store for this observation, oldest first; often none."""
+        self._adapt(sample)
+        stored = self._stored
+        if stored is None:
+            emit = [sample]
+        elif any(self._moved(sample.get(name), stored.get(name), deadband)
+                 for name, deadband in self.deadbands.items()):
+            emit = [self._previous, sample] if self._previous_suppressed else [sample]
+        elif (sample["timestamp"] - stored["timestamp"]).total_seconds() >= self.heartbeat:
+            emit = [sample]
+        else:
+            emit = []
+
+        self._previous = sample
+        self._previous_suppressed = not emit
+        if emit:
+            self._stored = sample
+        return emit
+
+
+class DeadbandGroup:
+    """A DeadbandFilter per resource_id for series sampled together each tick.
+
+    Filters of series absent from a tick are dropped, so a process that
+    leaves the top-N list and comes back later starts a fresh series.
+    """
+
+    def __init__(self, **filter_options: Any):
+        self._filter_options = filter_options
+        self._filters: Dict[str, DeadbandFilter] = {}
+
+    def offer(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        filters = self._filters
+        current = {}
+        samples = []
+        for row in rows:
+            deadband = filters.get(row["resource_id"]) or DeadbandFilter(**self._filter_options)
+            current[row["resource_id"]] = deadband
+            samples.extend(deadband.offer(row))
+        self._filters = current
+        return samples
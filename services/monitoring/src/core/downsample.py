@@ -0,0 +1,60 @@
+# services/monitoring/src/core/downsample.py
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+
+def lttb(x: Sequence[float], y: Sequence[float], threshold: int) -> List[int]:
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the indices of at most ``threshold`` points that preserve the
+    visual shape of the series. ``x`` must be sorted ascending.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        # Average point of the next bucket is the third triangle vertex
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_len = avg_end - avg_start
+        avg_x = sum(x[avg_start:avg_end]) / avg_len
+        avg_y = sum(y[avg_start:avg_end]) / avg_len
+
+        ax, ay = x[a], y[a]
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        max_area = -1.0
+        next_a = range_start
+        for j in range(range_start, range_end):
+            area = abs((ax - avg_x) * (y[j] - ay) - (ax - x[j]) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                next_a = j
+        selected.append(next_a)
+        a = next_a
+
+    selected.append(n - 1)
+    return selected
+
+
+def extreme_points(buckets: Iterable[Tuple[Any, Optional[float], Any, Optional[float]]]) -> List[Tuple[Any, float]]:
+    """Flatten per-bucket ``(min time, min, max time, max)`` into a time-ordered series.
+
+    Used to pre-aggregate in SQL before LTTB: a bucket's minimum and maximum
+    are the points LTTB would pick from it, so keeping only those bounds the
+    input at two points per bucket. Buckets are expected in time order.
+    """
+    points = []
+    for min_at, low, max_at, high in buckets:
+        if low is None:
+            continue
+        if min_at == max_at:
+            points.append((min_at, low))
+        elif min_at < max_at:
+            points += [(min_at, low), (max_at, high)]
+        else:
+            points += [(max_at, high), (min_at, low)]
+    return points
@@ -0,0 +1,226 @@
+# services/monitoring/src/core/host_detail.py
+import heapq
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+import psutil
+
+from .host_sampler import _cpu_busy_and_total
+
+# Per-core, per-partition, per-interface and per-process series are stored
+# as sub-resources of the host: rows in resource_metrics whose resource_id is
+# "<host>:<kind>:<name>", so they share the schema, indexes and queries of
+# the host row. Names are percent-encoded, so "/" is "%2F" and "/var/lib"
+# is "%2Fvar%2Flib", and unquote() gives the mountpoint back. Columns that
+# do not apply are None. Partition rows carry only disk_usage: the schema has
+# no disk I/O columns, and borrowing network_in/network_out would let
+# throughput alert rules fire on disk traffic.
+
+SUB_RESOURCE_SEPARATOR = ":"
+# models.metrics.METRIC_COLUMNS, which the agent cannot import (it pulls in the database)
+COLUMNS = ("cpu_usage", "memory_usage", "disk_usage", "network_in", "network_out")
+
+logger = logging.getLogger(__name__)
+
+def sub_resource_id(parent: str, *parts: str) -> str:
+    return SUB_RESOURCE_SEPARATOR.join((parent, *parts))
+
+def _escape(name: str) -> str:
+    """A mountpoint, interface or process name as an id segment.
+
+    Reversible, so distinct names never share a series: everything but
+    letters, digits and ``_.-~`` is percent-encoded, separators included.
+    """
+    return quote(name, safe="")
+
+def _row(resource_id: str, resource_type: str, timestamp: datetime, **values: float) -> Dict[str, Any]:
+    row = {"resource_id": resource_id, "resource_type": resource_type, "timestamp": timestamp}
+    for name in COLUMNS:
+        row[name] = values.get(name)
+    return row
+
+def _rate(current: float, previous: float, elapsed: float) -> float:
+    # Counters reset when a device or interface is re-created
+    return max(0.0, current - previous) / elapsed if elapsed > 0 else 0.0
+
+
+class CpuCores:
+    """Utilisation of each logical CPU since the previous call."""
+
+    kind = "cpu"
+
+    def __init__(self):
+        self._last = psutil.cpu_times(percpu=True)
+
+    def collect(self, parent: str, timestamp: datetime) -> List[Dict[str, Any]]:
+        current = psutil.cpu_times(percpu=True)
+        previous, self._last = self._last, current
+        rows = []
+        for index, (now, before) in enumerate(zip(current, previous)):
+            busy_now, total_now = _cpu_busy_and_total(now)
+            busy_before, total_before = _cpu_busy_and_total(before)
+            elapsed = total_now - total_before
+            usage = min(100.0, max(0.0, (busy_now - busy_before) / elapsed * 100)) if elapsed > 0 else 0.0
+            rows.append(_row(sub_resource_id(parent, f"cpu{index}"), "cpu", timestamp, cpu_usage=round(usage, 1)))
+        return rows
+
+
+class Partitions:
+    """Space used on each mounted partition.
+
+    A device mounted several times (bind mounts) is reported once, under its
+    shortest mountpoint.
+    """
+
+    kind = "disk"
+
+    def collect(self, parent: str, timestamp: datetime) -> List[Dict[str, Any]]:
+        rows = []
+        seen = set()
+        for partition in sorted(psutil.disk_partitions(all=False), key=lambda p: len(p.mountpoint)):
+            if partition.device in seen:
+                continue
+            seen.add(partition.device)
+            try:
+                usage = psutil.disk_usage(partition.mountpoint)
+            except OSError:
+                # Unmounted since listing, or not readable by this user
+                continue
+            rows.append(_row(
+                sub_resource_id(parent, self.kind, _escape(partition.mountpoint)), "partition", timestamp,
+                disk_usage=usage.percent,
+            ))
+        return rows
+
+
+class Interfaces:
+    """Receive and send throughput of each network interface."""
+
+    kind = "net"
+
+    def __init__(self, exclude: Sequence[str] = ("lo",)):
+        self.exclude = set(exclude)
+        self._last = psutil.net_io_counters(pernic=True)
+        self._last_time = time.monotonic()
+
+    def collect(self, parent: str, timestamp: datetime) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        elapsed, self._last_time = now - self._last_time, now
+        current = psutil.net_io_counters(pernic=True)
+        previous, self._last = self._last, current
+        return [
+            _row(
+                sub_resource_id(parent, self.kind, _escape(name)), "interface", timestamp,
+                network_in=_rate(counters.bytes_recv, previous[name].bytes_recv, elapsed),
+                network_out=_rate(counters.bytes_sent, previous[name].bytes_sent, elapsed),
+            )
+            for name, counters in current.items()
+            if name not in self.exclude and name in previous
+        ]
+
+
+class TopProcesses:
+    """The ``count`` busiest programs by CPU and the ``count`` largest by memory.
+
+    Processes are grouped by name, so eight ``postgres`` backends are one
+    series and a program keeps its series across restarts; keying by pid
+    would make every short-lived process a new resource that nothing ever
+    forgets. One pass over the process table per call. psutil.Process
+    objects are kept across calls with their name, so a known process costs
+    two small /proc reads (stat for CPU times, statm for memory) and a new
+    one a name read on top. The two reads hit different files, so
+    ``oneshot()`` would only add overhead here. CPU is the share of the
+    whole host, like the host row, and memory the share of physical memory.
+    """
+
+    kind = "proc"
+
+    def __init__(self, count: int):
+        self.count = count
+        # pid -> (process, user + system CPU seconds at the previous call, id segment)
+        self._processes: Dict[int, Tuple[psutil.Process, float, str]] = {}
+        self._last_time = time.monotonic()
+        self._cpu_count = psutil.cpu_count() or 1
+        self._total_memory = psutil.virtual_memory().total
+
+    def scan(self) -> Dict[str, Tuple[float, int]]:
+        """``name -> (cpu percent, rss)`` summed over every readable process of that name."""
+        now = time.monotonic()
+        elapsed, self._last_time = now - self._last_time, now
+        scale = 100.0 / (elapsed * self._cpu_count) if elapsed > 0 else 0.0
+        known = self._processes
+        current: Dict[int, Tuple[psutil.Process, float, str]] = {}
+        groups: Dict[str, Tuple[float, int]] = {}
+        for pid in psutil.pids():
+            entry = known.get(pid)
+            try:
+                process = entry[0] if entry else psutil.Process(pid)
+                cpu = process.cpu_times()
+                rss = process.memory_info().rss
+                total = cpu.user + cpu.system
+                # CPU time going backwards means the pid was reused
+                if entry is None or total < entry[1]:
+                    cpu_percent = 0.0
+                    name = _escape(process.name())
+                else:
+                    cpu_percent = (total - entry[1]) * scale
+                    name = entry[2]
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            current[pid] = (process, total, name)
+            group = groups.get(name)
+            groups[name] = (cpu_percent, rss) if group is None else (group[0] + cpu_percent, group[1] + rss)
+        self._processes = current
+        return groups
+
+    def collect(self, parent: str, timestamp: datetime) -> List[Dict[str, Any]]:
+        groups = self.scan()
+        top = set(heapq.nlargest(self.count, groups, key=lambda name: groups[name][0]))
+        top.update(heapq.nlargest(self.count, groups, key=lambda name: groups[name][1]))
+        return [
+            _row(
+                sub_resource_id(parent, self.kind, name), "process", timestamp,
+                cpu_usage=round(min(100.0, groups[name][0]), 1),
+                memory_usage=round(groups[name][1] / self._total_memory * 100, 2),
+            )
+            for name in sorted(top)
+        ]
+
+
+class HostDetailSampler:
+    """Runs the enabled sub-resource collectors; blocking, like HostSampler."""
+
+    def __init__(
+        self,
+        resource_id: str = "system",
+        cpu_cores: bool = False,
+        partitions: bool = False,
+        interfaces: bool = False,
+        top_processes: int = 0,
+    ):
+        self.resource_id = resource_id
+        self.collectors: List[Any] = []
+        if cpu_cores:
+            self.collectors.append(CpuCores())
+        if partitions:
+            self.collectors.append(Partitions())
+        if interfaces:
+            self.collectors.append(Interfaces())
+        if top_processes > 0:
+            self.collectors.append(TopProcesses(top_processes))
+
+    def __bool__(self) -> bool:
+        return bool(self.collectors)
+
+    def sample(self, timestamp: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        timestamp = timestamp or datetime.now().astimezone()
+        rows = []
+        for collector in self.collectors:
+            try:
+                rows.extend(collector.collect(self.resource_id, timestamp))
+            except Exception as e:
+                logger.error(f"Error collecting {collector.kind} metrics: {str(e)}")
+        return rows
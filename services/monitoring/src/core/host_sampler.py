@@ -0,0 +1,144 @@
+# services/monitoring/src/core/host_sampler.py
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# The resource the server's own collector reports as
+DEFAULT_RESOURCE_ID = "system"
+
+def _cpu_busy_and_total(times) -> tuple:
+    total = sum(times)
+    # guest time is already accounted for in user/nice on Linux
+    total -= getattr(times, "guest", 0) + getattr(times, "guest_nice", 0)
+    idle = times.idle + getattr(times, "iowait", 0)
+    return total - idle, total
+
+class HostSampler:
+    """Reads psutil counters into one metrics row per call.
+
+    Rates (CPU utilisation, network throughput) are computed from the deltas
+    since the previous call, so a sampler must not be shared between loops.
+    """
+
+    def __init__(self, resource_id: str = DEFAULT_RESOURCE_ID, resource_type: str = "host"):
+        self.resource_id = resource_id
+        self.resource_type = resource_type
+        self._initial_network_io = psutil.net_io_counters()
+        self._last_network_io = self._initial_network_io
+        self._last_cpu_times = psutil.cpu_times()
+        self._last_collection_time = datetime.now()
+
+    def _cpu_usage(self) -> Dict[str, float]:
+        """CPU utilisation since the previous sample, computed from cpu_times deltas."""
+        current = psutil.cpu_times()
+        previous, self._last_cpu_times = self._last_cpu_times, current
+
+        busy_now, total_now = _cpu_busy_and_total(current)
+        busy_prev, total_prev = _cpu_busy_and_total(previous)
+        elapsed = total_now - total_prev
+        if elapsed <= 0:
+            return {"usage": 0.0, "user": 0.0, "system": 0.0, "idle": 100.0}
+
+        def percent(delta: float) -> float:
+            return round(min(100.0, max(0.0, delta / elapsed * 100)), 1)
+
+        return {
+            "usage": percent(busy_now - busy_prev),
+            "user": percent(current.user - previous.user),
+            "system": percent(current.system - previous.system),
+            "idle": percent(current.idle - previous.idle),
+        }
+
+    def sample(self) -> Optional[Dict[str, Any]]:
+        """Read psutil counters; blocking, so async callers run it in a thread."""
+        try:
+            current_time = datetime.now()
+            time_delta = (current_time - self._last_collection_time).total_seconds()
+
+            # CPU metrics
+            cpu_times = self._cpu_usage()
+            cpu_count = psutil.cpu_count()
+            cpu_freq = psutil.cpu_freq()
+
+            # Memory metrics
+            memory = psutil.virtual_memory()
+            swap = psutil.swap_memory()
+
+            # Disk metrics
+            disk = psutil.disk_usage('/')
+            disk_io = psutil.disk_io_counters()
+
+            # Network metrics
+            current_network_io = psutil.net_io_counters()
+
+            # Calculate network speeds
+            bytes_sent = current_network_io.bytes_sent - self._last_network_io.bytes_sent
+            bytes_recv = current_network_io.bytes_recv - self._last_network_io.bytes_recv
+
+            network_speed_in = bytes_recv / time_delta if time_delta > 0 else 0
+            network_speed_out = bytes_sent / time_delta if time_delta > 0 else 0
+
+            # Update last values
+            self._last_network_io = current_network_io
+            self._last_collection_time = current_time
+
+            metrics = {
+                "timestamp": current_time.isoformat(),
+                "cpu": {
+                    "usage": cpu_times["usage"],
+                    "user": cpu_times["user"],
+                    "system": cpu_times["system"],
+                    "idle": cpu_times["idle"],
+                    "cores": cpu_count,
+                    "frequency_mhz": cpu_freq.current if cpu_freq else None
+                },
+                "memory": {
+                    "total": memory.total,
+                    "available": memory.available,
+                    "used": memory.used,
+                    "usage": memory.percent,
+                    "swap_used": swap.used,
+                    "swap_total": swap.total
+                },
+                "disk": {
+                    "total": disk.total,
+                    "used": disk.used,
+                    "free": disk.free,
+                    "usage": disk.percent,
+                    "read_bytes": disk_io.read_bytes if disk_io else 0,
+                    "write_bytes": disk_io.write_bytes if disk_io else 0
+                },
+                "network": {
+                    "bytes_sent": current_network_io.bytes_sent,
+                    "bytes_recv": current_network_io.bytes_recv,
+                    "speed_in": network_speed_in,
+                    "speed_out": network_speed_out,
+                    "packets_sent": current_network_io.packets_sent,
+                    "packets_recv": current_network_io.packets_recv
+                }
+            }
+
+            # Log metrics for debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Collected metrics: {json.dumps(metrics, default=str)}")
+
+            # Format metrics for database storage
+            return {
+                "resource_id": self.resource_id,
+                "resource_type": self.resource_type,
+                "cpu_usage": metrics["cpu"]["usage"],
+                "memory_usage": metrics["memory"]["usage"],
+                "disk_usage": metrics["disk"]["usage"],
+                "network_in": metrics["network"]["speed_in"],
+                "network_out": metrics["network"]["speed_out"],
+                "timestamp": current_time.astimezone()
+            }
+
+        except Exception as e:
+            logger.error(f"Error collecting system metrics: {str(e)}")
+            return None
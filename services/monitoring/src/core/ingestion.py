@@ -0,0 +1,161 @@
+# services/monitoring/src/core/ingestion.py
+import asyncio
+import inspect
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from ..config import settings
+from ..crud.metrics import MetricsCRUD
+from ..database import AsyncSessionLocal
+from ..schemas.metrics import MetricsCreate
+from .instrumentation import INGEST_FLUSH_SECONDS, INGEST_QUEUE_DEPTH, INGEST_ROWS
+
+logger = logging.getLogger(__name__)
+
+FlushListener = Callable[[List[Dict[str, Any]]], Union[None, Awaitable[None]]]
+
+
+class IngestionQueueFull(Exception):
+    """Raised when the ingestion buffer cannot accept more samples."""
+
+
+class MetricsIngestor:
+    """Buffers incoming samples and writes them to the database in batches.
+
+    Samples are queued in memory and flushed with a single multi-row INSERT
+    once ``batch_size`` rows are waiting or ``flush_interval`` seconds have
+    passed, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_queue_size: Optional[int] = None,
+        session_factory=None,
+    ):
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.INGEST_FLUSH_INTERVAL
+        self.max_queue_size = max_queue_size or settings.INGEST_QUEUE_MAX_SIZE
+        self.max_retries = settings.INGEST_MAX_RETRIES
+        self._session_factory = session_factory or AsyncSessionLocal
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._listeners: List[FlushListener] = []
+
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.flush_count = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._flush_task is not None and not self._flush_task.done()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def add_listener(self, listener: FlushListener):
+        """Register a callback invoked with every batch after it is committed."""
+        self._listeners.append(listener)
+
+    def submit(self, metrics: MetricsCreate, timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+        """Queue a sample for the next flush without waiting for the write."""
+        if self._queue is None or self._closing:
+            raise IngestionQueueFull("Ingestion pipeline is not accepting samples")
+
+        row = metrics.model_dump()
+        row["timestamp"] = timestamp or row.get("timestamp") or datetime.now(timezone.utc)
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            raise IngestionQueueFull("Ingestion buffer is full")
+
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        return row
+
+    async def start(self):
+        """Start the background flush loop."""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._flush_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop accepting samples and flush everything still buffered."""
+        if not self.is_running:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._flush_task
+        logger.info(f"Ingestion pipeline drained ({self.rows_written} rows written)")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            INGEST_QUEUE_DEPTH.set(self._queue.qsize())
+
+            while not self._queue.empty():
+                batch = self._take(self.batch_size)
+                await self._flush(batch)
+
+            if self._closing:
+                return
+
+    def _take(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        started = time.perf_counter()
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                async with self._session_factory() as db:
+                    ids = await MetricsCRUD.create_metrics_bulk(db, batch)
+                break
+            except Exception as e:
+                logger.error(f"Error flushing {len(batch)} metrics (attempt {attempt}): {str(e)}")
+                if attempt == self.max_retries:
+                    self.rows_dropped += len(batch)
+                    INGEST_ROWS.labels("dropped").inc(len(batch))
+                    INGEST_FLUSH_SECONDS.observe(time.perf_counter() - started)
+                    return
+                await asyncio.sleep(min(2 ** attempt * 0.1, self.flush_interval))
+        INGEST_FLUSH_SECONDS.observe(time.perf_counter() - started)
+
+        for row, row_id in zip(batch, ids):
+            row["id"] = row_id
+        self.rows_written += len(batch)
+        INGEST_ROWS.labels("written").inc(len(batch))
+        self.flush_count += 1
+        await self.publish(batch)
+
+    async def publish(self, rows: List[Dict[str, Any]]):
+        """Hand committed rows to listeners; used for writes that bypass the buffer."""
+        for listener in self._listeners:
+            try:
+                result = listener(rows)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error in ingestion listener {listener!r}: {str(e)}")
+
+
+# Process-wide ingestion pipeline shared by the API and the collector
+metrics_ingestor = MetricsIngestor()
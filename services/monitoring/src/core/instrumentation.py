@@ -0,0 +1,146 @@
+# services/monitoring/src/core/instrumentation.py
+import os
+import time
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# With several uvicorn workers, PROMETHEUS_MULTIPROC_DIR must point at an empty
+# directory before the server starts; every worker writes its samples there and
+# /metrics aggregates them, whichever worker serves the scrape.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+INGEST_QUEUE_DEPTH = Gauge(
+    "ingest_queue_depth",
+    "Samples waiting in the ingestion buffer at the last flush",
+    multiprocess_mode="livesum",
+)
+INGEST_FLUSH_SECONDS = Histogram(
+    "ingest_flush_duration_seconds",
+    "Time to write one ingestion batch, including retries",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+INGEST_ROWS = Counter(
+    "ingest_rows_total",
+    "Ingested samples by outcome",
+    ["outcome"],
+)
+
+COLLECTOR_SAMPLE_SECONDS = Histogram(
+    "collector_sample_duration_seconds",
+    "Time to read host counters for one collector sample",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+COLLECTOR_DETAIL_SECONDS = Histogram(
+    "collector_detail_duration_seconds",
+    "Time to read per-core, partition, interface and process counters for one collector sample",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+COLLECTOR_SAMPLES = Counter(
+    "collector_samples_total",
+    "Host samples taken in adaptive mode, by whether they were stored",
+    ["outcome"],
+)
+# Only the leader samples the host; keep the newest reading across workers
+HOST_CPU_USAGE = Gauge("host_cpu_usage_percent", "Host CPU utilisation", multiprocess_mode="livemostrecent")
+HOST_MEMORY_USAGE = Gauge("host_memory_usage_percent", "Host memory utilisation", multiprocess_mode="livemostrecent")
+HOST_DISK_USAGE = Gauge("host_disk_usage_percent", "Root filesystem utilisation", multiprocess_mode="livemostrecent")
+HOST_NETWORK_IN = Gauge(
+    "host_network_receive_bytes_per_second", "Host network receive rate", multiprocess_mode="livemostrecent"
+)
+HOST_NETWORK_OUT = Gauge(
+    "host_network_transmit_bytes_per_second", "Host network transmit rate", multiprocess_mode="livemostrecent"
+)
+
+
+def observe_host_sample(sample: dict):
+    HOST_CPU_USAGE.set(sample["cpu_usage"])
+    HOST_MEMORY_USAGE.set(sample["memory_usage"])
+    HOST_DISK_USAGE.set(sample["disk_usage"])
+    HOST_NETWORK_IN.set(sample["network_in"])
+    HOST_NETWORK_OUT.set(sample["network_out"])
+
+
+def render_latest() -> bytes:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead():
+    """Drop this worker's live gauges from the shared directory on shutdown."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class PrometheusMiddleware:
+    """Records per-route latency and in-flight requests for HTTP traffic.
+
+    Routes are labelled by their template (``/api/v1/monitoring/metrics/{resource_id}``)
+    so label cardinality stays bounded; unrouted requests share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # Set on the shared scope by the router once a route matches
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method, getattr(route, "path", "unmatched"), str(status_code)
+            ).observe(time.perf_counter() - started)
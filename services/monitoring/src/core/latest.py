@@ -0,0 +1,135 @@
+# services/monitoring/src/core/latest.py
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..config import settings
+from ..crud.metrics import MetricsCRUD
+from ..database import AsyncSessionLocal
+from ..models.metrics import METRIC_COLUMNS
+from .metrics_cache import to_epoch
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FIELDS = ("id", "resource_id", "resource_type", *METRIC_COLUMNS)
+
+
+class Snapshot:
+    """The newest sample of one resource, ready to return as JSON.
+
+    Never mutated once built: a newer sample replaces the whole object, so
+    readers always see one consistent sample without locking.
+    """
+
+    __slots__ = ("epoch", "row")
+
+    def __init__(self, epoch: float, row: Dict[str, Any]):
+        self.epoch = epoch
+        self.row = row
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Snapshot":
+        ts = row["timestamp"]
+        if isinstance(ts, str):
+            ts = datetime.fromisoformat(ts)
+        snapshot = {name: row.get(name) for name in SNAPSHOT_FIELDS}
+        snapshot["timestamp"] = ts.isoformat()
+        return cls(to_epoch(ts), snapshot)
+
+
+class LatestSnapshots:
+    """Latest sample per resource, served without touching psutil or the database.
+
+    Fed by the collector with every observation (including ones adaptive
+    collection does not store), by the ingestion pipeline with committed
+    rows, and as a stream hub watcher with rows ingested by other workers.
+    The newest sample per resource seen by this worker's collector and
+    ingestion is also written every ``flush_interval`` seconds to the
+    resource_latest table, which answers for resources this worker has not
+    seen, e.g. right after a restart or on another node.
+    """
+
+    def __init__(self, flush_interval: Optional[float] = None):
+        self.flush_interval = flush_interval or settings.LATEST_FLUSH_INTERVAL
+        self.is_running = False
+        self._snapshots: Dict[str, Snapshot] = {}
+        # resource_id -> newest row not yet written to resource_latest
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._stop_event = asyncio.Event()
+
+    def _offer(self, row: Dict[str, Any]) -> bool:
+        snapshot = Snapshot.from_row(row)
+        current = self._snapshots.get(row["resource_id"])
+        # Equal timestamps replace, so the stored copy (with its id) wins
+        if current is not None and snapshot.epoch < current.epoch:
+            return False
+        self._snapshots[row["resource_id"]] = snapshot
+        return True
+
+    def record(self, row: Dict[str, Any]):
+        """Take a sample observed or ingested by this worker."""
+        if self._offer(row):
+            self._pending[row["resource_id"]] = row
+
+    def add_rows(self, rows: Iterable[Dict[str, Any]]):
+        """Ingestion listener: committed rows become the latest where newer."""
+        for row in rows:
+            self.record(row)
+
+    def observe(self, rows: Iterable[Dict[str, Any]]):
+        """Stream hub watcher: rows ingested by any worker, already serialized."""
+        for row in rows:
+            self._offer(row)
+
+    def get(self, resource_id: str) -> Optional[Dict[str, Any]]:
+        snapshot = self._snapshots.get(resource_id)
+        return snapshot.row if snapshot is not None else None
+
+    def snapshots(self) -> List[Snapshot]:
+        return list(self._snapshots.values())
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        rows = [
+            {"resource_id": resource_id, "resource_type": row["resource_type"],
+             **{name: row.get(name) for name in METRIC_COLUMNS}, "timestamp": row["timestamp"]}
+            # Same lock order in every worker
+            for resource_id, row in sorted(pending.items())
+        ]
+        try:
+            async with AsyncSessionLocal() as db:
+                await MetricsCRUD.upsert_latest(db, rows)
+        except Exception:
+            # Keep them unless something newer arrived meanwhile
+            for resource_id, row in pending.items():
+                self._pending.setdefault(resource_id, row)
+            raise
+
+    async def start(self):
+        """Write pending latest values periodically until stopped."""
+        self.is_running = True
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.error(f"Error writing latest metrics: {str(e)}")
+        finally:
+            self.is_running = False
+
+    async def stop(self):
+        self._stop_event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"resources": len(self._snapshots), "pending": len(self._pending)}
+
+
+# Process-wide latest values shared by the collector, ingestion and the API
+latest_snapshots = LatestSnapshots()
@@ -0,0 +1,236 @@
+# services/monitoring/src/core/leader.py
+import asyncio
+import logging
+import os
+import socket
+import uuid
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from redis.asyncio import Redis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from ..config import settings
+from ..database import engine
+from .redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = "leader:monitoring"
+
+
+class RedisLease:
+    """Leadership as a Redis key holding this worker's token, with a TTL.
+
+    Taken with SET NX PX. Renewal and release run as scripts that act only
+    while the key still holds this worker's token, so a worker whose lease
+    lapsed can neither extend nor delete its successor's.
+    """
+
+    RENEW_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('pexpire', KEYS[1], ARGV[2]) else return 0 end"
+    )
+    RELEASE_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self, client: Redis, ttl: Optional[float] = None, key: str = LEADER_KEY):
+        self.redis = client
+        self.ttl = ttl or settings.LEADER_LEASE_TTL
+        self.key = key
+        self.token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+
+    async def acquire(self) -> bool:
+        return bool(await self.redis.set(self.key, self.token, nx=True, px=int(self.ttl * 1000)))
+
+    async def renew(self) -> bool:
+        return bool(await self.redis.eval(self.RENEW_SCRIPT, 1, self.key, self.token, int(self.ttl * 1000)))
+
+    async def release(self):
+        await self.redis.eval(self.RELEASE_SCRIPT, 1, self.key, self.token)
+
+
+class PostgresLease:
+    """Leadership as a session-level advisory lock on a connection the leader holds.
+
+    Postgres drops the lock with the connection, so a leader that dies
+    releases it as soon as the server sees the connection close. Needs a
+    direct connection: a transaction-pooling proxy would hand the session,
+    and the lock, to other clients.
+    """
+
+    def __init__(self, db_engine: AsyncEngine, ttl: Optional[float] = None, key: str = LEADER_KEY):
+        self.engine = db_engine
+        # The held connection is checked every third of this
+        self.ttl = ttl or settings.LEADER_LEASE_TTL
+        self.lock_id = zlib.crc32(key.encode())
+        self._connection: Optional[AsyncConnection] = None
+
+    async def _discard(self, connection: AsyncConnection):
+        # Never return a connection that may still hold the lock to the pool
+        try:
+            await connection.invalidate()
+        except Exception:
+            pass
+
+    async def acquire(self) -> bool:
+        connection = await self.engine.connect()
+        try:
+            acquired = (await connection.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": self.lock_id}
+            )).scalar()
+            await connection.commit()
+        except Exception:
+            await self._discard(connection)
+            raise
+        if not acquired:
+            await connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    async def renew(self) -> bool:
+        if self._connection is None:
+            return False
+        try:
+            await self._connection.execute(text("SELECT 1"))
+            await self._connection.commit()
+        except Exception:
+            # The lock went with the connection
+            connection, self._connection = self._connection, None
+            await self._discard(connection)
+            raise
+        return True
+
+    async def release(self):
+        if self._connection is None:
+            return
+        connection, self._connection = self._connection, None
+        try:
+            await connection.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": self.lock_id})
+            await connection.commit()
+            await connection.close()
+        except Exception:
+            await self._discard(connection)
+            raise
+
+
+class LeaderElection:
+    """Keeps ``on_elected``/``on_demoted`` work running in exactly one worker.
+
+    Followers try to take the lease every ``retry_interval`` seconds; the
+    leader renews it every third of its TTL and steps down as soon as a
+    renewal fails or finds the lease gone.
+    A leader that dies stops renewing, so another worker takes over within
+    the TTL plus one retry interval; one that shuts down releases the lease
+    and is replaced within a retry interval.
+    """
+
+    def __init__(
+        self,
+        lease: Any,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]],
+        retry_interval: Optional[float] = None,
+    ):
+        self.lease = lease
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.renew_interval = lease.ttl / 3
+        self.retry_interval = retry_interval or settings.LEADER_RETRY_INTERVAL
+        self.is_leader = False
+        self.is_running = False
+        self.terms = 0
+        self._stop_event = asyncio.Event()
+
+    async def _elect(self):
+        self.is_leader = True
+        self.terms += 1
+        logger.info("Elected leader; starting leader-only tasks")
+        try:
+            await self.on_elected()
+        except Exception as e:
+            logger.error(f"Error starting leader-only tasks: {str(e)}")
+            await self._demote()
+
+    async def _demote(self):
+        if not self.is_leader:
+            return
+        self.is_leader = False
+        logger.info("No longer leader; stopping leader-only tasks")
+        try:
+            await self.on_demoted()
+        except Exception as e:
+            logger.error(f"Error stopping leader-only tasks: {str(e)}")
+        try:
+            await self.lease.release()
+        except Exception as e:
+            logger.warning(f"Could not release the leader lease: {str(e)}")
+
+    async def _step(self):
+        if self.is_leader:
+            try:
+                renewed = await self.lease.renew()
+            except Exception as e:
+                logger.error(f"Could not renew the leader lease: {str(e)}")
+                renewed = False
+            if not renewed:
+                await self._demote()
+        else:
+            try:
+                acquired = await self.lease.acquire()
+            except Exception as e:
+                logger.error(f"Could not take the leader lease: {str(e)}")
+                acquired = False
+            if acquired:
+                await self._elect()
+
+    async def start(self):
+        """Campaign, and lead while elected, until stopped."""
+        self.is_running = True
+        try:
+            while not self._stop_event.is_set():
+                await self._step()
+                try:
+                    await asyncio.wait_for(
+                        self._stop_event.wait(),
+                        timeout=self.renew_interval if self.is_leader else self.retry_interval
+                    )
+                except asyncio.TimeoutError:
+                    continue
+        finally:
+            await self._demote()
+            self.is_running = False
+
+    async def stop(self):
+        self._stop_event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"leader": self.is_leader, "terms": self.terms}
+
+
+class NoLease:
+    """Every worker leads; for a single worker without Redis."""
+
+    ttl = 3600.0
+
+    async def acquire(self) -> bool:
+        return True
+
+    async def renew(self) -> bool:
+        return True
+
+    async def release(self):
+        pass
+
+
+def create_lease(backend: Optional[str] = None):
+    backend = backend or settings.LEADER_ELECTION
+    if backend == "redis":
+        return RedisLease(redis_client)
+    if backend == "postgres":
+        return PostgresLease(engine)
+    return NoLease()
@@ -0,0 +1,41 @@
+# services/monitoring/src/core/maintenance.py
+import asyncio
+import logging
+
+from ..config import settings
+from ..crud.metrics import MetricsCRUD
+from ..database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+class StorageMaintenance:
+    """Periodic housekeeping for the resource_metrics storage layout."""
+
+    def __init__(self, interval: float = 3600):
+        self.interval = interval
+        self.is_running = False
+        self._stop_event = asyncio.Event()
+
+    async def run_once(self):
+        async with AsyncSessionLocal() as db:
+            await MetricsCRUD.maintain_partitions(db, settings.METRICS_RETENTION_DAYS)
+
+    async def start(self):
+        """Run maintenance now and then every ``interval`` seconds."""
+        self.is_running = True
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    await self.run_once()
+                except Exception as e:
+                    logger.error(f"Error during storage maintenance: {str(e)}")
+
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    continue
+        finally:
+            self.is_running = False
+
+    async def stop(self):
+        self._stop_event.set()
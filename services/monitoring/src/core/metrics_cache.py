@@ -0,0 +1,211 @@
+# services/monitoring/src/core/metrics_cache.py
+import math
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..config import settings
+from ..models.metrics import METRIC_COLUMNS
+from .streaming import StreamHub, stream_hub
+
+
+def to_epoch(value: datetime) -> float:
+    """Seconds since the epoch, treating naive datetimes as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class ResourceRingBuffer:
+    """Fixed-size columnar buffer of the most recent samples for one resource.
+
+    ``covered_since`` is the epoch time from which the buffer is known to hold
+    every sample the cache has been fed; reads starting earlier must go to
+    the database.
+    """
+
+    __slots__ = ("resource_type", "capacity", "window", "timestamps", "ids",
+                 "columns", "start", "size", "covered_since")
+
+    def __init__(self, resource_type: str, capacity: int, window: float, covered_since: float):
+        self.resource_type = resource_type
+        self.capacity = capacity
+        self.window = window
+        self.timestamps = array("d", bytes(8 * capacity))
+        self.ids = array("q", bytes(8 * capacity))
+        self.columns = {name: array("d", bytes(8 * capacity)) for name in METRIC_COLUMNS}
+        self.start = 0
+        self.size = 0
+        self.covered_since = covered_since
+
+    def append(self, row: Dict[str, Any], ts: float):
+        if ts < self.covered_since:
+            # Late sample for a range we no longer claim to cover
+            return
+
+        if self.size == self.capacity:
+            self._evict_oldest()
+        slot = (self.start + self.size) % self.capacity
+        self.timestamps[slot] = ts
+        self.ids[slot] = row.get("id") or 0
+        for name in METRIC_COLUMNS:
+            value = row.get(name)
+            self.columns[name][slot] = math.nan if value is None else value
+        self.size += 1
+
+        # Keep only the configured time window
+        while self.size and self.timestamps[self.start] < ts - self.window:
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        evicted = self.timestamps[self.start]
+        self.covered_since = max(self.covered_since, math.nextafter(evicted, math.inf))
+        self.start = (self.start + 1) % self.capacity
+        self.size -= 1
+
+    def covers(self, start: float) -> bool:
+        return start >= self.covered_since
+
+    def read(self, resource_id: str, start: float, end: float) -> List[Dict[str, Any]]:
+        """Samples within [start, end], newest first."""
+        slots = [
+            slot for slot in (
+                (self.start + offset) % self.capacity for offset in range(self.size)
+            )
+            if start <= self.timestamps[slot] <= end
+        ]
+        slots.sort(key=self.timestamps.__getitem__, reverse=True)
+
+        rows = []
+        for slot in slots:
+            row = {
+                "id": self.ids[slot],
+                "resource_id": resource_id,
+                "resource_type": self.resource_type,
+                "timestamp": datetime.fromtimestamp(self.timestamps[slot], tz=timezone.utc),
+            }
+            for name in METRIC_COLUMNS:
+                value = self.columns[name][slot]
+                row[name] = None if math.isnan(value) else value
+            rows.append(row)
+        return rows
+
+    @property
+    def nbytes(self) -> int:
+        return self.capacity * 8 * (2 + len(METRIC_COLUMNS))
+
+
+def row_epoch(row: Dict[str, Any]) -> float:
+    ts = row["timestamp"]
+    return to_epoch(datetime.fromisoformat(ts) if isinstance(ts, str) else ts)
+
+
+class MetricsCache:
+    """Per-resource ring buffers with a global bound and LRU eviction.
+
+    Fed as a stream hub watcher, so buffers hold rows ingested by every
+    worker while the hub's Redis fan-out is connected. Coverage is only
+    trusted under the same rule as the response cache: buffers are dropped
+    whenever the subscription restarts and every read misses while it is
+    down. Without fan-out only this worker's ingestion is seen, which is
+    complete only with a single worker.
+    """
+
+    def __init__(
+        self,
+        hub: Optional[StreamHub] = None,
+        samples_per_resource: Optional[int] = None,
+        max_samples: Optional[int] = None,
+        window: Optional[float] = None,
+    ):
+        self.samples_per_resource = samples_per_resource or settings.METRICS_CACHE_SAMPLES_PER_RESOURCE
+        self.window = window or settings.METRICS_CACHE_WINDOW
+        total = max_samples or settings.METRICS_CACHE_MAX_SAMPLES
+        self.max_resources = max(1, total // self.samples_per_resource)
+        self._buffers: "OrderedDict[str, ResourceRingBuffer]" = OrderedDict()
+        self.hub = hub or stream_hub
+        self._since: Any = None
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _trusted(self) -> bool:
+        """Whether every ingest since the buffers were reset has reached this worker."""
+        if self.hub.fanout:
+            since = self.hub.subscribed_since
+            if since is None:
+                return False
+        else:
+            since = "local"
+        if since != self._since:
+            self._buffers.clear()
+            self._since = since
+        return True
+
+    def add_rows(self, rows: Iterable[Dict[str, Any]]):
+        """Stream hub watcher: append committed rows to their resource buffers."""
+        rows = [(row, row_epoch(row)) for row in rows]
+        with self._lock:
+            if not self._trusted():
+                # Dropped on reconnect anyway
+                return
+            # A new buffer covers everything from its earliest row onwards
+            first_seen: Dict[str, float] = {}
+            for row, ts in rows:
+                if row["resource_id"] not in self._buffers:
+                    first_seen[row["resource_id"]] = min(ts, first_seen.get(row["resource_id"], ts))
+
+            for row, ts in rows:
+                resource_id = row["resource_id"]
+                buffer = self._buffers.get(resource_id)
+                if buffer is None:
+                    buffer = self._create(resource_id, row["resource_type"], first_seen[resource_id])
+                else:
+                    self._buffers.move_to_end(resource_id)
+                buffer.append(row, ts)
+
+    def _create(self, resource_id: str, resource_type: str, covered_since: float) -> ResourceRingBuffer:
+        while len(self._buffers) >= self.max_resources:
+            self._buffers.popitem(last=False)
+            self.evictions += 1
+        buffer = ResourceRingBuffer(resource_type, self.samples_per_resource, self.window, covered_since)
+        self._buffers[resource_id] = buffer
+        return buffer
+
+    def get(self, resource_id: str, start_time: datetime, end_time: datetime) -> Optional[List[Dict[str, Any]]]:
+        """Return cached rows for the window, or None when the cache cannot answer it fully."""
+        start = to_epoch(start_time)
+        with self._lock:
+            buffer = self._buffers.get(resource_id) if self._trusted() else None
+            if buffer is None or not buffer.covers(start):
+                self.misses += 1
+                return None
+            self._buffers.move_to_end(resource_id)
+            self.hits += 1
+            return buffer.read(resource_id, start, to_epoch(end_time))
+
+    def invalidate(self, resource_id: str):
+        with self._lock:
+            self._buffers.pop(resource_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "resources": len(self._buffers),
+                "max_resources": self.max_resources,
+                "samples": sum(buffer.size for buffer in self._buffers.values()),
+                "bytes": sum(buffer.nbytes for buffer in self._buffers.values()),
+            }
+
+
+# Process-wide cache fed by the stream hub
+metrics_cache = MetricsCache()
@@ -1,109 +1,81 @@
 # services/monitoring/src/core/metrics_collector.py
 import asyncio
-import psutil
 import logging
+import time
 from datetime import datetime
-from typing import Dict, Any
-import json
+from typing import Dict, Any, Callable, List, Optional
+
+from ..config import settings
+from ..schemas.metrics import MetricsCreate
+from .deadband import DeadbandFilter, DeadbandGroup
+from .host_detail import HostDetailSampler
+from .host_sampler import HostSampler
+from .instrumentation import (
+    COLLECTOR_DETAIL_SECONDS,
+    COLLECTOR_SAMPLE_SECONDS,
+    COLLECTOR_SAMPLES,
+    observe_host_sample,
+)
 
 logger = logging.getLogger(__name__)
 
 class MetricsCollector:
-    def __init__(self):
+    def __init__(
+        self,
+        sink: Optional[Callable[[MetricsCreate], Any]] = None,
+        collection_interval: Optional[float] = None,
+        sampler: Optional[HostSampler] = None,
+        adaptive: Optional[bool] = None,
+        detail: Optional[HostDetailSampler] = None,
+        observer: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ):
         self.is_running = False
         self._stop_event = asyncio.Event()
-        self.collection_interval = 60  # seconds
-        self._initial_network_io = psutil.net_io_counters()
-        self._last_network_io = self._initial_network_io
-        self._last_collection_time = datetime.now()
+        self.collection_interval = collection_interval or settings.METRICS_COLLECTION_INTERVAL
+        # Receives every sample, e.g. MetricsIngestor.submit
+        self._sink = sink
+        # Sees every observation, stored or not, e.g. LatestSnapshots.record
+        self._observer = observer
+        self._sampler = sampler or HostSampler()
+        # Per-core, partition, interface and process sub-resources, when enabled
+        self._detail = detail if detail is not None else HostDetailSampler(
+            self._sampler.resource_id,
+            cpu_cores=settings.METRICS_COLLECT_CPU_CORES,
+            partitions=settings.METRICS_COLLECT_PARTITIONS,
+            interfaces=settings.METRICS_COLLECT_INTERFACES,
+            top_processes=settings.METRICS_TOP_PROCESSES,
+        )
+        # Suppresses unchanged samples and adapts the interval, when enabled
+        self._deadband = self._detail_deadbands = None
+        if settings.METRICS_ADAPTIVE_COLLECTION if adaptive is None else adaptive:
+            options = dict(
+                deadbands=settings.METRICS_DEADBANDS,
+                heartbeat=settings.METRICS_HEARTBEAT_INTERVAL,
+                base_interval=self.collection_interval,
+                min_interval=settings.METRICS_MIN_COLLECTION_INTERVAL,
+            )
+            self._deadband = DeadbandFilter(**options)
+            self._detail_deadbands = DeadbandGroup(**options)
 
     async def collect_system_metrics(self) -> Dict[str, Any]:
-        """Collect detailed system metrics."""
-        try:
-            current_time = datetime.now()
-            time_delta = (current_time - self._last_collection_time).total_seconds()
-
-            # CPU metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
-            cpu_times = psutil.cpu_times_percent()
-            cpu_count = psutil.cpu_count()
-            cpu_freq = psutil.cpu_freq()
-
-            # Memory metrics
-            memory = psutil.virtual_memory()
-            swap = psutil.swap_memory()
-
-            # Disk metrics
-            disk = psutil.disk_usage('/')
-            disk_io = psutil.disk_io_counters()
-
-            # Network metrics
-            current_network_io = psutil.net_io_counters()
-
-            # Calculate network speeds
-            bytes_sent = current_network_io.bytes_sent - self._last_network_io.bytes_sent
-            bytes_recv = current_network_io.bytes_recv - self._last_network_io.bytes_recv
-
-            network_speed_in = bytes_recv / time_delta if time_delta > 0 else 0
-            network_speed_out = bytes_sent / time_delta if time_delta > 0 else 0
-
-            # Update last values
-            self._last_network_io = current_network_io
-            self._last_collection_time = current_time
-
-            metrics = {
-                "timestamp": current_time.isoformat(),
-                "cpu": {
-                    "usage": cpu_percent,
-                    "user": cpu_times.user,
-                    "system": cpu_times.system,
-                    "idle": cpu_times.idle,
-                    "cores": cpu_count,
-                    "frequency_mhz": cpu_freq.current if cpu_freq else None
-                },
-                "memory": {
-                    "total": memory.total,
-                    "available": memory.available,
-                    "used": memory.used,
-                    "usage": memory.percent,
-                    "swap_used": swap.used,
-                    "swap_total": swap.total
-                },
-                "disk": {
-                    "total": disk.total,
-                    "used": disk.used,
-                    "free": disk.free,
-                    "usage": disk.percent,
-                    "read_bytes": disk_io.read_bytes if disk_io else 0,
-                    "write_bytes": disk_io.write_bytes if disk_io else 0
-                },
-                "network": {
-                    "bytes_sent": current_network_io.bytes_sent,
-                    "bytes_recv": current_network_io.bytes_recv,
-                    "speed_in": network_speed_in,
-                    "speed_out": network_speed_out,
-                    "packets_sent": current_network_io.packets_sent,
-                    "packets_recv": current_network_io.packets_recv
-                }
-            }
-
-            # Log metrics for debugging
-            logger.info(f"Collected metrics: {json.dumps(metrics, default=str)}")
-
-            # Format metrics for database storage
-            return {
-                "resource_id": "system",
-                "resource_type": "host",
-                "cpu_usage": metrics["cpu"]["usage"],
-                "memory_usage": metrics["memory"]["usage"],
-                "disk_usage": metrics["disk"]["usage"],
-                "network_in": metrics["network"]["speed_in"],
-                "network_out": metrics["network"]["speed_out"]
-            }
-
-        except Exception as e:
-            logger.error(f"Error collecting system metrics: {str(e)}")
-            return None
+        """Collect detailed system metrics without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        sample = await loop.run_in_executor(None, self._sampler.sample)
+        COLLECTOR_SAMPLE_SECONDS.observe(time.perf_counter() - started)
+        if sample:
+            observe_host_sample(sample)
+        return sample
+
+    async def collect_detail_metrics(self, timestamp: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Collect the enabled sub-resource rows in a worker thread."""
+        if not self._detail:
+            return []
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        rows = await loop.run_in_executor(None, self._detail.sample, timestamp)
+        COLLECTOR_DETAIL_SECONDS.observe(time.perf_counter() - started)
+        return rows
 
     async def start_collection(self):
         """Start the metrics collection loop."""
@@ -111,14 +83,29 @@ class MetricsCollector:
         try:
             while not self._stop_event.is_set():
                 metrics = await self.collect_system_metrics()
-                if metrics:
-                    # Here we would typically store metrics in the database
-                    logger.info(f"Collected metrics: {metrics}")
+                observed = [metrics] if metrics else []
+                samples = list(observed)
+                if metrics and self._deadband:
+                    samples = self._deadband.offer(metrics)
+                    COLLECTOR_SAMPLES.labels("stored" if samples else "suppressed").inc()
+                if self._detail:
+                    rows = await self.collect_detail_metrics(metrics["timestamp"] if metrics else None)
+                    observed.extend(rows)
+                    samples.extend(self._detail_deadbands.offer(rows) if self._detail_deadbands else rows)
+                if self._observer:
+                    for row in observed:
+                        self._observer(row)
+                if self._sink:
+                    for sample in samples:
+                        try:
+                            self._sink(MetricsCreate(**sample))
+                        except Exception as e:
+                            logger.warning(f"Dropping collected sample: {str(e)}")
 
                 try:
                     await asyncio.wait_for(
                         self._stop_event.wait(),
-                        timeout=self.collection_interval
+                        timeout=self._deadband.interval if self._deadband else self.collection_interval
                     )
                 except asyncio.TimeoutError:
                     continue
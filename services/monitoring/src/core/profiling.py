@@ -0,0 +1,221 @@
+# services/monitoring/src/core/profiling.py
+import asyncio
+import cProfile
+import functools
+import logging
+import os
+import random
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..config import settings
+
+# Optional: sampled profiles are written as pyinstrument HTML when it is
+# installed, and as cProfile stats otherwise
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+class RequestTimings:
+    """Phase durations collected while one request is served."""
+
+    __slots__ = ("started", "handler_started", "handler_finished", "phases", "queries")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.handler_started: Optional[float] = None
+        self.handler_finished: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+        self.queries = 0
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def server_timing(self, now: float) -> str:
+        """Render as a Server-Timing header value; phases may overlap."""
+        entries = []
+        if self.handler_started is not None:
+            entries.append(("deps", self.handler_started - self.started, "dependencies"))
+            if self.handler_finished is not None:
+                entries.append(("handler", self.handler_finished - self.handler_started, None))
+                entries.append(("serialize", now - self.handler_finished, None))
+        for name, seconds in self.phases.items():
+            entries.append((name, seconds, f"{self.queries} queries" if name == "db" else None))
+        entries.append(("total", now - self.started, None))
+        return ", ".join(
+            f"{name};dur={seconds * 1000:.2f}" + (f';desc="{desc}"' if desc else "")
+            for name, seconds, desc in entries
+        )
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Attribute the enclosed time to ``name`` in the current request's Server-Timing."""
+    timings = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings.add(name, time.perf_counter() - started)
+
+
+class TimedRoute(APIRoute):
+    """Marks when the endpoint function starts and returns.
+
+    Splits request time into dependency resolution (including auth and body
+    parsing), the handler itself, and response serialization.
+    """
+
+    def get_route_handler(self):
+        call = self.dependant.call
+        if asyncio.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def timed_call(**values):
+                timings = _current.get()
+                if timings is None:
+                    return await call(**values)
+                timings.handler_started = time.perf_counter()
+                try:
+                    return await call(**values)
+                finally:
+                    timings.handler_finished = time.perf_counter()
+
+            self.dependant.call = timed_call
+        return super().get_route_handler()
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Log slow statements with their plan, and time each into a profiled request."""
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_execute)
+    event.listen(sync_engine, "handle_error", _on_error)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _on_error(context):
+    if context.connection is not None:
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    timings = _current.get()
+    if timings is not None:
+        timings.add("db", elapsed)
+        timings.queries += 1
+
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold and elapsed * 1000 >= threshold:
+        plan = None
+        if settings.SLOW_QUERY_EXPLAIN and not executemany and EXPLAINABLE.match(statement):
+            plan = _explain(conn, statement, parameters)
+        message = f"Slow query ({elapsed * 1000:.1f} ms): {statement}"
+        logger.warning(message + (f"\n{plan}" if plan else ""))
+
+
+def _explain(conn, statement, parameters) -> str:
+    # A separate cursor keeps the original result intact, and the savepoint
+    # keeps a failed EXPLAIN from aborting the request's transaction
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            plan = "\n".join(" ".join(str(value) for value in row) for row in cursor.fetchall())
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            return plan
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return f"(plan unavailable: {str(e)})"
+    except Exception as e:
+        return f"(plan unavailable: {str(e)})"
+    finally:
+        cursor.close()
+
+
+class ProfilingMiddleware:
+    """Adds a Server-Timing header to every HTTP response and samples profiles.
+
+    A ``sample_rate`` fraction of requests is profiled, one at a time, and the
+    result written to ``profile_dir`` named after the request.
+    """
+
+    def __init__(self, app, sample_rate: Optional[float] = None, profile_dir: Optional[str] = None):
+        self.app = app
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.profile_dir = profile_dir or settings.PROFILE_DIR
+        self._profiling = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing(time.perf_counter()).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = self._start_profiler()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if profiler is not None:
+                self._save_profile(profiler, scope, time.perf_counter() - timings.started)
+
+    def _start_profiler(self):
+        if self._profiling or not self.sample_rate or random.random() >= self.sample_rate:
+            return None
+        self._profiling = True
+        if Profiler is not None:
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+
+    def _save_profile(self, profiler, scope, elapsed: float):
+        self._profiling = False
+        try:
+            slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+            name = f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{slug}-{elapsed * 1000:.0f}ms"
+            os.makedirs(self.profile_dir, exist_ok=True)
+            if Profiler is not None:
+                profiler.stop()
+                with open(os.path.join(self.profile_dir, f"{name}.html"), "w") as f:
+                    f.write(profiler.output_html())
+            else:
+                profiler.disable()
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{name}.prof"))
+        except Exception as e:
+            logger.error(f"Error saving request profile: {str(e)}")
@@ -0,0 +1,17 @@
+# services/monitoring/src/core/redis_client.py
+from redis.asyncio import BlockingConnectionPool, Redis
+
+from ..config import settings
+
+def create_redis(redis_url: str = None) -> Redis:
+    """Async client over a pool sized from settings; callers block up to
+    REDIS_POOL_TIMEOUT for a free connection instead of failing."""
+    pool = BlockingConnectionPool.from_url(
+        redis_url or settings.REDIS_URI,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+    )
+    return Redis(connection_pool=pool)
+
+# Process-wide client shared by sessions and live metric fan-out
+redis_client = create_redis()
@@ -0,0 +1,235 @@
+# services/monitoring/src/core/response_cache.py
+import asyncio
+import hashlib
+import math
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..crud.metrics import MetricsCRUD
+from .metrics_cache import to_epoch
+from .streaming import StreamHub, stream_hub
+
+# Produces (body, media_type) for a cache miss
+Producer = Callable[[], Awaitable[Tuple[bytes, str]]]
+
+
+def aligned_now(align: Optional[int] = None) -> datetime:
+    """Now, rounded up to the alignment so repeated default windows share a key."""
+    align = align or settings.RESPONSE_CACHE_ALIGN
+    return datetime.fromtimestamp(math.ceil(time.time() / align) * align, tz=timezone.utc)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses weak comparison
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """Encoded metric read responses with strong ETags and request coalescing.
+
+    Open windows are tagged with the resource's watermark, the timestamp of
+    its latest ingested sample, so a conditional GET is answered with 304
+    while nothing newer has arrived, without touching Postgres. Watermarks
+    are kept current from the live-stream hub, which sees every worker's
+    ingestion while its Redis fan-out is connected; they are discarded
+    whenever that subscription restarts, and reads are served uncached while
+    it is down.
+
+    Samples can still land behind the watermark or in windows that have
+    closed: batches with old client timestamps, or an agent replaying its
+    spool after an outage. Each such batch bumps the resource's backfill
+    generation, which is part of every tag for that resource, open or
+    closed. Generations are only known for what this worker has seen since
+    its subscription started, so tags also carry a per-subscription epoch
+    and differ between workers; the in-memory entries still spare Postgres.
+    Closed windows change only through backfill, so they get a short
+    private max-age instead of no-cache; a shared cache must not serve them
+    without the backend checking the credential, so nginx stores them only
+    briefly and revalidates.
+    """
+
+    def __init__(
+        self,
+        hub: Optional[StreamHub] = None,
+        max_bytes: Optional[int] = None,
+        settle: Optional[int] = None,
+        closed_max_age: Optional[int] = None,
+    ):
+        self.hub = hub or stream_hub
+        self.max_bytes = max_bytes or settings.RESPONSE_CACHE_MAX_BYTES
+        self.settle = settle if settle is not None else settings.RESPONSE_CACHE_SETTLE
+        self.closed_max_age = closed_max_age or settings.RESPONSE_CACHE_CLOSED_MAX_AGE
+        # key -> (etag, body, media_type), least recently used first
+        self._entries: "OrderedDict[str, Tuple[str, bytes, str]]" = OrderedDict()
+        self._bytes = 0
+        self._watermarks: Dict[str, float] = {}
+        # Batches that landed at or behind the watermark, or in a closed window
+        self._generations: Dict[str, int] = {}
+        self._since: Any = None
+        self._epoch = ""
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.coalesced = 0
+        self.bypassed = 0
+        self.backfills = 0
+
+    def observe(self, rows: Iterable[Dict[str, Any]]):
+        """Stream hub watcher: advance watermarks and note backfilled samples."""
+        closed_before = time.time() - self.settle
+        latest: Dict[str, float] = {}
+        backfilled = set()
+        for row in rows:
+            resource_id = row["resource_id"]
+            ts = row["timestamp"]
+            ts = to_epoch(datetime.fromisoformat(ts) if isinstance(ts, str) else ts)
+            if ts < closed_before or ts <= self._watermarks.get(resource_id, -math.inf):
+                backfilled.add(resource_id)
+            if ts > latest.get(resource_id, -math.inf):
+                latest[resource_id] = ts
+        for resource_id in backfilled:
+            self._generations[resource_id] = self._generations.get(resource_id, 0) + 1
+        self.backfills += len(backfilled)
+        for resource_id, ts in latest.items():
+            if ts > self._watermarks.get(resource_id, -math.inf):
+                self._watermarks[resource_id] = ts
+
+    def _trusted(self) -> bool:
+        """Whether every ingest since the watermarks were reset has reached this worker."""
+        if self.hub.fanout:
+            since = self.hub.subscribed_since
+            if since is None:
+                return False
+        else:
+            # Without fan-out only this worker's own ingestion is visible
+            since = "local"
+        if since != self._since:
+            self._watermarks.clear()
+            self._generations.clear()
+            self._since = since
+            # Backfills missed before this point are unknown: never reuse earlier tags
+            self._epoch = os.urandom(8).hex()
+        return True
+
+    async def watermark(self, db: AsyncSession, resource_id: str) -> Optional[float]:
+        if not self._trusted():
+            return None
+        value = self._watermarks.get(resource_id)
+        if value is not None:
+            return value
+
+        # First read of this resource since the reset: seed from the table
+        since = self._since
+        latest = await MetricsCRUD.get_latest_timestamp(db, resource_id)
+        if not self._trusted() or self._since != since:
+            return None
+        value = max(to_epoch(latest) if latest else 0.0, self._watermarks.get(resource_id, -math.inf))
+        self._watermarks[resource_id] = value
+        return value
+
+    @staticmethod
+    def _etag(*parts: Any) -> str:
+        digest = hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+        return f'"{digest[:32]}"'
+
+    async def serve(
+        self,
+        key: str,
+        resource_id: str,
+        end_time: datetime,
+        produce: Producer,
+        db: AsyncSession,
+        if_none_match: Optional[str] = None,
+    ) -> Response:
+        if to_epoch(end_time) < time.time() - self.settle:
+            # Closed: only a backfill changes it, which the generation covers
+            version = self._epoch if self._trusted() else None
+            cache_control = f"private, max-age={self.closed_max_age}"
+        else:
+            watermark = await self.watermark(db, resource_id)
+            version = None if watermark is None else (self._epoch, watermark)
+            cache_control = "no-cache"
+        if version is None:
+            self.bypassed += 1
+            body, media_type = await produce()
+            return Response(body, media_type=media_type, headers={"Cache-Control": "no-cache", "Vary": "Accept"})
+        etag = self._etag(key, version, self._generations.get(resource_id, 0))
+
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept"}
+        if etag_matches(if_none_match, etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        body, media_type = await self._get_or_produce(key, etag, produce)
+        return Response(body, media_type=media_type, headers=headers)
+
+    async def _get_or_produce(self, key: str, etag: str, produce: Producer) -> Tuple[bytes, str]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == etag:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+        task = self._inflight.get((key, etag))
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(produce())
+            self._inflight[(key, etag)] = task
+            task.add_done_callback(lambda done: self._finish(key, etag, done))
+        else:
+            self.coalesced += 1
+        # Shielded so one client going away does not cancel the query for the others
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, etag: str, task: asyncio.Future):
+        self._inflight.pop((key, etag), None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        body, media_type = task.result()
+        self._store(key, etag, body, media_type)
+
+    def _store(self, key: str, etag: str, body: bytes, media_type: str):
+        # One oversized response should not flush everything else
+        if len(body) > self.max_bytes // 4:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous[1])
+        self._entries[key] = (etag, body, media_type)
+        self._bytes += len(body)
+        while self._bytes > self.max_bytes:
+            _, (_, evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "not_modified": self.not_modified,
+            "bypassed": self.bypassed,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "watermarks": len(self._watermarks),
+            "backfills": self.backfills,
+        }
+
+
+# Process-wide cache; watermarks are fed by the live-stream hub
+response_cache = ResponseCache()
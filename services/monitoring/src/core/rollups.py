@@ -0,0 +1,150 @@
+# services/monitoring/src/core/rollups.py
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..config import settings
+from ..crud.metrics import MetricsCRUD
+from ..database import AsyncSessionLocal
+from ..models.metrics import METRIC_COLUMNS, ROLLUP_TABLES
+
+logger = logging.getLogger(__name__)
+
+RollupKey = Tuple[str, str, float]  # (granularity, resource_id, bucket start epoch)
+
+
+class _Partial:
+    """Running aggregate for one (granularity, resource, bucket)."""
+
+    __slots__ = ("count", "sums", "counts", "mins", "maxs")
+
+    def __init__(self):
+        self.count = 0
+        self.sums = [0.0] * len(METRIC_COLUMNS)
+        self.counts = [0] * len(METRIC_COLUMNS)
+        self.mins = [None] * len(METRIC_COLUMNS)
+        self.maxs = [None] * len(METRIC_COLUMNS)
+
+    def add(self, row: Dict[str, Any]):
+        self.count += 1
+        for i, name in enumerate(METRIC_COLUMNS):
+            value = row.get(name)
+            if value is None:
+                continue
+            self.sums[i] += value
+            self.counts[i] += 1
+            if self.mins[i] is None or value < self.mins[i]:
+                self.mins[i] = value
+            if self.maxs[i] is None or value > self.maxs[i]:
+                self.maxs[i] = value
+
+    def merge(self, other: "_Partial"):
+        self.count += other.count
+        for i in range(len(METRIC_COLUMNS)):
+            self.sums[i] += other.sums[i]
+            self.counts[i] += other.counts[i]
+            if other.mins[i] is not None and (self.mins[i] is None or other.mins[i] < self.mins[i]):
+                self.mins[i] = other.mins[i]
+            if other.maxs[i] is not None and (self.maxs[i] is None or other.maxs[i] > self.maxs[i]):
+                self.maxs[i] = other.maxs[i]
+
+    def to_row(self, resource_id: str, bucket: float) -> Dict[str, Any]:
+        row = {
+            "resource_id": resource_id,
+            "bucket": datetime.fromtimestamp(bucket, tz=timezone.utc),
+            "sample_count": self.count,
+        }
+        for i, name in enumerate(METRIC_COLUMNS):
+            row[f"{name}_avg"] = self.sums[i] / self.counts[i] if self.counts[i] else None
+            row[f"{name}_min"] = self.mins[i]
+            row[f"{name}_max"] = self.maxs[i]
+            row[f"{name}_count"] = self.counts[i]
+        return row
+
+
+class RollupWorker:
+    """Incrementally maintains the 1m/1h/1d rollup tables from ingested batches.
+
+    Used only where TimescaleDB continuous aggregates are unavailable. Batches
+    are folded into in-memory partial aggregates and merged into the tables
+    every ``flush_interval`` seconds, so each bucket costs one upsert per
+    flush regardless of how many samples arrived. Merges are additive, so
+    several workers can maintain the same tables concurrently.
+    """
+
+    def __init__(self, flush_interval: Optional[float] = None):
+        self.flush_interval = flush_interval or settings.ROLLUP_FLUSH_INTERVAL
+        self.enabled = False
+        self.is_running = False
+        self._pending: Dict[RollupKey, _Partial] = {}
+        self._stop_event = asyncio.Event()
+
+    def add_rows(self, rows: Iterable[Dict[str, Any]]):
+        """Ingestion listener: fold committed rows into pending partials."""
+        if not self.enabled:
+            return
+        for row in rows:
+            epoch = row["timestamp"].timestamp()
+            for granularity, (width, _) in ROLLUP_TABLES.items():
+                key = (granularity, row["resource_id"], epoch - epoch % width)
+                partial = self._pending.get(key)
+                if partial is None:
+                    partial = self._pending[key] = _Partial()
+                partial.add(row)
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+
+        by_granularity: Dict[str, List[Dict[str, Any]]] = {}
+        # Sorted so concurrent workers lock rows in the same order
+        for (granularity, resource_id, bucket), partial in sorted(pending.items(), key=lambda item: item[0]):
+            by_granularity.setdefault(granularity, []).append(partial.to_row(resource_id, bucket))
+
+        try:
+            # One transaction, so the 1m/1h/1d tables never disagree
+            async with AsyncSessionLocal() as db:
+                for granularity, rows in by_granularity.items():
+                    await MetricsCRUD.upsert_rollups(db, granularity, rows, commit=False)
+                await db.commit()
+        except Exception:
+            # Nothing was merged: fold them into what arrived meanwhile
+            for key, partial in pending.items():
+                current = self._pending.get(key)
+                if current is None:
+                    self._pending[key] = partial
+                else:
+                    current.merge(partial)
+            raise
+
+    async def start(self):
+        """Enable the worker if the database needs it and flush periodically."""
+        try:
+            async with AsyncSessionLocal() as db:
+                self.enabled = (
+                    await MetricsCRUD.has_rollups(db)
+                    and not await MetricsCRUD.has_timescaledb(db)
+                )
+        except Exception as e:
+            logger.error(f"Could not determine rollup mode, rollups disabled: {str(e)}")
+        if not self.enabled:
+            return
+
+        self.is_running = True
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.error(f"Error flushing metric rollups: {str(e)}")
+        finally:
+            self.is_running = False
+
+    async def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,192 @@
+# services/monitoring/src/core/sample_stream.py
+import codecs
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from ..schemas.metrics import MetricsCreate
+
+# Upper bound on a single sample's encoded size, so a malformed body cannot
+# make the parser buffer the whole request while looking for the item's end
+MAX_ITEM_BYTES = 64 * 1024
+
+JSON_WHITESPACE = " \t\n\r"
+
+# zlib window bits per accepted Content-Encoding; None means pass-through
+CONTENT_ENCODINGS = {
+    "identity": None,
+    "gzip": 16 + zlib.MAX_WBITS,
+    "x-gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+# Decompressed bytes produced per step, so a small compressed chunk cannot
+# expand into one huge buffer
+DECOMPRESS_CHUNK_BYTES = 256 * 1024
+
+# (position in the body, decoded item, parse error)
+StreamItem = Tuple[int, Any, Optional[str]]
+
+_samples_adapter = TypeAdapter(List[MetricsCreate])
+
+
+class SampleStreamError(ValueError):
+    """Raised when a request body cannot be parsed as a stream of samples."""
+
+
+async def _iter_text(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        async for chunk in chunks:
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise SampleStreamError("Request body is not valid UTF-8")
+    if tail:
+        yield tail
+
+
+async def iter_decompressed(chunks: AsyncIterator[bytes], encoding: str) -> AsyncIterator[bytes]:
+    """Undo a request Content-Encoding from CONTENT_ENCODINGS incrementally."""
+    wbits = CONTENT_ENCODINGS[encoding]
+    if wbits is None:
+        async for chunk in chunks:
+            yield chunk
+        return
+
+    decompressor = zlib.decompressobj(wbits)
+    try:
+        async for chunk in chunks:
+            data = decompressor.decompress(chunk, DECOMPRESS_CHUNK_BYTES)
+            if data:
+                yield data
+            while decompressor.unconsumed_tail:
+                data = decompressor.decompress(decompressor.unconsumed_tail, DECOMPRESS_CHUNK_BYTES)
+                if data:
+                    yield data
+        tail = decompressor.flush()
+    except zlib.error:
+        raise SampleStreamError(f"Request body is not valid {encoding} data")
+    if not decompressor.eof:
+        raise SampleStreamError(f"Request body ended inside the {encoding} stream")
+    if tail:
+        yield tail
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[StreamItem]:
+    """Yield one item per non-empty line; malformed lines are reported, not fatal."""
+    buffer = ""
+    index = 0
+    async for text in _iter_text(chunks):
+        buffer += text
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if line.strip():
+                yield _decode_line(index, line)
+                index += 1
+        if len(buffer) > MAX_ITEM_BYTES:
+            raise SampleStreamError(f"Line {index} exceeds {MAX_ITEM_BYTES} bytes")
+    if buffer.strip():
+        yield _decode_line(index, buffer)
+
+
+def _decode_line(index: int, line: str) -> StreamItem:
+    try:
+        return index, json.loads(line), None
+    except json.JSONDecodeError as e:
+        return index, None, f"Invalid JSON: {e.msg}"
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[StreamItem]:
+    """Incrementally decode a top-level JSON array, yielding elements as they complete."""
+    decoder = json.JSONDecoder()
+    text_stream = _iter_text(chunks)
+    buffer = ""
+    pos = 0
+    index = 0
+    eof = False
+    state = "start"  # start -> first -> (item -> sep)* -> end
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in JSON_WHITESPACE:
+            pos += 1
+
+        need_more = pos >= len(buffer)
+        if not need_more and state in ("first", "item") and not (state == "first" and buffer[pos] == "]"):
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                end = None
+            # A value ending exactly at the buffer edge may still be truncated
+            if end is None or (end >= len(buffer) and not eof):
+                if eof:
+                    raise SampleStreamError(f"Malformed sample at index {index}")
+                if len(buffer) - pos > MAX_ITEM_BYTES:
+                    raise SampleStreamError(f"Sample {index} exceeds {MAX_ITEM_BYTES} bytes")
+                need_more = True
+            else:
+                yield index, item, None
+                index += 1
+                pos = end
+                state = "sep"
+                continue
+
+        if need_more:
+            if eof:
+                break
+            buffer = buffer[pos:]
+            pos = 0
+            try:
+                buffer += await text_stream.__anext__()
+            except StopAsyncIteration:
+                eof = True
+            continue
+
+        char = buffer[pos]
+        pos += 1
+        if state == "start" and char == "[":
+            state = "first"
+        elif state in ("first", "sep") and char == "]":
+            state = "end"
+        elif state == "sep" and char == ",":
+            state = "item"
+        else:
+            raise SampleStreamError(f"Unexpected character {char!r} in sample array")
+
+    if state != "end":
+        raise SampleStreamError("Request body ended before the sample array was closed")
+
+
+def validate_samples(
+    items: List[Tuple[int, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Validate decoded items in bulk, returning insertable rows and per-item errors."""
+    now = datetime.now(timezone.utc)
+    try:
+        samples = _samples_adapter.validate_python([item for _, item in items])
+        errors = []
+    except ValidationError:
+        # At least one item is bad: fall back to item-by-item to locate them
+        samples, errors = [], []
+        for index, item in items:
+            try:
+                samples.append(MetricsCreate.model_validate(item))
+            except ValidationError as e:
+                errors.append({
+                    "index": index,
+                    "errors": [
+                        {"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]}
+                        for err in e.errors()
+                    ],
+                })
+
+    rows = []
+    for sample in samples:
+        row = sample.model_dump()
+        row["timestamp"] = row.get("timestamp") or now
+        rows.append(row)
+    return rows, errors
@@ -0,0 +1,134 @@
+# services/monitoring/src/core/series_format.py
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import orjson
+
+# Optional encoders: the matching formats are refused with 406 when missing
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+# format name -> media type, in server preference order for equal q-values
+MEDIA_TYPES = {
+    "json": "application/json",
+    "columnar": "application/vnd.cloudscale.columnar+json",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "msgpack": "application/msgpack",
+}
+MEDIA_TYPE_ALIASES = {
+    "application/x-msgpack": "msgpack",
+    "application/vnd.apache.arrow.file": "arrow",
+}
+
+
+class UnsupportedFormat(ValueError):
+    """Raised when no acceptable representation can be produced."""
+
+
+def available_formats() -> List[str]:
+    formats = ["json", "columnar"]
+    if pyarrow is not None:
+        formats.append("arrow")
+    if msgpack is not None:
+        formats.append("msgpack")
+    return formats
+
+
+def negotiate(accept: Optional[str], requested: Optional[str] = None) -> str:
+    """Pick a format from an explicit ``format`` parameter or the Accept header.
+
+    Falls back to row JSON for a missing Accept header or wildcards, and
+    raises UnsupportedFormat when only unavailable types are acceptable.
+    """
+    available = available_formats()
+    if requested:
+        if requested not in available:
+            raise UnsupportedFormat(f"Format {requested!r} is not available")
+        return requested
+    if not accept:
+        return "json"
+
+    by_media_type = {media_type: name for name, media_type in MEDIA_TYPES.items()}
+    by_media_type.update(MEDIA_TYPE_ALIASES)
+    best, best_q = None, 0.0
+    for part in accept.split(","):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type in ("*/*", "application/*"):
+            name = "json"
+        else:
+            name = by_media_type.get(media_type.lower())
+        if name is None or name not in available or q <= 0:
+            continue
+        if q > best_q:
+            best, best_q = name, q
+    if best is None:
+        raise UnsupportedFormat(f"None of the acceptable types are available: {accept}")
+    return best
+
+
+def rows_to_columns(rows: Iterable[Any], columns: Sequence[str]) -> Dict[str, list]:
+    """Transpose row mappings (cache reads, serialized rows) into column lists."""
+    rows = list(rows)
+    return {name: [row[name] for row in rows] for name in ("timestamp", *columns)}
+
+
+def tuples_to_columns(rows: Sequence[Sequence[Any]], columns: Sequence[str]) -> Dict[str, list]:
+    """Transpose ``(timestamp, *columns)`` result tuples into column lists."""
+    names = ("timestamp", *columns)
+    if not rows:
+        return {name: [] for name in names}
+    return dict(zip(names, map(list, zip(*rows))))
+
+
+def merge_series(per_column: Dict[str, Dict[str, list]]) -> Dict[str, list]:
+    """Join per-column ``{"timestamp", "values"}`` series (LTTB output) on their
+    timestamps, with None where a column kept no point."""
+    timestamps = sorted(set().union(*(column["timestamp"] for column in per_column.values())))
+    series = {"timestamp": timestamps}
+    for name, column in per_column.items():
+        values = dict(zip(column["timestamp"], column["values"]))
+        series[name] = [values.get(ts) for ts in timestamps]
+    return series
+
+
+def encode(series: Dict[str, list], fmt: str) -> bytes:
+    """Encode columnar series; row JSON is left to the endpoint's response model."""
+    if fmt == "columnar":
+        return orjson.dumps(series)
+    if fmt == "msgpack":
+        # Timestamps travel as the MessagePack timestamp extension type
+        return msgpack.packb(series, datetime=True)
+    if fmt == "arrow":
+        return _encode_arrow(series)
+    raise UnsupportedFormat(f"Unknown format {fmt!r}")
+
+
+def _encode_arrow(series: Dict[str, list]) -> bytes:
+    arrays, fields = [], []
+    for name, values in series.items():
+        if name == "timestamp":
+            array = pyarrow.array(values, type=pyarrow.timestamp("us", tz="UTC"))
+        else:
+            array = pyarrow.array(values, type=pyarrow.float64())
+        arrays.append(array)
+        fields.append(pyarrow.field(name, array.type))
+    batch = pyarrow.record_batch(arrays, schema=pyarrow.schema(fields))
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
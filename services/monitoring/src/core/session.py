@@ -1,35 +1,204 @@
 # services/monitoring/src/core/session.py
-from redis import Redis
+from redis.asyncio import Redis
 from uuid import uuid4
+from collections import OrderedDict
+import asyncio
 import json
+import logging
+import time
 from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+from .redis_client import create_redis, redis_client
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "session:invalidate"
+
+class LocalSessionCache:
+    """Small LRU/TTL cache of session payloads held by one worker.
+
+    Each entry also remembers when its Redis expiry was last extended so
+    sliding-expiry refreshes can be coalesced.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, List[Any]]" = OrderedDict()
+
+    def get(self, session_id: str) -> Optional[List[Any]]:
+        """Return the live ``[expires_at, data, refreshed_at]`` entry, if any."""
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[session_id]
+            return None
+        self._entries.move_to_end(session_id)
+        return entry
+
+    def set(self, session_id: str, data: dict, refreshed_at: float):
+        if self.max_size <= 0:
+            return
+        self._entries[session_id] = [time.monotonic() + self.ttl, data, refreshed_at]
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, session_id: str):
+        self._entries.pop(session_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
 class SessionManager:
-    def __init__(self, redis_url: str):
-        self.redis = Redis.from_url(redis_url)
+    """Cookie sessions stored in Redis as JSON with a sliding 24h expiry.
+
+    Commands go through the shared asyncio client unless ``redis_url`` or a
+    Redis-compatible ``client`` (e.g. a test stand-in) is given.
+    Reads are served from a per-worker LRU when possible, and deletions are
+    broadcast over Redis pub/sub so other workers drop their copies.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, client: Optional[Redis] = None):
+        if client is None:
+            client = create_redis(redis_url) if redis_url else redis_client
+        self.redis = client
         self.session_ttl = timedelta(hours=24)
+        self.refresh_interval = settings.SESSION_REFRESH_INTERVAL
+        self.local = LocalSessionCache(settings.SESSION_CACHE_MAX_SIZE, settings.SESSION_CACHE_TTL)
+        self._stop_event = asyncio.Event()
+        self.is_listening = False
+
+        self.hits = 0
+        self.misses = 0
+        self.redis_ops = 0
+        self.redis_ops_saved = 0
+        self._started = time.monotonic()
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"session:{session_id}"
 
     async def create_session(self, user_data: dict) -> str:
         session_id = str(uuid4())
-        self.redis.setex(
-            f"session:{session_id}",
+        await self.redis.setex(
+            self._key(session_id),
             self.session_ttl,
             json.dumps(user_data)
         )
+        self.redis_ops += 1
+        self.local.set(session_id, user_data, time.monotonic())
         return session_id
 
-    async def get_session(self, session_id: str) -> dict:
-        data = self.redis.get(f"session:{session_id}")
-        if data:
-            return json.loads(data)
-        return None
+    async def get_session(self, session_id: str, refresh: bool = False) -> Optional[dict]:
+        """Load a session; with ``refresh`` its expiry slides forward.
+
+        Local hits skip Redis entirely, except that the expiry is re-extended
+        at most once per ``refresh_interval``. Misses read and refresh in a
+        single GETEX round trip.
+        """
+        now = time.monotonic()
+        entry = self.local.get(session_id)
+        if entry is not None:
+            self.hits += 1
+            if refresh and now - entry[2] >= self.refresh_interval:
+                self.redis_ops += 1
+                if not await self.redis.expire(self._key(session_id), self.session_ttl):
+                    # Expired or deleted in Redis without us hearing about it
+                    self.local.discard(session_id)
+                    return None
+                entry[2] = now
+            else:
+                self.redis_ops_saved += 1
+            return entry[1]
+
+        self.misses += 1
+        self.redis_ops += 1
+        if refresh:
+            data = await self.redis.getex(self._key(session_id), ex=self.session_ttl)
+        else:
+            data = await self.redis.get(self._key(session_id))
+        if not data:
+            return None
+        session_data = json.loads(data)
+        # An unrefreshed read leaves the next refresh due immediately
+        self.local.set(session_id, session_data, now if refresh else float("-inf"))
+        return session_data
 
     async def delete_session(self, session_id: str):
-        self.redis.delete(f"session:{session_id}")
+        self.local.discard(session_id)
+        await self.redis.delete(self._key(session_id))
+        self.redis_ops += 1
+        try:
+            await self.redis.publish(INVALIDATION_CHANNEL, session_id)
+        except Exception as e:
+            # Other workers' copies still expire after SESSION_CACHE_TTL
+            logger.error(f"Error publishing session invalidation: {str(e)}")
 
-    async def refresh_session(self, session_id: str):
-        data = await self.get_session(session_id)
-        if data:
-            self.redis.expire(f"session:{session_id}", self.session_ttl)
+    async def refresh_session(self, session_id: str) -> bool:
+        # EXPIRE reports whether the key exists, so no separate read is needed
+        self.redis_ops += 1
+        if await self.redis.expire(self._key(session_id), self.session_ttl):
+            entry = self.local.get(session_id)
+            if entry is not None:
+                entry[2] = time.monotonic()
             return True
+        self.local.discard(session_id)
         return False
+
+    async def start(self):
+        """Drop locally cached sessions deleted by other workers until stopped."""
+        self.is_listening = True
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    await self._listen()
+                except Exception as e:
+                    logger.error(f"Session invalidation listener failed: {str(e)}")
+                    # Invalidations may have been missed while disconnected
+                    self.local.clear()
+                    try:
+                        await asyncio.wait_for(self._stop_event.wait(), timeout=1.0)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self.is_listening = False
+
+    async def _listen(self):
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            while not self._stop_event.is_set():
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None:
+                    session_id = message["data"]
+                    if isinstance(session_id, bytes):
+                        session_id = session_id.decode()
+                    self.local.discard(session_id)
+        finally:
+            await pubsub.aclose()
+
+    async def stop(self):
+        self._stop_event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        uptime = time.monotonic() - self._started
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "cached_sessions": len(self.local),
+            "redis_ops": self.redis_ops,
+            "redis_ops_saved": self.redis_ops_saved,
+            "redis_ops_saved_per_sec": self.redis_ops_saved / uptime if uptime else 0.0,
+        }
+
+# Process-wide session store used by the auth endpoints
+session_manager = SessionManager()
@@ -0,0 +1,88 @@
+# services/monitoring/src/core/stepwise.py
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# A series stored with deadband suppression is a step function: each stored
+# value holds until the next stored sample, or for at most ``horizon``
+# seconds, after which the series is treated as missing. Points are
+# (epoch seconds, value) sorted ascending and may start before the window.
+
+Point = Tuple[float, Optional[float]]
+
+
+def hold_segments(
+    points: Sequence[Point], start: float, end: float, horizon: float
+) -> List[Tuple[float, float, float]]:
+    """``(from, to, value)`` intervals the series holds within ``[start, end]``."""
+    segments = []
+    for i, (t, value) in enumerate(points):
+        until = t + horizon
+        if i + 1 < len(points):
+            until = min(until, points[i + 1][0])
+        lo, hi = max(t, start), min(until, end)
+        if value is not None and hi > lo:
+            segments.append((lo, hi, value))
+    return segments
+
+
+def _weighted_p95(parts: List[Tuple[float, float]]) -> float:
+    parts = sorted(parts, key=lambda part: part[1])
+    target = 0.95 * sum(weight for weight, _ in parts)
+    cumulative = 0.0
+    for weight, value in parts:
+        cumulative += weight
+        if cumulative >= target:
+            return value
+    return parts[-1][1]
+
+
+def _aggregate(parts: List[Tuple[float, float]], agg: str) -> float:
+    # parts are (duration, value) in time order
+    if agg == "avg":
+        return sum(weight * value for weight, value in parts) / sum(weight for weight, _ in parts)
+    if agg == "min":
+        return min(value for _, value in parts)
+    if agg == "max":
+        return max(value for _, value in parts)
+    if agg == "p95":
+        return _weighted_p95(parts)
+    return parts[-1][1]
+
+
+def locf_buckets(
+    points: Sequence[Point], start: float, end: float, step: float, agg: str, horizon: float
+) -> Dict[float, float]:
+    """Time-weighted aggregate per bucket of the step series carried forward.
+
+    Buckets are aligned to multiples of ``step`` since the epoch, like the SQL
+    bucketing, and are keyed by their start. A bucket gets a value when the
+    series holds for any part of it; ``avg`` and ``p95`` weight each value by
+    how long it held, ``last`` is the value in force at the bucket's end.
+    """
+    buckets: Dict[float, List[Tuple[float, float]]] = {}
+    for lo, hi, value in hold_segments(points, start, end, horizon):
+        bucket = math.floor(lo / step) * step
+        while bucket < hi:
+            part = min(hi, bucket + step) - max(lo, bucket)
+            if part > 0:
+                buckets.setdefault(bucket, []).append((part, value))
+            bucket += step
+    return {bucket: _aggregate(parts, agg) for bucket, parts in sorted(buckets.items())}
+
+
+def locf_points(points: Sequence[Point], start: float, end: float, horizon: float) -> List[Point]:
+    """The series' change points clipped to ``[start, end]``.
+
+    A value carried in from before ``start`` is placed at ``start``, and the
+    last value is extended to where it stops holding, so a chart drawn as
+    steps covers the whole window.
+    """
+    result: List[Point] = []
+    segments = hold_segments(points, start, end, horizon)
+    for i, (lo, hi, value) in enumerate(segments):
+        result.append((lo, value))
+        following = segments[i + 1][0] if i + 1 < len(segments) else None
+        # Close the step where the value stops holding before the next one
+        if following is None or following > hi:
+            result.append((hi, value))
+    return result
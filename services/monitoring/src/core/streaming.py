@@ -0,0 +1,168 @@
+# services/monitoring/src/core/streaming.py
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from redis.asyncio import Redis
+
+from ..config import settings
+from .redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHANNEL = "metrics:stream"
+
+
+def serialize_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in row.items()
+    }
+
+
+class StreamSubscriber:
+    """Pending samples for one live connection.
+
+    The buffer holds at most ``max_pending`` samples. When a slow client lets
+    it overflow, older samples are coalesced down to the latest one per
+    resource and the number discarded is reported with the next batch.
+    """
+
+    def __init__(self, resource_ids: Iterable[str], max_pending: int):
+        self.resource_ids: Set[str] = set(resource_ids)
+        self.max_pending = max_pending
+        self._pending: List[Dict[str, Any]] = []
+        self._ready = asyncio.Event()
+        self.dropped = 0
+
+    def offer(self, rows: Iterable[Dict[str, Any]]):
+        matched = [row for row in rows if row["resource_id"] in self.resource_ids]
+        if not matched:
+            return
+        self._pending.extend(matched)
+        if len(self._pending) > self.max_pending:
+            self._coalesce()
+        self._ready.set()
+
+    def _coalesce(self):
+        latest: Dict[str, Dict[str, Any]] = {}
+        for row in self._pending:
+            latest.pop(row["resource_id"], None)
+            latest[row["resource_id"]] = row
+        # Still over budget only when subscribed to more resources than fit
+        kept = list(latest.values())[-self.max_pending:]
+        self.dropped += len(self._pending) - len(kept)
+        self._pending = kept
+
+    async def next_batch(self, timeout: Optional[float] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """Wait for pending samples and take all of them; empty on timeout."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return [], 0
+        self._ready.clear()
+        batch, self._pending = self._pending, []
+        dropped, self.dropped = self.dropped, 0
+        return batch, dropped
+
+
+class StreamHub:
+    """Fans newly ingested samples out to live WebSocket/SSE connections.
+
+    Registered as an ingestion listener. Batches are published once to a
+    Redis channel that every worker subscribes to, so a connection receives
+    samples whichever worker ingested them. Without a working subscription
+    the hub falls back to delivering to this worker's connections only.
+    """
+
+    def __init__(self, client: Optional[Redis] = None, fanout: Optional[bool] = None):
+        self.redis = client or redis_client
+        self.fanout = settings.STREAM_REDIS_FANOUT if fanout is None else fanout
+        self.subscribers: Set[StreamSubscriber] = set()
+        # Called with every dispatched batch, whichever worker ingested it
+        self._watchers: List[Callable[[List[Dict[str, Any]]], None]] = []
+        # Monotonic time the current Redis subscription started; None when not subscribed
+        self.subscribed_since: Optional[float] = None
+        self._stop_event = asyncio.Event()
+
+    def subscribe(self, resource_ids: Iterable[str]) -> StreamSubscriber:
+        subscriber = StreamSubscriber(resource_ids, settings.STREAM_MAX_PENDING)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: StreamSubscriber):
+        self.subscribers.discard(subscriber)
+
+    def add_watcher(self, callback: Callable[[List[Dict[str, Any]]], None]):
+        self._watchers.append(callback)
+
+    def remove_watcher(self, callback: Callable[[List[Dict[str, Any]]], None]):
+        if callback in self._watchers:
+            self._watchers.remove(callback)
+
+    def dispatch(self, rows: List[Dict[str, Any]]):
+        for watcher in self._watchers:
+            try:
+                watcher(rows)
+            except Exception as e:
+                logger.error(f"Error in live metrics watcher: {str(e)}")
+        for subscriber in self.subscribers:
+            subscriber.offer(rows)
+
+    async def publish(self, rows: List[Dict[str, Any]]):
+        """Ingestion listener: broadcast committed rows to every worker."""
+        if not rows:
+            return
+        payload = [serialize_row(row) for row in rows]
+        if self.subscribed_since is not None:
+            try:
+                # Delivered back to this worker through its own subscription
+                await self.redis.publish(STREAM_CHANNEL, json.dumps(payload))
+                return
+            except Exception as e:
+                logger.error(f"Error publishing live metrics: {str(e)}")
+        self.dispatch(payload)
+
+    async def start(self):
+        """Relay samples published by any worker to local connections until stopped."""
+        if not self.fanout:
+            return
+        while not self._stop_event.is_set():
+            try:
+                await self._listen()
+            except Exception as e:
+                logger.error(f"Live metrics subscription failed: {str(e)}")
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _listen(self):
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(STREAM_CHANNEL)
+            self.subscribed_since = time.monotonic()
+            while not self._stop_event.is_set():
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None:
+                    self.dispatch(json.loads(message["data"]))
+        finally:
+            self.subscribed_since = None
+            await pubsub.aclose()
+
+    async def stop(self):
+        self._stop_event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": len(self.subscribers),
+            "fanout": self.subscribed_since is not None,
+            "pending": sum(len(subscriber._pending) for subscriber in self.subscribers),
+        }
+
+
+# Process-wide hub fed by the ingestion pipeline
+stream_hub = StreamHub()
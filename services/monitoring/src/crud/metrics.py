@@ -1,21 +1,206 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, bindparam, insert, update, func, text, literal_column, tuple_, DateTime, Float
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert as pg_insert
 from sqlalchemy.orm import selectinload
-from datetime import datetime, timedelta
-from typing import List, Optional
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
-from ..models.metrics import ResourceMetrics, Alert, ResourceMetadata
+from ..core.downsample import extreme_points, lttb
+from ..core.stepwise import locf_buckets, locf_points
+from ..models.metrics import (
+    ResourceMetrics,
+    ResourceLatest,
+    Alert,
+    ResourceMetadata,
+    METRIC_COLUMNS,
+    ROLLUP_AGGREGATES,
+    ROLLUP_TABLES,
+)
 from ..schemas.metrics import MetricsCreate, AlertCreate, ResourceMetadataCreate
 
+# bucket name -> (seconds, date_trunc unit when one matches exactly)
+BUCKETS = {
+    "1m": (60, "minute"),
+    "5m": (300, None),
+    "1h": (3600, "hour"),
+    "1d": (86400, "day"),
+}
+AGGREGATES = ("avg", "min", "max", "p95", "last")
+# max_points reads pre-aggregate in SQL into this many slots per output point
+DOWNSAMPLE_SLOTS_PER_POINT = 4
+
+def _bucket_expression(bucket: str, use_timescale: bool, ts=ResourceMetrics.timestamp):
+    seconds, trunc_unit = BUCKETS[bucket]
+    # Inlined rather than bound so the SELECT and GROUP BY expressions match exactly
+    if use_timescale:
+        return func.time_bucket(literal_column(f"interval '{seconds} seconds'"), ts)
+    if trunc_unit:
+        return func.date_trunc(literal_column(f"'{trunc_unit}'"), ts)
+    step = literal_column(str(seconds))
+    return func.to_timestamp(func.floor(func.extract("epoch", ts) / step) * step)
+
+def _aggregate_expression(agg: str, column):
+    if agg == "avg":
+        return func.avg(column)
+    if agg == "min":
+        return func.min(column)
+    if agg == "max":
+        return func.max(column)
+    if agg == "p95":
+        return func.percentile_cont(0.95).within_group(column.asc())
+    # last: value of the newest sample in the bucket
+    ordered = aggregate_order_by(column, ResourceMetrics.timestamp.desc())
+    return func.array_agg(ordered, type_=ARRAY(Float))[1]
+
+def _pick_rollup(bucket: str, agg: str) -> Optional[str]:
+    """Coarsest rollup whose buckets tile ``bucket`` exactly, if ``agg`` can use one."""
+    if agg not in ROLLUP_AGGREGATES:
+        return None
+    seconds = BUCKETS[bucket][0]
+    candidates = [
+        (width, name) for name, (width, _) in ROLLUP_TABLES.items()
+        if width <= seconds and seconds % width == 0
+    ]
+    return max(candidates)[1] if candidates else None
+
+def _coarsest_rollup(seconds: int) -> Optional[str]:
+    """Coarsest rollup whose buckets are no wider than ``seconds``."""
+    candidates = [(width, name) for name, (width, _) in ROLLUP_TABLES.items() if width <= seconds]
+    return max(candidates)[1] if candidates else None
+
+def _time_of(ts, order):
+    """Timestamp of the first row of a group in ``order``."""
+    return func.array_agg(aggregate_order_by(ts, order), type_=ARRAY(DateTime(timezone=True)))[1]
+
+def _rollup_aggregate_expression(agg: str, table, metric: str):
+    if agg == "avg":
+        # Weighted by the number of non-null samples behind each rollup average
+        count = table.c[f"{metric}_count"]
+        return func.sum(table.c[f"{metric}_avg"] * count) / func.nullif(func.sum(count), 0)
+    if agg == "min":
+        return func.min(table.c[f"{metric}_min"])
+    return func.max(table.c[f"{metric}_max"])
+
 class MetricsCRUD:
+    _timescaledb: Optional[bool] = None
+    _rollups: Optional[bool] = None
+
+    @classmethod
+    async def has_timescaledb(cls, db: AsyncSession) -> bool:
+        """Whether the timescaledb extension is installed (checked once per process)."""
+        if cls._timescaledb is None:
+            result = await db.execute(
+                text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')")
+            )
+            cls._timescaledb = bool(result.scalar())
+        return cls._timescaledb
+
     @staticmethod
     async def create_metrics(db: AsyncSession, metrics: MetricsCreate) -> ResourceMetrics:
-        db_metrics = ResourceMetrics(**metrics.model_dump())
+        db_metrics = ResourceMetrics(**metrics.model_dump(exclude_none=True))
         db.add(db_metrics)
         await db.commit()
         await db.refresh(db_metrics)
         return db_metrics
 
+    @staticmethod
+    async def create_metrics_bulk(db: AsyncSession, rows: List[Dict[str, Any]]) -> List[int]:
+        """Insert many samples with a single multi-row INSERT and one commit."""
+        if not rows:
+            return []
+        query = insert(ResourceMetrics).returning(
+            ResourceMetrics.id, sort_by_parameter_order=True
+        )
+        result = await db.execute(query, rows)
+        ids = list(result.scalars().all())
+        await db.commit()
+        return ids
+
+    @classmethod
+    async def has_rollups(cls, db: AsyncSession) -> bool:
+        """Whether the rollup relations from the migrations exist."""
+        if cls._rollups is None:
+            result = await db.execute(text("SELECT to_regclass('resource_metrics_1m') IS NOT NULL"))
+            cls._rollups = bool(result.scalar())
+        return cls._rollups
+
+    @staticmethod
+    async def upsert_rollups(
+        db: AsyncSession,
+        granularity: str,
+        rows: List[Dict[str, Any]],
+        commit: bool = True
+    ):
+        """Merge partial aggregates into a plain rollup table.
+
+        Pass ``commit=False`` to merge several granularities in one transaction.
+        """
+        if not rows:
+            return
+        table = ROLLUP_TABLES[granularity][1]
+        query = pg_insert(table)
+        updates = {"sample_count": table.c.sample_count + query.excluded.sample_count}
+        for metric in METRIC_COLUMNS:
+            avg, new_avg = table.c[f"{metric}_avg"], query.excluded[f"{metric}_avg"]
+            count, new_count = table.c[f"{metric}_count"], query.excluded[f"{metric}_count"]
+            updates[f"{metric}_avg"] = func.coalesce(
+                (avg * count + new_avg * new_count) / func.nullif(count + new_count, 0), avg, new_avg
+            )
+            updates[f"{metric}_count"] = count + new_count
+            updates[f"{metric}_min"] = func.least(table.c[f"{metric}_min"], query.excluded[f"{metric}_min"])
+            updates[f"{metric}_max"] = func.greatest(table.c[f"{metric}_max"], query.excluded[f"{metric}_max"])
+        query = query.on_conflict_do_update(index_elements=["resource_id", "bucket"], set_=updates)
+        await db.execute(query, rows)
+        if commit:
+            await db.commit()
+
+    @staticmethod
+    async def upsert_latest(db: AsyncSession, rows: List[Dict[str, Any]]):
+        """Replace last values, skipping rows older than what is already stored."""
+        if not rows:
+            return
+        query = pg_insert(ResourceLatest)
+        query = query.on_conflict_do_update(
+            index_elements=["resource_id"],
+            set_={
+                name: query.excluded[name]
+                for name in ("resource_type", *METRIC_COLUMNS, "timestamp")
+            },
+            where=query.excluded.timestamp >= ResourceLatest.timestamp,
+        )
+        await db.execute(query, rows)
+        await db.commit()
+
+    @staticmethod
+    async def get_latest_values(
+        db: AsyncSession,
+        resource_id: Optional[str] = None,
+        resource_type: Optional[str] = None
+    ) -> List[ResourceLatest]:
+        query = select(ResourceLatest).order_by(ResourceLatest.resource_id)
+        if resource_id is not None:
+            query = query.where(ResourceLatest.resource_id == resource_id)
+        if resource_type is not None:
+            query = query.where(ResourceLatest.resource_type == resource_type)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    @staticmethod
+    async def maintain_partitions(db: AsyncSession, retention_days: int):
+        """Roll the monthly partitions forward and drop expired ones.
+
+        Only needed for the plain-Postgres layout; TimescaleDB manages chunks
+        and retention through its own background policies.
+        """
+        if await MetricsCRUD.has_timescaledb(db):
+            return
+        await db.execute(
+            text("SELECT resource_metrics_maintain_partitions(make_interval(days => :days))"),
+            {"days": retention_days}
+        )
+        await db.commit()
+
     @staticmethod
     async def get_metrics(
         db: AsyncSession,
@@ -34,6 +219,270 @@ class MetricsCRUD:
         result = await db.execute(query)
         return result.scalars().all()
 
+    @staticmethod
+    async def get_latest_timestamp(db: AsyncSession, resource_id: str) -> Optional[datetime]:
+        result = await db.execute(
+            select(func.max(ResourceMetrics.timestamp)).where(ResourceMetrics.resource_id == resource_id)
+        )
+        return result.scalar()
+
+    @staticmethod
+    async def get_latest_sub_resources(
+        db: AsyncSession,
+        prefix: str,
+        since: datetime
+    ) -> List[ResourceMetrics]:
+        """The newest sample since ``since`` of every resource whose id starts with ``prefix``.
+
+        Lists sub-resources such as "web-1:cpu0"; the prefix is matched
+        literally, so ids containing ``%`` or ``_`` are safe.
+        """
+        query = select(ResourceMetrics).where(
+            ResourceMetrics.resource_id.startswith(prefix, autoescape=True),
+            ResourceMetrics.timestamp >= since
+        ).distinct(ResourceMetrics.resource_id).order_by(
+            ResourceMetrics.resource_id, ResourceMetrics.timestamp.desc()
+        )
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_metrics_columns(
+        db: AsyncSession,
+        resource_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        columns: Sequence[str] = METRIC_COLUMNS
+    ) -> List[Tuple[Any, ...]]:
+        """``(timestamp, *columns)`` tuples, newest first, without building ORM objects."""
+        query = select(
+            ResourceMetrics.timestamp,
+            *(getattr(ResourceMetrics, name) for name in columns)
+        ).where(
+            and_(
+                ResourceMetrics.resource_id == resource_id,
+                ResourceMetrics.timestamp >= start_time,
+                ResourceMetrics.timestamp <= end_time
+            )
+        ).order_by(ResourceMetrics.timestamp.desc())
+
+        result = await db.execute(query)
+        return result.all()
+
+    @staticmethod
+    async def get_metrics_page(
+        db: AsyncSession,
+        resource_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[ResourceMetrics]:
+        """Newest-first samples, continuing after the ``(timestamp, id)`` of the previous page."""
+        query = select(ResourceMetrics).where(
+            ResourceMetrics.resource_id == resource_id,
+            ResourceMetrics.timestamp >= start_time,
+            ResourceMetrics.timestamp <= end_time
+        )
+        if after:
+            query = query.where(tuple_(ResourceMetrics.timestamp, ResourceMetrics.id) < tuple_(*after))
+        query = query.order_by(ResourceMetrics.timestamp.desc(), ResourceMetrics.id.desc()).limit(limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    @staticmethod
+    async def stream_metrics(
+        db: AsyncSession,
+        resource_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        chunk_size: int = 5000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield samples oldest-first in chunks read through a server-side cursor.
+
+        Memory stays bounded by ``chunk_size`` however large the range is.
+        Rows are plain mappings rather than ORM objects.
+        """
+        columns = ResourceMetrics.__table__.c
+        query = (
+            select(columns.id, columns.resource_id, columns.resource_type,
+                   *(columns[name] for name in METRIC_COLUMNS), columns.timestamp)
+            .where(
+                columns.resource_id == resource_id,
+                columns.timestamp >= start_time,
+                columns.timestamp <= end_time
+            )
+            .order_by(columns.timestamp, columns.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await db.stream(query)
+        async for partition in result.mappings().partitions():
+            yield partition
+
+    @staticmethod
+    async def get_metrics_held(
+        db: AsyncSession,
+        resource_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        horizon: float,
+        columns: Sequence[str] = METRIC_COLUMNS
+    ) -> List[Tuple[Any, ...]]:
+        """``(timestamp, *columns)`` tuples oldest first, led by the sample in force at ``start_time``.
+
+        The leading sample is looked for at most ``horizon`` seconds before the window.
+        """
+        selected = (ResourceMetrics.timestamp, *(getattr(ResourceMetrics, name) for name in columns))
+        previous = select(*selected).where(
+            ResourceMetrics.resource_id == resource_id,
+            ResourceMetrics.timestamp < start_time,
+            ResourceMetrics.timestamp >= start_time - timedelta(seconds=horizon)
+        ).order_by(ResourceMetrics.timestamp.desc()).limit(1)
+        window = select(*selected).where(
+            ResourceMetrics.resource_id == resource_id,
+            ResourceMetrics.timestamp >= start_time,
+            ResourceMetrics.timestamp <= end_time
+        ).order_by(ResourceMetrics.timestamp)
+
+        leading = (await db.execute(previous)).all()
+        return [*leading, *(await db.execute(window)).all()]
+
+    @staticmethod
+    async def get_metrics_bucketed(
+        db: AsyncSession,
+        resource_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        bucket: str,
+        agg: str,
+        columns: Sequence[str] = METRIC_COLUMNS,
+        fill: Optional[str] = None,
+        horizon: float = 0
+    ) -> Dict[str, Any]:
+        """Aggregate samples into fixed time buckets in SQL, returned as columnar arrays.
+
+        avg/min/max are answered from the coarsest rollup that fits the bucket
+        so long ranges never touch raw samples; p95/last need the raw rows.
+
+        ``fill="locf"`` treats the stored samples as a step series, each value
+        holding until the next sample or for ``horizon`` seconds, and
+        aggregates it time-weighted in Python. That is exact for series
+        stored with deadband suppression, which are sparse enough to read raw.
+        """
+        if fill == "locf":
+            rows = await MetricsCRUD.get_metrics_held(db, resource_id, start_time, end_time, horizon, columns)
+            step = BUCKETS[bucket][0]
+            per_column = {}
+            for offset, name in enumerate(columns, start=1):
+                points = [(row[0].timestamp(), row[offset]) for row in rows]
+                per_column[name] = locf_buckets(
+                    points, start_time.timestamp(), end_time.timestamp(), step, agg, horizon
+                )
+            buckets = sorted(set().union(*per_column.values()))
+            series = {"timestamp": [datetime.fromtimestamp(b, tz=timezone.utc) for b in buckets]}
+            for name in columns:
+                series[name] = [per_column[name].get(b) for b in buckets]
+            return series
+
+        use_timescale = await MetricsCRUD.has_timescaledb(db)
+        rollup = _pick_rollup(bucket, agg) if await MetricsCRUD.has_rollups(db) else None
+
+        if rollup:
+            table = ROLLUP_TABLES[rollup][1]
+            bucket_expr = _bucket_expression(bucket, use_timescale, table.c.bucket).label("bucket")
+            aggregates = [_rollup_aggregate_expression(agg, table, name).label(name) for name in columns]
+            filters = and_(
+                table.c.resource_id == resource_id,
+                table.c.bucket >= start_time,
+                table.c.bucket <= end_time
+            )
+        else:
+            bucket_expr = _bucket_expression(bucket, use_timescale).label("bucket")
+            aggregates = [_aggregate_expression(agg, getattr(ResourceMetrics, name)).label(name) for name in columns]
+            filters = and_(
+                ResourceMetrics.resource_id == resource_id,
+                ResourceMetrics.timestamp >= start_time,
+                ResourceMetrics.timestamp <= end_time
+            )
+
+        query = select(bucket_expr, *aggregates).where(filters).group_by(bucket_expr).order_by(bucket_expr)
+
+        result = await db.execute(query)
+        rows = result.all()
+        series = {"timestamp": [row[0] for row in rows]}
+        for offset, name in enumerate(columns, start=1):
+            series[name] = [row[offset] for row in rows]
+        return series
+
+    @staticmethod
+    async def get_metrics_downsampled(
+        db: AsyncSession,
+        resource_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        max_points: int,
+        columns: Sequence[str] = METRIC_COLUMNS,
+        fill: Optional[str] = None,
+        horizon: float = 0
+    ) -> Dict[str, Dict[str, list]]:
+        """Reduce each column to at most ``max_points`` points with LTTB.
+
+        The window is first cut into DOWNSAMPLE_SLOTS_PER_POINT slots per
+        point and each slot reduced in SQL to its minimum and maximum with
+        their timestamps, read from the coarsest rollup no wider than a slot
+        when there is one. LTTB then runs on those few thousand points at
+        most, however many samples the window holds.
+
+        With ``fill="locf"`` the points are the step series' change points
+        over the whole window (see ``locf_points``), for drawing as steps.
+        """
+        if fill == "locf":
+            rows = await MetricsCRUD.get_metrics_held(db, resource_id, start_time, end_time, horizon, columns)
+            start, end = start_time.timestamp(), end_time.timestamp()
+        else:
+            span = (end_time - start_time).total_seconds()
+            slot_width = max(1, math.ceil(span / (max_points * DOWNSAMPLE_SLOTS_PER_POINT)))
+            rollup = _coarsest_rollup(slot_width) if await MetricsCRUD.has_rollups(db) else None
+            if rollup:
+                rollup_width, table = ROLLUP_TABLES[rollup]
+                slot_width -= slot_width % rollup_width
+                ts = table.c.bucket
+                bounds = [(table.c[f"{name}_min"], table.c[f"{name}_max"]) for name in columns]
+                filters = and_(table.c.resource_id == resource_id, ts >= start_time, ts <= end_time)
+            else:
+                ts = ResourceMetrics.timestamp
+                bounds = [(getattr(ResourceMetrics, name),) * 2 for name in columns]
+                filters = and_(ResourceMetrics.resource_id == resource_id, ts >= start_time, ts <= end_time)
+
+            slot = func.floor(func.extract("epoch", ts) / literal_column(str(slot_width))).label("slot")
+            extremes = []
+            for low, high in bounds:
+                extremes += [
+                    _time_of(ts, low.asc().nulls_last()), func.min(low),
+                    _time_of(ts, high.desc().nulls_last()), func.max(high),
+                ]
+            query = select(slot, *extremes).where(filters).group_by(slot).order_by(slot)
+
+            result = await db.execute(query)
+            rows = result.all()
+
+        series = {}
+        for offset, name in enumerate(columns):
+            if fill == "locf":
+                held = locf_points([(row[0].timestamp(), row[offset + 1]) for row in rows], start, end, horizon)
+                points = [(datetime.fromtimestamp(t, tz=timezone.utc), value) for t, value in held]
+            else:
+                first = 1 + 4 * offset
+                points = extreme_points(row[first:first + 4] for row in rows)
+            x = [point[0].timestamp() for point in points]
+            y = [point[1] for point in points]
+            keep = lttb(x, y, max_points)
+            series[name] = {
+                "timestamp": [points[i][0] for i in keep],
+                "values": [points[i][1] for i in keep],
+            }
+        return series
+
     @staticmethod
     async def create_alert(db: AsyncSession, alert: AlertCreate) -> Alert:
         db_alert = Alert(**alert.model_dump())
@@ -55,6 +504,95 @@ class MetricsCRUD:
 
         return db_alert
 
+    @staticmethod
+    async def create_alerts_bulk(
+        db: AsyncSession,
+        rows: List[Dict[str, Any]],
+        commit: bool = True
+    ) -> List[int]:
+        """Insert many alerts with a single multi-row INSERT."""
+        if not rows:
+            return []
+        query = insert(Alert).returning(Alert.id, sort_by_parameter_order=True)
+        result = await db.execute(query, rows)
+        ids = list(result.scalars().all())
+        if commit:
+            await db.commit()
+        return ids
+
+    @staticmethod
+    async def resolve_alerts_bulk(
+        db: AsyncSession,
+        resolutions: List[Dict[str, Any]],
+        commit: bool = True
+    ):
+        """Set ``resolved`` on many alerts; each item is ``{"id": ..., "resolved": ...}``."""
+        if resolutions:
+            # Core executemany: the ORM's bulk UPDATE by primary key rejects
+            # extra criteria. Alerts already resolved (e.g. by hand) keep their
+            # resolution time.
+            alerts = Alert.__table__
+            query = update(alerts).where(alerts.c.id == bindparam("alert_id"), alerts.c.resolved.is_(None))
+            await db.execute(
+                query, [{"alert_id": item["id"], "resolved": item["resolved"]} for item in resolutions]
+            )
+        if commit:
+            await db.commit()
+
+    @staticmethod
+    async def list_alerts(
+        db: AsyncSession,
+        limit: int,
+        status: str = "all",
+        severity: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+    ) -> List[Alert]:
+        """Newest-first alerts, continuing after the ``(timestamp, id)`` of the previous page."""
+        query = select(Alert)
+        if status == "open":
+            query = query.where(Alert.resolved.is_(None))
+        elif status == "resolved":
+            query = query.where(Alert.resolved.is_not(None))
+        if severity:
+            query = query.where(Alert.severity == severity)
+        if resource_id:
+            query = query.where(Alert.resource_id == resource_id)
+        if start_time:
+            query = query.where(Alert.timestamp >= start_time)
+        if end_time:
+            query = query.where(Alert.timestamp <= end_time)
+        if after:
+            # Row comparison lets the (…, timestamp, id) indexes seek straight to the page
+            query = query.where(tuple_(Alert.timestamp, Alert.id) < tuple_(*after))
+        query = query.order_by(Alert.timestamp.desc(), Alert.id.desc()).limit(limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    @staticmethod
+    async def resolve_alerts(db: AsyncSession, alert_ids: Sequence[int]) -> List[int]:
+        """Resolve many open alerts with one UPDATE; returns the ids that changed."""
+        if not alert_ids:
+            return []
+        query = (
+            update(Alert)
+            .where(Alert.id.in_(alert_ids), Alert.resolved.is_(None))
+            .values(resolved=func.now())
+            .returning(Alert.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(query)
+        resolved = list(result.scalars().all())
+        await db.commit()
+        return resolved
+
+    @staticmethod
+    async def get_open_alerts(db: AsyncSession) -> List[Alert]:
+        result = await db.execute(select(Alert).where(Alert.resolved.is_(None)))
+        return result.scalars().all()
+
     @staticmethod
     async def create_resource_metadata(
         db: AsyncSession,
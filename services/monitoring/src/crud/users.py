@@ -0,0 +1,54 @@
+# src/crud/users.py
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+
+from ..models.users import User
+from ..schemas.auth import UserCreate, UserUpdate
+
+async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    result = await db.execute(select(User).where(User.id == user_id))
+    return result.scalar_one_or_none()
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalar_one_or_none()
+
+async def get_users(db: AsyncSession, limit: int = 100, after_id: Optional[int] = None) -> List[User]:
+    """Users in id order, starting after ``after_id`` (keyset pagination)."""
+    query = select(User).order_by(User.id).limit(limit)
+    if after_id is not None:
+        query = query.where(User.id > after_id)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+async def create_user(db: AsyncSession, user: UserCreate) -> User:
+    # Imported here: core.auth depends on this module for user lookups
+    from ..core.auth import get_password_hash
+
+    db_user = User(
+        email=user.email,
+        username=user.username,
+        hashed_password=await get_password_hash(user.password)
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+async def update_user(db: AsyncSession, db_user: User, user_update: UserUpdate) -> User:
+    from ..core.auth import get_password_hash
+
+    changes = user_update.model_dump(exclude_unset=True)
+    password = changes.pop("password", None)
+    if password:
+        db_user.hashed_password = await get_password_hash(password)
+    for field, value in changes.items():
+        setattr(db_user, field, value)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+async def delete_user(db: AsyncSession, db_user: User):
+    await db.delete(db_user)
+    await db.commit()
@@ -1,14 +1,59 @@
 # services/monitoring/src/database.py
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from .config import settings
+from .core.instrumentation import DB_POOL_CHECKED_OUT, DB_POOL_CHECKOUT_SECONDS
+
+def _async_url(url: str) -> str:
+    return url.replace('postgresql://', 'postgresql+asyncpg://', 1)
+
+DATABASE_URL = _async_url(settings.SQLALCHEMY_DATABASE_URI)
+DATABASE_READ_URL = _async_url(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else None
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that reports checkout waits and connections in use."""
+
+    label = "primary"
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(self.label).observe(time.perf_counter() - started)
 
-DATABASE_URL = settings.DATABASE_URL.replace('postgresql://', 'postgresql+asyncpg://')
+def create_engine(url: str, pool_size: Optional[int] = None, label: str = "primary") -> AsyncEngine:
+    connect_args = {}
+    if url.startswith('postgresql+asyncpg://'):
+        # Prepared statements cached per connection; 0 behind a transaction-mode pgbouncer
+        connect_args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+    engine = create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=InstrumentedPool,
+        pool_size=pool_size or settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+    engine.sync_engine.pool.label = label
+    checked_out = DB_POOL_CHECKED_OUT.labels(label)
+    event.listen(engine.sync_engine, "checkout", lambda *args: checked_out.inc())
+    event.listen(engine.sync_engine, "checkin", lambda *args: checked_out.dec())
+    return engine
 
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,
-    future=True,
+engine = create_engine(DATABASE_URL)
+# Read-only sessions go to the replica when one is configured
+read_engine = (
+    create_engine(DATABASE_READ_URL, settings.DB_READ_POOL_SIZE, label="replica")
+    if DATABASE_READ_URL else engine
 )
 
 AsyncSessionLocal = sessionmaker(
@@ -17,6 +62,12 @@ AsyncSessionLocal = sessionmaker(
     expire_on_commit=False,
 )
 
+AsyncReadSessionLocal = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 async def get_db():
@@ -29,3 +80,14 @@ async def get_db():
             raise
         finally:
             await session.close()
+
+async def get_read_db():
+    """Session for endpoints that only read: no commit round trip, replica if configured."""
+    async with AsyncReadSessionLocal() as session:
+        # Closing rolls back the implicit transaction
+        yield session
+
+async def dispose_engines():
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
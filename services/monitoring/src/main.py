@@ -1,16 +1,32 @@
 # services/monitoring/src/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
-from .api.v1.endpoints import metrics, auth
-from .core.metrics_collector import MetricsCollector
+from fastapi.responses import ORJSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+from sqlalchemy import select
 from contextlib import asynccontextmanager
 import logging
 import asyncio
 
 from .config import settings
-from .api.v1.endpoints import metrics, auth
-from .database import get_db
+from .api.v1.endpoints import alerts, metrics, auth, stream
+from .database import dispose_engines, engine, get_db, read_engine
+from .core.alert_rules import AlertEngine
+from .core.auth import get_current_active_user, get_password_hash, password_hasher, token_invalidator
+from .core.ingestion import metrics_ingestor
+from .core.instrumentation import PrometheusMiddleware, mark_process_dead, render_latest
+from .core.latest import latest_snapshots
+from .core.leader import LeaderElection, create_lease
+from .core.maintenance import StorageMaintenance
+from .core.profiling import ProfilingMiddleware, TimedRoute, instrument_engine
+from .core.rollups import RollupWorker
+from .core.redis_client import redis_client
+from .core.session import session_manager
+from .core.response_cache import response_cache
+from .core.streaming import stream_hub
+from .core.metrics_cache import metrics_cache
 from .core.metrics_collector import MetricsCollector
+from .models.users import User
 
 # Configure logging
 logging.basicConfig(
@@ -19,37 +35,127 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Global metrics collector instance
+# Global metrics collector instance; set while this worker is the leader
 metrics_collector: MetricsCollector | None = None
+leader_election: LeaderElection | None = None
+
+class LeaderDuties:
+    """Work that must run in one worker only: sampling this host, evaluating
+    alert rules and storage maintenance.
+
+    Each term as leader gets fresh instances, since stopped services do not
+    restart.
+    """
+
+    def __init__(self):
+        self._services = []
+        self._alert_engine: AlertEngine | None = None
+
+    async def start(self):
+        global metrics_collector
+        # Sees samples ingested by every worker through the stream hub; open
+        # alerts are restored first so a new leader does not raise them again
+        alert_engine = self._alert_engine = AlertEngine()
+        try:
+            await alert_engine.restore()
+        except Exception as e:
+            logger.error(f"Could not restore open alerts: {str(e)}")
+        stream_hub.add_watcher(alert_engine.add_rows)
+        self._services.append((alert_engine.stop, asyncio.create_task(alert_engine.start())))
+
+        metrics_collector = MetricsCollector(sink=metrics_ingestor.submit, observer=latest_snapshots.record)
+        self._services.append(
+            (metrics_collector.stop_collection, asyncio.create_task(metrics_collector.start_collection()))
+        )
+
+        # Partition roll-forward / retention for non-Timescale deployments
+        storage_maintenance = StorageMaintenance()
+        self._services.append((storage_maintenance.stop, asyncio.create_task(storage_maintenance.start())))
+
+    async def stop(self):
+        global metrics_collector
+        if self._alert_engine:
+            stream_hub.remove_watcher(self._alert_engine.add_rows)
+            self._alert_engine = None
+        for stop, task in reversed(self._services):
+            await stop()
+            try:
+                await task
+            except Exception as e:
+                logger.error(f"Error in leader-only task: {str(e)}")
+        self._services = []
+        metrics_collector = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up monitoring service...")
+    await create_initial_admin()
+
+    # Incremental 1m/1h/1d rollups when Timescale continuous aggregates are
+    # unavailable; every worker folds in the rows it ingests, merges are additive
+    rollup_worker = RollupWorker()
+    rollup_task = asyncio.create_task(rollup_worker.start())
+
+    # Start buffered ingestion before anything can submit samples
+    metrics_ingestor.add_listener(rollup_worker.add_rows)
+    metrics_ingestor.add_listener(stream_hub.publish)
+    metrics_ingestor.add_listener(latest_snapshots.add_rows)
+    # Rows ingested by every worker, so cached windows have no gaps
+    stream_hub.add_watcher(metrics_cache.add_rows)
+    stream_hub.add_watcher(response_cache.observe)
+    stream_hub.add_watcher(latest_snapshots.observe)
+    await metrics_ingestor.start()
+    # Newest sample per resource, written to resource_latest for other nodes
+    latest_task = asyncio.create_task(latest_snapshots.start())
+
+    # Drop locally cached sessions that other workers delete
+    session_task = asyncio.create_task(session_manager.start())
+    # Drop cached principals of users other workers changed or deleted
+    token_task = asyncio.create_task(token_invalidator.start())
+    # Relay live samples from every worker to this worker's stream clients
+    stream_task = asyncio.create_task(stream_hub.start())
 
-    # Initialize metrics collector
-    global metrics_collector
-    metrics_collector = MetricsCollector()
-    collection_task = asyncio.create_task(metrics_collector.start_collection())
+    # With several workers, only the elected one collects, evaluates alerts
+    # and maintains storage
+    global leader_election
+    leader_duties = LeaderDuties()
+    leader_election = LeaderElection(create_lease(), leader_duties.start, leader_duties.stop)
+    election_task = asyncio.create_task(leader_election.start())
 
     yield
 
     # Shutdown
     logger.info("Shutting down monitoring service...")
-    if metrics_collector:
-        await metrics_collector.stop_collection()
-    if collection_task:
-        collection_task.cancel()
-        try:
-            await collection_task
-        except asyncio.CancelledError:
-            pass
+    # Stepping down releases the lease so another worker takes over at once
+    await leader_election.stop()
+    await election_task
+
+    # Drain buffered samples so nothing accepted is lost on shutdown
+    await metrics_ingestor.stop()
+    await rollup_worker.stop()
+    await rollup_task
+    await latest_snapshots.stop()
+    await latest_task
+    password_hasher.shutdown()
+    await session_manager.stop()
+    await session_task
+    await token_invalidator.stop()
+    await token_task
+    await stream_hub.stop()
+    await stream_task
+    await redis_client.aclose()
+    await dispose_engines()
+    mark_process_dead()
 
 app = FastAPI(
     title="CloudScale Monitoring",
     description="Resource monitoring and metrics collection service",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
+app.router.route_class = TimedRoute
 
 # Configure CORS
 app.add_middleware(
@@ -60,6 +166,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(PrometheusMiddleware)
+
+# Outermost, so Server-Timing covers the whole stack
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Statement timing feeds Server-Timing when profiling and the slow-query log always
+if settings.PROFILING_ENABLED or settings.SLOW_QUERY_THRESHOLD_MS:
+    instrument_engine(engine)
+    if read_engine is not engine:
+        instrument_engine(read_engine)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["authentication"])
 app.include_router(
@@ -69,16 +187,31 @@ app.include_router(
     dependencies=[Depends(get_current_active_user)]  # Require authentication for all metrics endpoints
 )
 
+app.include_router(
+    alerts.router,
+    prefix="/api/v1/monitoring",
+    tags=["alerts"],
+    dependencies=[Depends(get_current_active_user)]
+)
+
+# WebSocket/SSE clients authenticate with a token query parameter instead
+app.include_router(stream.router, prefix="/api/v1/monitoring", tags=["monitoring"])
+
 @app.get("/health")
 async def health_check():
     return {
         "status": "healthy",
         "version": settings.VERSION,
-        "collecting_metrics": metrics_collector is not None and metrics_collector.is_running
+        "collecting_metrics": metrics_collector is not None and metrics_collector.is_running,
+        "leader": leader_election is not None and leader_election.is_leader
     }
 
-@app.on_event("startup")
-async def startup_event():
+# Scraped by Prometheus; not routed through nginx
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(content=render_latest(), media_type=CONTENT_TYPE_LATEST)
+
+async def create_initial_admin():
     # Create initial admin user if not exists
     try:
         async for db in get_db():
@@ -88,7 +221,7 @@ async def startup_event():
                 admin_user = User(
                     username="admin",
                     email="admin@cloudscale.local",
-                    hashed_password=get_password_hash("admin123"),
+                    hashed_password=await get_password_hash("admin123"),
                     is_admin=True
                 )
                 db.add(admin_user)
@@ -1,25 +1,81 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, BigInteger, Float, String, DateTime, ForeignKey, Index, MetaData, Table
+from sqlalchemy.sql import func, text
 from ..database import Base
 
+# Numeric sample columns shared by storage, caching and aggregation code
+METRIC_COLUMNS = ("cpu_usage", "memory_usage", "disk_usage", "network_in", "network_out")
+
 class ResourceMetrics(Base):
     __tablename__ = "resource_metrics"
+    __table_args__ = (
+        Index("ix_resource_metrics_resource_id_timestamp", "resource_id", text("timestamp DESC")),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    resource_id = Column(String, index=True, nullable=False)
+    # Partitioned on timestamp, so it has to be part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    resource_id = Column(String, nullable=False)
     resource_type = Column(String, nullable=False)
     cpu_usage = Column(Float)
     memory_usage = Column(Float)
     disk_usage = Column(Float)
     network_in = Column(Float)
     network_out = Column(Float)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    timestamp = Column(DateTime(timezone=True), primary_key=True, server_default=func.now(), nullable=False)
+
+# Newest sample per resource, upserted by LatestSnapshots so every node can read it
+class ResourceLatest(Base):
+    __tablename__ = "resource_latest"
+
+    resource_id = Column(String, primary_key=True)
+    resource_type = Column(String, nullable=False)
+    cpu_usage = Column(Float)
+    memory_usage = Column(Float)
+    disk_usage = Column(Float)
+    network_in = Column(Float)
+    network_out = Column(Float)
+    timestamp = Column(DateTime(timezone=True), nullable=False)
+
+# Rollups are Timescale continuous aggregates or plain tables depending on the
+# deployment, so they live outside Base.metadata and are managed by migrations
+rollup_metadata = MetaData()
+
+ROLLUP_AGGREGATES = ("avg", "min", "max")
+
+def _rollup_table(name: str) -> Table:
+    return Table(
+        name,
+        rollup_metadata,
+        Column("resource_id", String, primary_key=True),
+        Column("bucket", DateTime(timezone=True), primary_key=True),
+        Column("sample_count", BigInteger, nullable=False),
+        *(
+            Column(f"{metric}_{agg}", Float)
+            for metric in METRIC_COLUMNS
+            for agg in ROLLUP_AGGREGATES
+        ),
+        # Non-null samples behind each average; sub-resource rows leave columns empty
+        *(Column(f"{metric}_count", BigInteger, nullable=False) for metric in METRIC_COLUMNS),
+    )
+
+# granularity -> (bucket width in seconds, table)
+ROLLUP_TABLES = {
+    "1m": (60, _rollup_table("resource_metrics_1m")),
+    "1h": (3600, _rollup_table("resource_metrics_1h")),
+    "1d": (86400, _rollup_table("resource_metrics_1d")),
+}
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Keyset pagination orders by (timestamp, id); these serve the
+        # per-resource listing, the open-alert listing and everything else
+        Index("ix_alerts_resource_id_timestamp_id", "resource_id", "timestamp", "id"),
+        Index("ix_alerts_open_timestamp_id", "timestamp", "id", postgresql_where=text("resolved IS NULL")),
+        Index("ix_alerts_timestamp_id", "timestamp", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    resource_id = Column(String, index=True, nullable=False)
+    resource_id = Column(String, nullable=False)
     alert_type = Column(String, nullable=False)
     severity = Column(String, nullable=False)
     message = Column(String, nullable=False)
@@ -1,19 +1,30 @@
 # services/monitoring/src/schemas/metrics.py
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+
+from ..models.metrics import METRIC_COLUMNS
 
 class MetricsBase(BaseModel):
     resource_id: str
     resource_type: str
-    cpu_usage: float = Field(..., ge=0, le=100)
-    memory_usage: float = Field(..., ge=0, le=100)
-    disk_usage: float = Field(..., ge=0, le=100)
-    network_in: float = Field(..., ge=0)
-    network_out: float = Field(..., ge=0)
+    # Null where a metric does not apply, as on sub-resources such as
+    # "web-1:cpu0" or "web-1:net:eth0" that carry only some of the columns
+    cpu_usage: Optional[float] = Field(None, ge=0, le=100)
+    memory_usage: Optional[float] = Field(None, ge=0, le=100)
+    disk_usage: Optional[float] = Field(None, ge=0, le=100)
+    network_in: Optional[float] = Field(None, ge=0)
+    network_out: Optional[float] = Field(None, ge=0)
 
 class MetricsCreate(MetricsBase):
-    pass
+    # Sample time as observed by the reporter; the server assigns one when omitted
+    timestamp: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def _has_a_metric(self):
+        if all(getattr(self, name) is None for name in METRIC_COLUMNS):
+            raise ValueError("at least one metric is required")
+        return self
 
 class MetricsRead(MetricsBase):
     id: int
@@ -22,6 +33,11 @@ class MetricsRead(MetricsBase):
     class Config:
         from_attributes = True
 
+class MetricsPage(BaseModel):
+    items: List[MetricsRead]
+    # Pass back as ``cursor`` to get the next page; None on the last page
+    next_cursor: Optional[str] = None
+
 class AlertBase(BaseModel):
     resource_id: str
     alert_type: str
@@ -39,6 +55,17 @@ class AlertRead(AlertBase):
     class Config:
         from_attributes = True
 
+class AlertPage(BaseModel):
+    items: List[AlertRead]
+    # Pass back as ``cursor`` to get the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+class AlertBulkResolve(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class AlertBulkResolveResult(BaseModel):
+    resolved: List[int]
+
 class ResourceMetadataBase(BaseModel):
     resource_id: str
     resource_type: str
@@ -0,0 +1,65 @@
+# services/monitoring/tests/test_agent.py
+import json
+
+from src.agent import Agent, Spool
+from src.core.host_sampler import HostSampler
+
+class RecordingPusher:
+    def __init__(self):
+        self.available = True
+        self.batches = []
+
+    def push(self, lines):
+        if not self.available:
+            return False
+        self.batches.append(lines)
+        return True
+
+    def close(self):
+        pass
+
+def pushed_samples(pusher):
+    return [json.loads(line) for batch in pusher.batches for line in batch.splitlines()]
+
+def test_spool_rotates_segments_and_drops_oldest(tmp_path):
+    # 81-byte batches: two fit in each segment before it rolls over
+    spool = Spool(str(tmp_path), segment_bytes=100, max_bytes=350)
+    for i in range(6):
+        spool.append(f'{{"n": {i}, "pad": "{"x" * 61}"}}\n'.encode())
+
+    contents = [open(path, "rb").read() for path in spool.segments()]
+    assert len(contents) == 2
+    assert b'"n": 2' in contents[0] and b'"n": 5' in contents[1]
+
+def test_agent_spools_while_offline_and_replays_in_order(tmp_path):
+    pusher = RecordingPusher()
+    agent = Agent(HostSampler("agent-test"), pusher, Spool(str(tmp_path)), batch_size=2)
+
+    agent.collect()
+    agent.flush()
+    pusher.available = False
+    for _ in range(2):
+        agent.collect()
+        agent.flush()
+    assert len(Spool(str(tmp_path)).segments()) == 1
+    assert len(pusher.batches) == 1
+
+    pusher.available = True
+    agent.collect()
+    agent.flush()
+
+    samples = pushed_samples(pusher)
+    assert len(samples) == 4
+    assert [sample["resource_id"] for sample in samples] == ["agent-test"] * 4
+    timestamps = [sample["timestamp"] for sample in samples]
+    assert timestamps == sorted(timestamps)
+    assert agent.spool.segments() == []
+
+def test_agent_run_sends_pending_samples_when_stopped(tmp_path):
+    pusher = RecordingPusher()
+    agent = Agent(HostSampler(), pusher, Spool(str(tmp_path)), interval=0.01, flush_interval=60)
+    agent.collect()
+    agent.stop()
+    agent.run()
+
+    assert len(pushed_samples(pusher)) == 1
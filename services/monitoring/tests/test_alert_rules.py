@@ -0,0 +1,135 @@
+# services/monitoring/tests/test_alert_rules.py
+from datetime import datetime, timedelta, timezone
+import pytest
+
+from src.core.alert_rules import FIRE, RESOLVE, AlertEngine, AlertEvaluator, AlertRule, AlertRuleError
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+def sample(seconds, resource_id="vm-1", **values):
+    return {"resource_id": resource_id, "timestamp": START + timedelta(seconds=seconds), **values}
+
+def kinds(events):
+    return [(event.kind, event.rule.name) for event in events]
+
+def test_rule_parsing():
+    rule = AlertRule("net", "rate(network_in) >= 1.5e6 for 2m", "critical")
+    assert (rule.metric, rule.rate, rule.threshold, rule.duration) == ("network_in", True, 1.5e6, 120.0)
+    assert AlertRule("cpu", "cpu_usage < 5").duration == 0.0
+    with pytest.raises(AlertRuleError):
+        AlertRule("bad", "cpu_usage >> 5")
+    with pytest.raises(AlertRuleError, match="cpu_usge"):
+        AlertRule("typo", "cpu_usge > 90")
+
+def test_sustained_rule_fires_once_and_resolves():
+    evaluator = AlertEvaluator([AlertRule("cpu_high", "cpu_usage > 90 for 5m")])
+    events = []
+    for minute in range(7):
+        events += evaluator.evaluate(sample(minute * 60, cpu_usage=95.0))
+    assert kinds(events) == [(FIRE, "cpu_high")]
+    assert events[0].timestamp == (START + timedelta(minutes=5)).timestamp()
+
+    assert kinds(evaluator.evaluate(sample(420, cpu_usage=40.0))) == [(RESOLVE, "cpu_high")]
+    assert evaluator.evaluate(sample(480, cpu_usage=41.0)) == []
+
+def test_breach_must_be_unbroken():
+    evaluator = AlertEvaluator([AlertRule("cpu_high", "cpu_usage > 90 for 2m")])
+    events = []
+    for seconds, cpu in [(0, 95.0), (60, 95.0), (90, 50.0), (120, 95.0), (180, 95.0), (240, 95.0)]:
+        events += evaluator.evaluate(sample(seconds, cpu_usage=cpu))
+    assert [event.timestamp - START.timestamp() for event in events] == [240.0]
+
+def test_rate_rule_uses_per_second_change_and_ignores_late_samples():
+    evaluator = AlertEvaluator([AlertRule("net_spike", "rate(network_in) > 1000")])
+    assert evaluator.evaluate(sample(0, network_in=0.0)) == []
+    assert evaluator.evaluate(sample(10, network_in=5000.0)) == []
+    events = evaluator.evaluate(sample(20, network_in=25000.0))
+    assert kinds(events) == [(FIRE, "net_spike")] and events[0].value == 2000.0
+    assert evaluator.evaluate(sample(15, network_in=0.0)) == []
+
+def test_restored_alert_is_not_raised_again():
+    evaluator = AlertEvaluator([AlertRule("disk_full", "disk_usage > 95")])
+    assert evaluator.mark_firing("vm-1", "disk_full")
+    assert evaluator.evaluate(sample(0, disk_usage=99.0)) == []
+    assert kinds(evaluator.evaluate(sample(60, disk_usage=50.0))) == [(RESOLVE, "disk_full")]
+
+@pytest.mark.asyncio
+async def test_flush_batches_inserts_and_resolutions(monkeypatch):
+    from src.core import alert_rules
+
+    calls = []
+
+    class FakeSession:
+        async def __aenter__(self):
+            return self
+        async def __aexit__(self, *exc):
+            return False
+        async def commit(self):
+            calls.append(("commit",))
+
+    async def create_alerts_bulk(db, rows, commit=True):
+        calls.append(("insert", [(row["resource_id"], row["resolved"] is not None) for row in rows]))
+        return list(range(100, 100 + len(rows)))
+
+    async def resolve_alerts_bulk(db, resolutions, commit=True):
+        calls.append(("resolve", [item["id"] for item in resolutions]))
+
+    monkeypatch.setattr(alert_rules, "AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(alert_rules.MetricsCRUD, "create_alerts_bulk", create_alerts_bulk)
+    monkeypatch.setattr(alert_rules.MetricsCRUD, "resolve_alerts_bulk", resolve_alerts_bulk)
+
+    engine = AlertEngine([AlertRule("disk_full", "disk_usage > 95")])
+    engine.add_rows([sample(0, "vm-1", disk_usage=99.0), sample(0, "vm-2", disk_usage=99.0)])
+    engine.add_rows([sample(60, "vm-2", disk_usage=10.0)])
+    await engine.flush()
+    assert calls == [("insert", [("vm-1", False), ("vm-2", True)]), ("resolve", []), ("commit",)]
+
+    calls.clear()
+    engine.add_rows([sample(120, "vm-1", disk_usage=10.0)])
+    await engine.flush()
+    assert calls == [("insert", []), ("resolve", [100]), ("commit",)]
+    assert engine.stats()["open_alerts"] == 0
+
+@pytest.mark.asyncio
+async def test_changes_queued_while_writes_fail_are_coalesced(monkeypatch):
+    from src.core import alert_rules
+
+    written = []
+
+    class FakeSession:
+        async def __aenter__(self):
+            return self
+        async def __aexit__(self, *exc):
+            return False
+        async def commit(self):
+            pass
+
+    async def create_alerts_bulk(db, rows, commit=True):
+        if not written:
+            written.append(None)
+            raise ConnectionError("database unavailable")
+        written.append([(row["resource_id"], row["timestamp"], row["resolved"]) for row in rows])
+        return list(range(len(rows)))
+
+    async def resolve_alerts_bulk(db, resolutions, commit=True):
+        pass
+
+    monkeypatch.setattr(alert_rules, "AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(alert_rules.MetricsCRUD, "create_alerts_bulk", create_alerts_bulk)
+    monkeypatch.setattr(alert_rules.MetricsCRUD, "resolve_alerts_bulk", resolve_alerts_bulk)
+
+    engine = AlertEngine([AlertRule("disk_full", "disk_usage > 95")], max_pending=4)
+    # Flaps five times on vm-1, fires once on vm-2
+    engine.add_rows([sample(i * 60, "vm-1", disk_usage=99.0 if i % 2 == 0 else 10.0) for i in range(10)])
+    engine.add_rows([sample(0, "vm-2", disk_usage=99.0)])
+    with pytest.raises(ConnectionError):
+        await engine.flush()
+    assert engine.stats()["pending_events"] == 3
+
+    await engine.flush()
+    # One vm-1 alert spanning every episode, still closed; vm-2 still open
+    assert written[1] == [
+        ("vm-1", START, START + timedelta(minutes=9)),
+        ("vm-2", START, None),
+    ]
+    assert engine.stats()["open_alerts"] == 1
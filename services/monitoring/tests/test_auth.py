@@ -0,0 +1,86 @@
+# services/monitoring/tests/test_auth.py
+import asyncio
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.core import auth
+from src.core.auth import (
+    TokenCache, TokenInvalidator, create_access_token, get_current_user, invalidate_user_tokens
+)
+from src.schemas.auth import UserRead
+
+def make_user(user_id=1, username="alice", is_active=True):
+    return SimpleNamespace(
+        id=user_id,
+        email=f"{username}@example.com",
+        username=username,
+        is_active=is_active,
+        is_admin=False,
+        created_at=datetime.utcnow(),
+        updated_at=None,
+    )
+
+def test_entries_never_outlive_token_expiry():
+    cache = TokenCache(max_size=10, ttl=300)
+    principal = UserRead.model_validate(make_user())
+    cache.set("expired-token", principal, time.time() - 1)
+    cache.set("valid-token", principal, time.time() + 60)
+
+    assert cache.get("expired-token") is None
+    assert cache.get("valid-token") == principal
+
+def test_cache_is_bounded_and_invalidated_per_user():
+    cache = TokenCache(max_size=2, ttl=300)
+    alice = UserRead.model_validate(make_user(1, "alice"))
+    bob = UserRead.model_validate(make_user(2, "bob"))
+    cache.set("a1", alice, time.time() + 60)
+    cache.set("b1", bob, time.time() + 60)
+    cache.set("a2", alice, time.time() + 60)
+
+    assert cache.get("a1") is None
+    cache.invalidate_user(1)
+    assert cache.get("a2") is None
+    assert cache.get("b1") == bob
+
+@pytest.mark.asyncio
+async def test_get_current_user_skips_db_until_invalidated(monkeypatch, redis):
+    monkeypatch.setattr(auth, "token_cache", TokenCache(max_size=10, ttl=300))
+    monkeypatch.setattr(auth, "token_invalidator", TokenInvalidator(client=redis))
+    users = {"alice": make_user()}
+    lookups = []
+
+    async def fake_lookup(db, username):
+        lookups.append(username)
+        return users[username]
+
+    monkeypatch.setattr(auth, "get_user_by_username", fake_lookup)
+    token = create_access_token({"sub": "alice"}, expires_delta=timedelta(minutes=5))
+
+    first = await get_current_user(token=token, db=None)
+    second = await get_current_user(token=token, db=None)
+    assert first.username == second.username == "alice"
+    assert lookups == ["alice"]
+
+    users["alice"] = make_user(is_active=False)
+    await invalidate_user_tokens(1)
+    assert (await get_current_user(token=token, db=None)).is_active is False
+    assert lookups == ["alice", "alice"]
+
+@pytest.mark.asyncio
+async def test_invalidation_reaches_other_workers(redis):
+    principal = UserRead.model_validate(make_user())
+    worker_a = TokenInvalidator(client=redis, cache=TokenCache(max_size=10, ttl=300))
+    worker_b = TokenInvalidator(client=redis, cache=TokenCache(max_size=10, ttl=300))
+    worker_b.cache.set("token", principal, time.time() + 60)
+    listener = asyncio.create_task(worker_b.start())
+    await asyncio.sleep(0)
+
+    await worker_a.invalidate(1)
+    await asyncio.sleep(0.01)
+    assert worker_b.cache.get("token") is None
+
+    await worker_b.stop()
+    await listener
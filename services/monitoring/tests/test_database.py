@@ -0,0 +1,19 @@
+# services/monitoring/tests/test_database.py
+from src.config import settings
+from src.database import create_engine, engine, read_engine
+
+def test_engine_uses_pool_settings_without_echo():
+    assert engine.echo is False
+    assert engine.pool.size() == settings.DB_POOL_SIZE
+    assert engine.pool._max_overflow == settings.DB_MAX_OVERFLOW
+    assert engine.pool._recycle == settings.DB_POOL_RECYCLE
+    assert engine.pool._pre_ping is settings.DB_POOL_PRE_PING
+
+def test_reads_share_the_primary_without_a_replica():
+    assert settings.DATABASE_READ_URL is None
+    assert read_engine is engine
+
+def test_replica_engine_gets_its_own_pool():
+    replica = create_engine("postgresql+asyncpg://reader@replica:5432/cloudscale", pool_size=3)
+    assert replica.url.host == "replica"
+    assert replica.pool.size() == 3
@@ -0,0 +1,68 @@
+# services/monitoring/tests/test_deadband.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.core.deadband import DeadbandFilter
+from src.core.metrics_collector import MetricsCollector
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+def sample(seconds, cpu, memory=40.0):
+    return {
+        "resource_id": "host-1",
+        "resource_type": "host",
+        "cpu_usage": cpu,
+        "memory_usage": memory,
+        "timestamp": START + timedelta(seconds=seconds),
+    }
+
+def make_filter(**options):
+    options = {"heartbeat": 300, "base_interval": 60, "min_interval": 5, **options}
+    return DeadbandFilter({"cpu_usage": 2.0, "memory_usage": 1.0}, **options)
+
+def test_small_changes_are_suppressed_until_heartbeat():
+    deadband = make_filter()
+    stored = [s for t in range(0, 601, 60) for s in deadband.offer(sample(t, 10.0 + (t % 120) / 100))]
+
+    assert [s["timestamp"] for s in stored] == [START, START + timedelta(seconds=300), START + timedelta(seconds=600)]
+
+def test_change_stores_the_end_of_the_plateau_and_the_step():
+    deadband = make_filter()
+    assert deadband.offer(sample(0, 10.0)) == [sample(0, 10.0)]
+    assert deadband.offer(sample(60, 10.5)) == []
+    assert deadband.offer(sample(120, 80.0)) == [sample(60, 10.5), sample(120, 80.0)]
+    # Consecutive changes need no extra point
+    assert deadband.offer(sample(180, 20.0)) == [sample(180, 20.0)]
+
+def test_missing_values_count_as_a_change():
+    deadband = make_filter()
+    deadband.offer(sample(0, 10.0))
+    assert deadband.offer(sample(60, None)) == [sample(60, None)]
+
+def test_interval_shrinks_while_values_move_and_recovers():
+    deadband = make_filter()
+    t = 0
+    for cpu in (10.0, 30.0, 50.0, 70.0, 90.0):
+        deadband.offer(sample(t, cpu))
+        t += deadband.interval
+    assert deadband.interval == 5
+
+    for _ in range(4):
+        deadband.offer(sample(t, 90.0))
+        t += deadband.interval
+    assert deadband.interval == 60
+
+@pytest.mark.asyncio
+async def test_adaptive_collector_suppresses_a_quiet_host():
+    samples = []
+    collector = MetricsCollector(sink=samples.append, collection_interval=0.02, adaptive=True)
+    # Deadbands wide enough that nothing on this host counts as a change
+    collector._deadband.deadbands = {"cpu_usage": 1000.0, "memory_usage": 1000.0}
+    task = asyncio.create_task(collector.start_collection())
+    await asyncio.sleep(0.2)
+    await collector.stop_collection()
+    await task
+
+    assert len(samples) == 1
@@ -0,0 +1,63 @@
+# services/monitoring/tests/test_downsample.py
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.core.downsample import extreme_points, lttb
+from src.crud.metrics import MetricsCRUD
+
+def test_short_series_is_returned_unchanged():
+    assert lttb([0, 1, 2], [5, 6, 7], 10) == [0, 1, 2]
+
+def test_keeps_endpoints_and_respects_threshold():
+    x = list(range(1000))
+    y = [math.sin(i / 20) for i in x]
+    keep = lttb(x, y, 50)
+
+    assert len(keep) == 50
+    assert keep[0] == 0 and keep[-1] == 999
+    assert keep == sorted(set(keep))
+
+def test_preserves_spikes():
+    x = list(range(500))
+    y = [0.0] * 500
+    y[250] = 100.0
+    assert 250 in lttb(x, y, 20)
+
+def test_extreme_points_keep_each_bucket_min_and_max_in_time_order():
+    assert extreme_points([
+        (1, 5.0, 3, 9.0),     # min first
+        (6, 2.0, 4, 8.0),     # max first
+        (7, 4.0, 7, 4.0),     # a single sample
+        (None, None, None, None),  # no values in this bucket
+    ]) == [(1, 5.0), (3, 9.0), (4, 8.0), (6, 2.0), (7, 4.0)]
+
+@pytest.mark.asyncio
+async def test_downsampled_reads_preaggregate_slots_from_a_rollup(monkeypatch):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    queries = []
+
+    class Result:
+        def all(self):
+            # (slot, min time, min, max time, max)
+            return [
+                (i, start + timedelta(minutes=10 * i), float(i % 7), start + timedelta(minutes=10 * i + 5), 50.0)
+                for i in range(1000)
+            ]
+
+    class Session:
+        async def execute(self, query):
+            queries.append(str(query.compile(dialect=postgresql.dialect())))
+            return Result()
+
+    monkeypatch.setattr(MetricsCRUD, "_rollups", True)
+    series = await MetricsCRUD.get_metrics_downsampled(
+        Session(), "vm-1", start, start + timedelta(days=30), 250, ("cpu_usage",)
+    )
+
+    # Four slots per point: 2592 s, rounded down to whole 1m rollup buckets
+    assert "FROM resource_metrics_1m" in queries[0] and "CAST(2580 AS NUMERIC)" in queries[0]
+    assert len(series["cpu_usage"]["values"]) == 250
+    assert 50.0 in series["cpu_usage"]["values"]
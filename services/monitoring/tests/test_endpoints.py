@@ -28,7 +28,7 @@ test_alert = {
 async def test_create_metrics():
     async with AsyncClient(app=app, base_url="http://test") as client:
         response = await client.post("/api/v1/monitoring/metrics/", json=test_metrics)
-        assert response.status_code == 200
+        assert response.status_code == 202
         data = response.json()
         assert data["resource_id"] == test_metrics["resource_id"]
         assert data["cpu_usage"] == test_metrics["cpu_usage"]
@@ -0,0 +1,118 @@
+# services/monitoring/tests/test_host_detail.py
+import asyncio
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import psutil
+import pytest
+from pydantic import ValidationError
+
+from src.core.deadband import DeadbandGroup
+from src.core.host_detail import CpuCores, HostDetailSampler, Interfaces, Partitions, TopProcesses, _escape
+from src.core.metrics_collector import MetricsCollector
+from src.crud.metrics import MetricsCRUD
+from src.schemas.metrics import MetricsCreate
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+def test_cpu_cores_report_every_logical_cpu():
+    cores = CpuCores()
+    rows = cores.collect("host-1", NOW)
+
+    assert [row["resource_id"] for row in rows] == [f"host-1:cpu{i}" for i in range(psutil.cpu_count())]
+    assert all(0 <= row["cpu_usage"] <= 100 and row["memory_usage"] is None for row in rows)
+
+def test_partitions_and_interfaces_use_id_safe_names():
+    partitions = Partitions().collect("host-1", NOW)
+    interfaces = Interfaces().collect("host-1", NOW)
+
+    assert "host-1:disk:%2F" in [row["resource_id"] for row in partitions]
+    assert len({row["resource_id"] for row in partitions}) == len(partitions)
+    assert all(row["resource_type"] == "partition" and 0 <= row["disk_usage"] <= 100 for row in partitions)
+    # Disk I/O is not stored in the network columns
+    assert all(row["network_in"] is None and row["network_out"] is None for row in partitions)
+    assert "host-1:net:lo" not in [row["resource_id"] for row in interfaces]
+    assert _escape("/var/lib/docker") == "%2Fvar%2Flib%2Fdocker"
+    # Names that a lossy slug would merge stay apart
+    assert len({_escape(name) for name in ("/", "/root", "/var/lib", "/var-lib", "a:b", "a%3Ab")}) == 6
+
+def test_top_processes_group_by_name_and_reuse_process_objects():
+    busy = [subprocess.Popen([sys.executable, "-c", "while True: pass"]) for _ in range(2)]
+    try:
+        top = TopProcesses(3)
+        top.scan()
+        first = {pid: entry[0] for pid, entry in top._processes.items()}
+        time.sleep(0.5)
+        rows = top.collect("host-1", NOW)
+    finally:
+        for process in busy:
+            process.kill()
+            process.wait()
+
+    # The same psutil.Process object served both scans
+    assert top._processes[busy[0].pid][0] is first[busy[0].pid]
+    # Both busy processes share one series, named after the program, not the pid
+    name = _escape(psutil.Process().name())
+    busy_row = next(row for row in rows if row["resource_id"] == f"host-1:proc:{name}")
+    assert busy_row["cpu_usage"] > 100 / psutil.cpu_count() / 4
+    assert len({row["resource_id"] for row in rows}) == len(rows) <= 6
+
+def test_sub_resource_rows_validate_with_missing_columns():
+    row = HostDetailSampler("host-1", cpu_cores=True).sample(NOW)[0]
+    assert MetricsCreate(**row).memory_usage is None
+
+    with pytest.raises(ValidationError):
+        MetricsCreate(resource_id="host-1:cpu0", resource_type="cpu")
+
+def test_deadband_group_keeps_one_filter_per_series_and_drops_departed_ones():
+    group = DeadbandGroup(deadbands={"cpu_usage": 2.0}, heartbeat=300, base_interval=60, min_interval=5)
+
+    def rows(seconds, **values):
+        at = datetime.fromtimestamp(NOW.timestamp() + seconds, timezone.utc)
+        return [{"resource_id": rid, "timestamp": at, "cpu_usage": cpu} for rid, cpu in values.items()]
+
+    assert len(group.offer(rows(0, a=10.0, b=10.0))) == 2
+    assert group.offer(rows(60, a=10.5, b=30.0)) == rows(60, b=30.0)
+    # "b" is gone for a tick, so it starts over when it returns
+    assert group.offer(rows(120, a=10.5)) == []
+    assert group.offer(rows(180, a=10.5, b=30.0)) == rows(180, b=30.0)
+
+@pytest.mark.asyncio
+async def test_collection_loop_sinks_sub_resources_with_the_host_timestamp():
+    samples = []
+    collector = MetricsCollector(
+        sink=samples.append,
+        collection_interval=0.05,
+        detail=HostDetailSampler("system", cpu_cores=True, top_processes=2),
+    )
+    task = asyncio.create_task(collector.start_collection())
+    await asyncio.sleep(0.12)
+    await collector.stop_collection()
+    await task
+
+    host = [s for s in samples if s.resource_id == "system"]
+    cores = [s for s in samples if s.resource_type == "cpu"]
+    processes = [s for s in samples if s.resource_type == "process"]
+    assert host and len(cores) == len(host) * psutil.cpu_count()
+    assert processes and {s.timestamp for s in cores} <= {s.timestamp for s in host}
+
+def test_children_endpoint_lists_sub_resources_by_prefix(client, monkeypatch):
+    seen = {}
+
+    async def get_latest_sub_resources(db, prefix, since):
+        seen["prefix"] = prefix
+        return [{
+            "id": 1, "resource_id": "web_1:cpu0", "resource_type": "cpu", "cpu_usage": 12.5,
+            "memory_usage": None, "disk_usage": None, "network_in": None, "network_out": None,
+            "timestamp": NOW,
+        }]
+
+    monkeypatch.setattr(MetricsCRUD, "get_latest_sub_resources", get_latest_sub_resources)
+    response = client.get("/api/v1/monitoring/metrics/web_1/children", params={"kind": "cpu"})
+
+    assert response.status_code == 200
+    assert seen["prefix"] == "web_1:cpu"
+    assert response.json()[0]["cpu_usage"] == 12.5
+    assert response.json()[0]["memory_usage"] is None
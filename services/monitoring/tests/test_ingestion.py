@@ -0,0 +1,81 @@
+# services/monitoring/tests/test_ingestion.py
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+
+from src.core.ingestion import MetricsIngestor, IngestionQueueFull
+from src.crud.metrics import MetricsCRUD
+from src.schemas.metrics import MetricsCreate
+
+sample = MetricsCreate(
+    resource_id="test-resource-1",
+    resource_type="vm",
+    cpu_usage=45.5,
+    memory_usage=60.2,
+    disk_usage=72.8,
+    network_in=1024.0,
+    network_out=2048.0,
+)
+
+@asynccontextmanager
+async def fake_session():
+    yield None
+
+@pytest.fixture
+def written(monkeypatch):
+    batches = []
+
+    async def fake_bulk(db, rows):
+        batches.append(list(rows))
+        start = sum(len(b) for b in batches) - len(rows)
+        return list(range(start + 1, start + len(rows) + 1))
+
+    monkeypatch.setattr(MetricsCRUD, "create_metrics_bulk", staticmethod(fake_bulk))
+    return batches
+
+@pytest.mark.asyncio
+async def test_flushes_when_batch_size_reached(written):
+    ingestor = MetricsIngestor(batch_size=5, flush_interval=30, session_factory=fake_session)
+    await ingestor.start()
+    for _ in range(5):
+        ingestor.submit(sample)
+    await asyncio.sleep(0.05)
+
+    assert [len(b) for b in written] == [5]
+    await ingestor.stop()
+
+@pytest.mark.asyncio
+async def test_flushes_after_interval(written):
+    ingestor = MetricsIngestor(batch_size=100, flush_interval=0.05, session_factory=fake_session)
+    await ingestor.start()
+    ingestor.submit(sample)
+    await asyncio.sleep(0.15)
+
+    assert [len(b) for b in written] == [1]
+    assert written[0][0]["timestamp"] is not None
+    await ingestor.stop()
+
+@pytest.mark.asyncio
+async def test_rejects_when_buffer_full(written):
+    ingestor = MetricsIngestor(batch_size=100, flush_interval=30, max_queue_size=3, session_factory=fake_session)
+    await ingestor.start()
+    for _ in range(3):
+        ingestor.submit(sample)
+    with pytest.raises(IngestionQueueFull):
+        ingestor.submit(sample)
+    await ingestor.stop()
+
+@pytest.mark.asyncio
+async def test_stop_drains_buffer_and_notifies_listeners(written):
+    ingestor = MetricsIngestor(batch_size=4, flush_interval=30, session_factory=fake_session)
+    seen = []
+    ingestor.add_listener(lambda rows: seen.extend(row["id"] for row in rows))
+    await ingestor.start()
+    for _ in range(3):
+        ingestor.submit(sample)
+    await ingestor.stop()
+
+    assert sum(len(b) for b in written) == 3
+    assert seen == [1, 2, 3]
+    with pytest.raises(IngestionQueueFull):
+        ingestor.submit(sample)
@@ -0,0 +1,30 @@
+# services/monitoring/tests/test_instrumentation.py
+import os
+import subprocess
+import sys
+
+WORKER = """
+from src.core.instrumentation import HTTP_REQUESTS_IN_PROGRESS, INGEST_ROWS
+INGEST_ROWS.labels("written").inc(5)
+HTTP_REQUESTS_IN_PROGRESS.labels("GET").inc()
+"""
+SCRAPE = """
+import sys
+from src.core.instrumentation import render_latest
+sys.stdout.write(render_latest().decode())
+"""
+
+def run(code, env):
+    return subprocess.run(
+        [sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.dirname(__file__)),
+    ).stdout
+
+def test_workers_are_aggregated_in_multiprocess_mode(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    run(WORKER, env)
+    run(WORKER, env)
+    body = run(SCRAPE, env)
+    assert 'ingest_rows_total{outcome="written"} 10.0' in body
+    # Live gauges of exited workers are still on disk until marked dead
+    assert 'http_requests_in_progress{method="GET"} 2.0' in body
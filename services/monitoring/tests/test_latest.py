@@ -0,0 +1,124 @@
+# services/monitoring/tests/test_latest.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.latest import LatestSnapshots, latest_snapshots
+from src.core.metrics_collector import MetricsCollector
+from src.crud.metrics import MetricsCRUD
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+def sample(resource_id, seconds, cpu, **extra):
+    return {
+        "resource_id": resource_id,
+        "resource_type": "host",
+        "cpu_usage": cpu,
+        "memory_usage": 40.0,
+        "timestamp": START + timedelta(seconds=seconds),
+        **extra,
+    }
+
+@pytest.fixture
+def client(client, monkeypatch):
+    monkeypatch.setattr(latest_snapshots, "_snapshots", {})
+    monkeypatch.setattr(latest_snapshots, "_pending", {})
+    return client
+
+def test_newer_samples_replace_the_snapshot_and_older_ones_are_ignored():
+    latest = LatestSnapshots()
+    latest.record(sample("vm-1", 60, 10.0))
+    first = latest.get("vm-1")
+    latest.record(sample("vm-1", 30, 99.0))
+    assert latest.get("vm-1") is first
+
+    latest.record(sample("vm-1", 60, 10.0, id=7))
+    latest.observe([{**sample("vm-1", 90, 20.0), "timestamp": (START + timedelta(seconds=90)).isoformat()}])
+    assert latest.get("vm-1")["cpu_usage"] == 20.0
+    # The earlier snapshot was swapped out, never modified
+    assert first["cpu_usage"] == 10.0 and first["id"] is None
+    # Rows from other workers are not written again by this one
+    assert latest._pending["vm-1"]["id"] == 7
+
+@pytest.mark.asyncio
+async def test_flush_upserts_newest_rows_and_keeps_them_on_failure(monkeypatch):
+    written = []
+
+    async def upsert_latest(db, rows):
+        if not written:
+            written.append(None)
+            raise ConnectionError("database unavailable")
+        written.append(rows)
+
+    monkeypatch.setattr(MetricsCRUD, "upsert_latest", upsert_latest)
+    latest = LatestSnapshots()
+    latest.add_rows([sample("vm-2", 0, 1.0), sample("vm-1", 0, 2.0), sample("vm-1", 30, 3.0)])
+
+    with pytest.raises(ConnectionError):
+        await latest.flush()
+    latest.record(sample("vm-2", 60, 4.0))
+    await latest.flush()
+
+    assert [(row["resource_id"], row["cpu_usage"]) for row in written[1]] == [("vm-1", 3.0), ("vm-2", 4.0)]
+    assert latest.stats() == {"resources": 2, "pending": 0}
+
+def test_latest_endpoint_serves_the_snapshot(client, monkeypatch):
+    async def get_latest_values(db, resource_id=None, resource_type=None):
+        raise AssertionError("snapshot should be served without a query")
+
+    monkeypatch.setattr(MetricsCRUD, "get_latest_values", get_latest_values)
+    latest_snapshots.record(sample("system", 0, 12.5, network_in=2048.0))
+
+    response = client.get("/api/v1/monitoring/")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["cpu_usage"] == 12.5 and body["network_in"] == 2048.0
+    assert body["timestamp"] == START.isoformat()
+
+def test_latest_endpoint_falls_back_to_the_last_value_table(client, monkeypatch):
+    async def get_latest_values(db, resource_id=None, resource_type=None):
+        if resource_id == "vm-9":
+            return [SimpleNamespace(**sample("vm-9", 0, 55.0), disk_usage=None, network_in=None, network_out=None)]
+        return []
+
+    monkeypatch.setattr(MetricsCRUD, "get_latest_values", get_latest_values)
+
+    assert client.get("/api/v1/monitoring/", params={"resource_id": "vm-9"}).json()["cpu_usage"] == 55.0
+    assert client.get("/api/v1/monitoring/", params={"resource_id": "vm-0"}).status_code == 404
+
+def test_latest_for_all_resources_prefers_the_newer_of_table_and_snapshot(client, monkeypatch):
+    def stored(resource_id, seconds, cpu):
+        return SimpleNamespace(**sample(resource_id, seconds, cpu), disk_usage=None, network_in=None, network_out=None)
+
+    async def get_latest_values(db, resource_id=None, resource_type=None):
+        return [stored("vm-1", 60, 1.0), stored("vm-2", 60, 2.0)]
+
+    monkeypatch.setattr(MetricsCRUD, "get_latest_values", get_latest_values)
+    latest_snapshots.record(sample("vm-1", 30, 10.0))
+    latest_snapshots.record(sample("vm-2", 90, 20.0))
+    latest_snapshots.record(sample("vm-3", 90, 30.0))
+
+    response = client.get("/api/v1/monitoring/latest")
+
+    assert [(row["resource_id"], row["cpu_usage"]) for row in response.json()] == [
+        ("vm-1", 1.0), ("vm-2", 20.0), ("vm-3", 30.0)
+    ]
+
+@pytest.mark.asyncio
+async def test_collector_reports_suppressed_observations_to_the_observer():
+    observed, stored = [], []
+    collector = MetricsCollector(sink=stored.append, collection_interval=0.02, adaptive=True,
+                                 observer=observed.append)
+    # Identical readings: everything after the first is inside the deadbands
+    collector._sampler.sample = lambda: sample(
+        "system", len(observed), 5.0, disk_usage=50.0, network_in=0.0, network_out=0.0
+    )
+    task = asyncio.create_task(collector.start_collection())
+    await asyncio.sleep(0.1)
+    await collector.stop_collection()
+    await task
+
+    assert len(stored) == 1 and len(observed) > 1
@@ -0,0 +1,224 @@
+# services/monitoring/tests/test_leader.py
+import asyncio
+import os
+import signal
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from src.core.leader import LeaderElection, RedisLease
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StandInRedis:
+    """Just enough of the Redis protocol for RedisLease, over real TCP.
+
+    The lease scripts are run as their Python equivalents; every other
+    command (e.g. the client's CLIENT SETINFO on connect) is acknowledged.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    command = self._read()
+                    if command is None:
+                        return
+                    with stand_in.lock:
+                        reply = stand_in.execute(command)
+                    self.wfile.write(reply)
+
+            def _read(self):
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                args = []
+                for _ in range(int(line[1:])):
+                    size = int(self.rfile.readline()[1:])
+                    args.append(self.rfile.read(size + 2)[:-2])
+                return args
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"redis://127.0.0.1:{self.server.server_address[1]}/0"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _get(self, key):
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and time.monotonic() >= expires:
+            self.data.pop(key, None)
+            return None
+        return value
+
+    def execute(self, command):
+        name = command[0].upper()
+        if name == b"SET":
+            key, value, options = command[1], command[2], [arg.upper() for arg in command[3:]]
+            if b"NX" in options and self._get(key) is not None:
+                return b"$-1\r\n"
+            ttl = int(command[3 + options.index(b"PX") + 1]) / 1000 if b"PX" in options else None
+            self.data[key] = (value, time.monotonic() + ttl if ttl else None)
+            return b"+OK\r\n"
+        if name == b"EVAL":
+            script, key, token = command[1].decode(), command[3], command[4]
+            if self._get(key) != token:
+                return b":0\r\n"
+            if script == RedisLease.RENEW_SCRIPT:
+                self.data[key] = (token, time.monotonic() + int(command[5]) / 1000)
+            elif script == RedisLease.RELEASE_SCRIPT:
+                del self.data[key]
+            return b":1\r\n"
+        return b"+OK\r\n"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# A worker that writes "<pid> <time>" lines to a shared file while it leads
+WORKER = """
+import asyncio, os, signal, sys, time
+from redis.asyncio import Redis
+from src.core.leader import LeaderElection, RedisLease
+
+async def main(url, path):
+    writing = []
+
+    async def write():
+        with open(path, "a") as f:
+            while True:
+                f.write(f"{os.getpid()} {time.time()}\\n")
+                f.flush()
+                await asyncio.sleep(0.05)
+
+    async def on_elected():
+        writing.append(asyncio.create_task(write()))
+
+    async def on_demoted():
+        writing.pop().cancel()
+
+    election = LeaderElection(RedisLease(Redis.from_url(url), ttl=1.0), on_elected, on_demoted, retry_interval=0.1)
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.ensure_future(election.stop()))
+    await election.start()
+
+asyncio.run(main(sys.argv[1], sys.argv[2]))
+"""
+
+
+def read_writes(path):
+    with open(path) as f:
+        return [(int(pid), float(at)) for pid, at in (line.split() for line in f if line.strip())]
+
+
+def wait_for(predicate, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_one_of_several_worker_processes_writes_and_a_successor_takes_over(tmp_path):
+    redis = StandInRedis()
+    log = str(tmp_path / "writes.log")
+    open(log, "w").close()
+    workers = [
+        subprocess.Popen([sys.executable, "-c", WORKER, redis.url, log], cwd=SERVICE_DIR)
+        for _ in range(3)
+    ]
+    try:
+        assert wait_for(lambda: len(read_writes(log)) >= 20, 20)
+        writers = {pid for pid, _ in read_writes(log)}
+        assert len(writers) == 1
+        leader = writers.pop()
+
+        # A leader that dies without releasing: the lease runs out (1 s TTL)
+        os.kill(leader, signal.SIGKILL)
+        killed_at = time.time()
+        assert wait_for(lambda: any(pid != leader for pid, _ in read_writes(log)), 10)
+        successor_writes = [(pid, at) for pid, at in read_writes(log) if pid != leader]
+        successor = successor_writes[0][0]
+        assert successor_writes[0][1] - killed_at < 2.0
+        assert {pid for pid, _ in successor_writes} == {successor}
+
+        # One that shuts down hands over within a retry interval or so
+        time.sleep(0.5)
+        os.kill(successor, signal.SIGTERM)
+        stopped_at = time.time()
+        third = next(worker.pid for worker in workers if worker.pid not in (leader, successor))
+        assert wait_for(lambda: any(pid == third for pid, _ in read_writes(log)), 10)
+        assert min(at for pid, at in read_writes(log) if pid == third) - stopped_at < 1.0
+
+        # Never two writers at once
+        writes = read_writes(log)
+        spans = {
+            pid: (min(at for p, at in writes if p == pid), max(at for p, at in writes if p == pid))
+            for pid in (leader, successor)
+        }
+        assert spans[leader][1] < spans[successor][0]
+        assert spans[successor][1] < min(at for pid, at in writes if pid == third)
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.kill()
+            worker.wait()
+        redis.close()
+
+
+class FlakyLease:
+    ttl = 0.3
+
+    def __init__(self):
+        self.reachable = True
+        self.released = 0
+
+    async def acquire(self):
+        if not self.reachable:
+            raise ConnectionError("lease store unreachable")
+        return True
+
+    async def renew(self):
+        return await self.acquire()
+
+    async def release(self):
+        self.released += 1
+
+
+@pytest.mark.asyncio
+async def test_leader_steps_down_when_renewal_fails_and_is_reelected_later():
+    events = []
+
+    async def on_elected():
+        events.append("elected")
+
+    async def on_demoted():
+        events.append("demoted")
+
+    lease = FlakyLease()
+    election = LeaderElection(lease, on_elected, on_demoted, retry_interval=0.05)
+    task = asyncio.create_task(election.start())
+    await asyncio.sleep(0.05)
+    assert election.is_leader
+
+    lease.reachable = False
+    await asyncio.sleep(0.2)
+    assert not election.is_leader and lease.released == 1
+
+    lease.reachable = True
+    await asyncio.sleep(0.1)
+    assert election.is_leader
+    await election.stop()
+    await task
+
+    assert events == ["elected", "demoted", "elected", "demoted"]
+    assert election.stats() == {"leader": False, "terms": 2}
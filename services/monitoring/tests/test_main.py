@@ -1,6 +1,7 @@
 # services/monitoring/tests/test_main.py
 import pytest
 from fastapi.testclient import TestClient
+from src.config import settings
 from src.main import app
 
 client = TestClient(app)
@@ -8,13 +9,23 @@ client = TestClient(app)
 def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
-    assert response.json() == {"status": "healthy"}
+    # Without the lifespan no election runs, so this worker neither leads nor collects
+    assert response.json() == {
+        "status": "healthy",
+        "version": settings.VERSION,
+        "collecting_metrics": False,
+        "leader": False,
+    }
 
 def test_get_metrics():
+    client.get("/health")
     response = client.get("/metrics")
     assert response.status_code == 200
-    data = response.json()
-    assert "cpu_usage" in data
-    assert "memory_usage" in data
-    assert "disk_usage" in data
-    assert "network_throughput" in data
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in body
+    assert "http_requests_in_progress" in body
+    assert "db_pool_checkout_seconds" in body
+    assert "ingest_queue_depth" in body
+    assert "collector_sample_duration_seconds" in body
+    assert "host_cpu_usage_percent" in body
@@ -0,0 +1,76 @@
+# services/monitoring/tests/test_metrics_cache.py
+from datetime import datetime, timedelta, timezone
+
+from src.core.metrics_cache import MetricsCache
+from src.core.streaming import StreamHub, serialize_row
+
+def local_cache(**options):
+    return MetricsCache(hub=StreamHub(fanout=False), **options)
+
+def make_row(resource_id, timestamp, row_id=1, cpu=50.0):
+    return {
+        "id": row_id,
+        "resource_id": resource_id,
+        "resource_type": "vm",
+        "cpu_usage": cpu,
+        "memory_usage": 40.0,
+        "disk_usage": 30.0,
+        "network_in": 1.0,
+        "network_out": 2.0,
+        "timestamp": timestamp,
+    }
+
+def test_serves_windows_it_fully_covers():
+    cache = local_cache(samples_per_resource=16, max_samples=1024, window=3600)
+    now = datetime.now(timezone.utc)
+    cache.add_rows([make_row("vm-1", now + timedelta(seconds=i), row_id=i, cpu=i) for i in range(5)])
+
+    rows = cache.get("vm-1", now, now + timedelta(seconds=3))
+    assert [row["id"] for row in rows] == [3, 2, 1, 0]
+    assert rows[0]["timestamp"] == now + timedelta(seconds=3)
+
+    # Older than the buffer's coverage: must fall back to the database
+    assert cache.get("vm-1", now - timedelta(hours=1), now) is None
+    assert cache.get("vm-2", now, now) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+def test_wraparound_moves_coverage_forward():
+    cache = local_cache(samples_per_resource=4, max_samples=1024, window=3600)
+    now = datetime.now(timezone.utc)
+    cache.add_rows([make_row("vm-1", now + timedelta(seconds=i), row_id=i) for i in range(10)])
+
+    assert cache.get("vm-1", now + timedelta(seconds=5), now + timedelta(seconds=60)) is None
+    rows = cache.get("vm-1", now + timedelta(seconds=6), now + timedelta(seconds=60))
+    assert [row["id"] for row in rows] == [9, 8, 7, 6]
+
+def test_idle_resources_are_evicted_first():
+    cache = local_cache(samples_per_resource=4, max_samples=8, window=3600)
+    now = datetime.now(timezone.utc)
+    cache.add_rows([make_row("vm-1", now)])
+    cache.add_rows([make_row("vm-2", now)])
+    cache.get("vm-1", now, now)
+    cache.add_rows([make_row("vm-3", now)])
+
+    assert cache.get("vm-2", now, now) is None
+    assert cache.get("vm-1", now, now) is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["resources"] == 2
+
+def test_coverage_is_trusted_only_while_the_fanout_subscription_lasts():
+    hub = StreamHub(fanout=True)
+    cache = MetricsCache(hub=hub, samples_per_resource=4, max_samples=64, window=3600)
+    now = datetime.now(timezone.utc)
+
+    # Not subscribed: other workers' rows may be missing
+    cache.add_rows([serialize_row(make_row("vm-1", now))])
+    assert cache.get("vm-1", now, now) is None
+
+    hub.subscribed_since = 1.0
+    cache.add_rows([serialize_row(make_row("vm-1", now + timedelta(seconds=i), row_id=i)) for i in range(2)])
+    assert [row["id"] for row in cache.get("vm-1", now, now + timedelta(seconds=1))] == [1, 0]
+
+    # Rows published while resubscribing were missed: start over
+    hub.subscribed_since = 2.0
+    assert cache.get("vm-1", now, now) is None
+    assert cache.stats()["resources"] == 0
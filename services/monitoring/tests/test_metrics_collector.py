@@ -0,0 +1,41 @@
+# services/monitoring/tests/test_metrics_collector.py
+import asyncio
+import time
+import pytest
+
+from src.core.metrics_collector import MetricsCollector
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.001) -> float:
+    """Return the worst delay seen between scheduled and actual wake-ups."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+@pytest.mark.asyncio
+async def test_collection_does_not_block_event_loop():
+    collector = MetricsCollector()
+    stop = asyncio.Event()
+    probe = asyncio.create_task(measure_loop_lag(stop))
+
+    for _ in range(5):
+        metrics = await collector.collect_system_metrics()
+        assert metrics["resource_id"] == "system"
+        assert 0 <= metrics["cpu_usage"] <= 100
+
+    stop.set()
+    assert await probe < 0.005
+
+@pytest.mark.asyncio
+async def test_collection_loop_feeds_sink_at_configured_interval():
+    samples = []
+    collector = MetricsCollector(sink=samples.append, collection_interval=0.05)
+    task = asyncio.create_task(collector.start_collection())
+    await asyncio.sleep(0.2)
+    await collector.stop_collection()
+    await task
+
+    assert 2 <= len(samples) <= 6
+    assert all(sample.timestamp is not None for sample in samples)
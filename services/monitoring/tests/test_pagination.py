@@ -0,0 +1,133 @@
+# services/monitoring/tests/test_pagination.py
+from datetime import datetime, timedelta, timezone
+import json
+from types import SimpleNamespace
+import pytest
+
+from src.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from src.crud.metrics import MetricsCRUD
+
+def test_cursor_round_trip():
+    ts = datetime(2026, 1, 1, 12, 30, tzinfo=timezone.utc)
+    cursor = encode_cursor(ts, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, datetime, int) == (ts, 42)
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor(1), encode_cursor("x", "y")])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, datetime, int)
+
+def test_alert_listing_follows_cursor(client, monkeypatch):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    alerts = [
+        SimpleNamespace(
+            id=i, resource_id="vm-1", alert_type="cpu_usage_critical", severity="critical",
+            message="cpu_usage > 90", timestamp=start + timedelta(minutes=i), resolved=None,
+        )
+        for i in range(5)
+    ]
+
+    async def list_alerts(db, limit, after=None, **filters):
+        rows = sorted(alerts, key=lambda a: (a.timestamp, a.id), reverse=True)
+        if after:
+            rows = [a for a in rows if (a.timestamp, a.id) < after]
+        return rows[:limit]
+
+    monkeypatch.setattr(MetricsCRUD, "list_alerts", list_alerts)
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/monitoring/alerts/", params=params).json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [4, 3, 2, 1, 0]
+    assert client.get("/api/v1/monitoring/alerts/", params={"cursor": "bogus"}).status_code == 400
+
+def test_user_listing_follows_cursor(client, monkeypatch):
+    from src.api.v1.endpoints import auth as auth_endpoints
+
+    users = [
+        SimpleNamespace(
+            id=i, email=f"user{i}@example.com", username=f"user{i}", full_name=None,
+            is_active=True, is_admin=False, created_at=datetime(2026, 1, 1), updated_at=None,
+        )
+        for i in range(1, 6)
+    ]
+
+    async def get_users(db, limit=100, after_id=None):
+        return [u for u in users if after_id is None or u.id > after_id][:limit]
+
+    monkeypatch.setattr(auth_endpoints, "get_users", get_users)
+    first = client.get("/api/v1/auth/users", params={"limit": 3}).json()
+    assert [u["id"] for u in first["items"]] == [1, 2, 3]
+    second = client.get("/api/v1/auth/users", params={"limit": 3, "cursor": first["next_cursor"]}).json()
+    assert [u["id"] for u in second["items"]] == [4, 5]
+    assert second["next_cursor"] is None
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_metrics_export_streams_chunks(client, monkeypatch, fmt):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    row = {
+        "id": 0, "resource_id": "vm-1", "resource_type": "vm", "cpu_usage": 1.5,
+        "memory_usage": 2.0, "disk_usage": 3.0, "network_in": 4.0, "network_out": 5.0,
+    }
+    chunks = [
+        [dict(row, id=1, timestamp=start), dict(row, id=2, timestamp=start + timedelta(seconds=1))],
+        [dict(row, id=3, timestamp=start + timedelta(seconds=2))],
+    ]
+
+    async def stream_metrics(db, resource_id, start_time, end_time, chunk_size=5000):
+        for chunk in chunks:
+            yield chunk
+
+    monkeypatch.setattr(MetricsCRUD, "stream_metrics", stream_metrics)
+    response = client.get("/api/v1/monitoring/metrics/vm-1/export", params={"format": fmt})
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    lines = response.text.splitlines()
+    if fmt == "csv":
+        assert lines[0].split(",")[0] == "id"
+        assert len(lines) == 4
+        assert lines[1].startswith("1,vm-1,vm,")
+        assert lines[1].endswith(start.isoformat())
+    else:
+        assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+        assert json.loads(lines[0])["timestamp"] == start.isoformat()
+
+@pytest.mark.asyncio
+async def test_bulk_resolve_against_a_real_session():
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from src.models.metrics import Alert
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Alert.__table__.create)
+    opened = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    by_hand = opened + timedelta(minutes=1)
+    try:
+        async with async_sessionmaker(engine)() as db:
+            db.add_all([
+                Alert(id=1, resource_id="vm-1", alert_type="cpu", severity="warning", message="m", timestamp=opened),
+                Alert(id=2, resource_id="vm-2", alert_type="cpu", severity="warning", message="m", timestamp=opened,
+                      resolved=by_hand),
+                Alert(id=3, resource_id="vm-3", alert_type="cpu", severity="warning", message="m", timestamp=opened),
+            ])
+            await db.commit()
+            # Loaded alerts are in the identity map, as they are in the engine's session
+            await db.execute(select(Alert))
+
+            at = opened + timedelta(minutes=5)
+            await MetricsCRUD.resolve_alerts_bulk(db, [{"id": 1, "resolved": at}, {"id": 2, "resolved": at}])
+
+            rows = (await db.execute(select(Alert.id, Alert.resolved).order_by(Alert.id))).all()
+        # Resolved by hand earlier keeps its time; sqlite drops the offset
+        assert [(alert_id, resolved and resolved.replace(tzinfo=timezone.utc)) for alert_id, resolved in rows] == [
+            (1, at), (2, by_hand), (3, None)
+        ]
+    finally:
+        await engine.dispose()
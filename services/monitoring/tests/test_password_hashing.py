@@ -0,0 +1,58 @@
+# services/monitoring/tests/test_password_hashing.py
+import asyncio
+import time
+import pytest
+from passlib.context import CryptContext
+
+from src.core.auth import PasswordHasher
+
+def bcrypt_context(rounds: int) -> CryptContext:
+    return CryptContext(
+        schemes=["bcrypt"],
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.001) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+@pytest.mark.asyncio
+async def test_hashing_does_not_block_event_loop():
+    context = bcrypt_context(10)
+    started = time.perf_counter()
+    context.hash("calibration")
+    single_hash = time.perf_counter() - started
+
+    hasher = PasswordHasher(context, max_workers=2)
+    stop = asyncio.Event()
+    probe = asyncio.create_task(measure_loop_lag(stop))
+
+    hashes = await asyncio.gather(*(hasher.hash(f"secret-{i}") for i in range(8)))
+    stop.set()
+
+    # Inline, the loop would stall for all eight hashes back to back
+    assert await probe < single_hash / 2
+    assert await hasher.verify_and_update("secret-3", hashes[3]) == (True, None)
+    stats = hasher.stats()
+    assert stats["completed"] == 9 and stats["pending"] == 0
+    assert stats["queue_wait_max"] > 0
+    hasher.shutdown()
+
+@pytest.mark.asyncio
+async def test_outdated_cost_is_rehashed_on_verify():
+    old = PasswordHasher(bcrypt_context(4), max_workers=1)
+    new = PasswordHasher(bcrypt_context(5), max_workers=1)
+    stored = await old.hash("secret")
+
+    assert await new.verify_and_update("wrong", stored) == (False, None)
+    valid, new_hash = await new.verify_and_update("secret", stored)
+    assert valid and new_hash.startswith("$2b$05$")
+    assert await new.verify_and_update("secret", new_hash) == (True, None)
+    old.shutdown()
+    new.shutdown()
@@ -0,0 +1,81 @@
+# services/monitoring/tests/test_profiling.py
+import logging
+from types import SimpleNamespace
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from src.config import settings
+from src.core.profiling import (
+    ProfilingMiddleware,
+    RequestTimings,
+    TimedRoute,
+    _current,
+    instrument_engine,
+    phase,
+)
+
+def make_app(**middleware_options):
+    app = FastAPI()
+    app.router.route_class = TimedRoute
+
+    async def dependency():
+        with phase("auth"):
+            return "user"
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int, user: str = Depends(dependency)):
+        return {"id": item_id, "user": user}
+
+    app.add_middleware(ProfilingMiddleware, **middleware_options)
+    return app
+
+def parse_server_timing(header):
+    entries = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        entries[name] = dict(param.split("=", 1) for param in params)
+    return entries
+
+def test_server_timing_header_reports_phases():
+    response = TestClient(make_app(sample_rate=0)).get("/items/3")
+    assert response.status_code == 200
+    assert response.json() == {"id": 3, "user": "user"}
+    timings = parse_server_timing(response.headers["server-timing"])
+    assert {"deps", "handler", "serialize", "auth", "total"} <= set(timings)
+    assert float(timings["total"]["dur"]) >= float(timings["handler"]["dur"])
+
+def test_unrouted_requests_still_get_a_total():
+    response = TestClient(make_app(sample_rate=0)).get("/missing")
+    assert response.status_code == 404
+    assert list(parse_server_timing(response.headers["server-timing"])) == ["total"]
+
+def test_sampled_requests_write_a_profile(tmp_path):
+    client = TestClient(make_app(sample_rate=1.0, profile_dir=str(tmp_path)))
+    assert client.get("/items/1").status_code == 200
+    profiles = list(tmp_path.iterdir())
+    assert len(profiles) == 1
+    assert "-GET-items_1-" in profiles[0].name
+
+def test_statements_are_timed_and_slow_ones_explained(monkeypatch, caplog):
+    engine = create_engine("sqlite://")
+    instrument_engine(SimpleNamespace(sync_engine=engine))
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 1e-9)
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        with caplog.at_level(logging.WARNING, logger="src.core.profiling"):
+            with engine.connect() as conn:
+                assert conn.execute(text("SELECT :x"), {"x": 7}).scalar() == 7
+                conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    finally:
+        _current.reset(token)
+
+    assert timings.queries == 2
+    assert timings.phases["db"] > 0
+    slow = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Slow query")]
+    assert len(slow) == 2
+    # Only reads are explained
+    assert "\n" in slow[0] and "plan unavailable" not in slow[0]
+    assert "\n" not in slow[1]
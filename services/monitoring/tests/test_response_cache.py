@@ -0,0 +1,142 @@
+# services/monitoring/tests/test_response_cache.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+
+from src.core.response_cache import ResponseCache, etag_matches
+from src.core.streaming import StreamHub, serialize_row
+from src.crud.metrics import MetricsCRUD
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+@pytest.fixture
+def latest_queries(monkeypatch):
+    calls = []
+
+    async def get_latest_timestamp(db, resource_id):
+        calls.append(resource_id)
+        return START
+
+    monkeypatch.setattr(MetricsCRUD, "get_latest_timestamp", get_latest_timestamp)
+    return calls
+
+def make_producer(calls, delay=0.0):
+    async def produce():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return b"[]", "application/json"
+    return produce
+
+def sample(resource_id, ts):
+    return serialize_row({"resource_id": resource_id, "timestamp": ts, "cpu_usage": 1.0})
+
+def test_etag_matching():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches(None, '"a"')
+    assert not etag_matches('"a"', '"b"')
+
+@pytest.mark.asyncio
+async def test_unchanged_open_window_revalidates_without_queries(redis, latest_queries):
+    hub = StreamHub(client=redis, fanout=False)
+    cache = ResponseCache(hub=hub)
+    hub.add_watcher(cache.observe)
+    produced = []
+    end = datetime.now(timezone.utc)
+
+    first = await cache.serve("k", "vm-1", end, make_producer(produced), db=None)
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+
+    again = await cache.serve("k", "vm-1", end, make_producer(produced), db=None, if_none_match=etag)
+    assert again.status_code == 304
+    assert produced == [1] and latest_queries == ["vm-1"]
+
+    # A newer sample, from any worker, changes the tag
+    hub.dispatch([sample("vm-1", START + timedelta(seconds=15))])
+    changed = await cache.serve("k", "vm-1", end, make_producer(produced), db=None, if_none_match=etag)
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert produced == [1, 1]
+
+    # Same tag again is served from memory
+    hit = await cache.serve("k", "vm-1", end, make_producer(produced), db=None)
+    assert hit.body == b"[]" and produced == [1, 1]
+    assert cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_query(redis, latest_queries):
+    cache = ResponseCache(hub=StreamHub(client=redis, fanout=False))
+    produced = []
+    end = datetime.now(timezone.utc)
+    responses = await asyncio.gather(*(
+        cache.serve("k", "vm-1", end, make_producer(produced, delay=0.05), db=None) for _ in range(10)
+    ))
+    assert all(response.status_code == 200 for response in responses)
+    assert produced == [1]
+    assert cache.stats()["coalesced"] == 9
+
+@pytest.mark.asyncio
+async def test_closed_window_is_briefly_privately_cacheable(redis, latest_queries):
+    hub = StreamHub(client=redis, fanout=True)
+    cache = ResponseCache(hub=hub, settle=300, closed_max_age=60)
+    hub.subscribed_since = 1.0
+    response = await cache.serve("k", "vm-1", START, make_producer([]), db=None)
+    assert response.headers["cache-control"] == "private, max-age=60"
+    assert "etag" in response.headers
+    assert latest_queries == []
+
+    # Without the subscription a backfill could go unseen
+    hub.subscribed_since = None
+    response = await cache.serve("k", "vm-1", START, make_producer([]), db=None)
+    assert "etag" not in response.headers
+
+@pytest.mark.asyncio
+async def test_backfilled_samples_change_the_tags_of_closed_and_open_windows(redis, latest_queries):
+    hub = StreamHub(client=redis, fanout=False)
+    cache = ResponseCache(hub=hub, settle=300)
+    hub.add_watcher(cache.observe)
+    produced = []
+    now = datetime.now(timezone.utc)
+    closed_end = now - timedelta(hours=2)
+
+    closed = await cache.serve("closed", "vm-1", closed_end, make_producer(produced), db=None)
+    open_ = await cache.serve("open", "vm-1", now, make_producer(produced), db=None)
+    other = await cache.serve("other", "vm-2", closed_end, make_producer(produced), db=None)
+    assert produced == [1, 1, 1]
+
+    # An agent replaying its spool: an hour-old sample lands in the closed window
+    hub.dispatch([sample("vm-1", now - timedelta(hours=3))])
+    again = await cache.serve("closed", "vm-1", closed_end, make_producer(produced), db=None,
+                              if_none_match=closed.headers["etag"])
+    assert again.status_code == 200 and again.headers["etag"] != closed.headers["etag"]
+    assert produced == [1, 1, 1, 1]
+    # Other resources keep their tags
+    unchanged = await cache.serve("other", "vm-2", closed_end, make_producer(produced), db=None,
+                                  if_none_match=other.headers["etag"])
+    assert unchanged.status_code == 304
+
+    # A late sample behind the watermark changes the open window's tag too
+    late = await cache.serve("open", "vm-1", now, make_producer(produced), db=None)
+    assert late.headers["etag"] != open_.headers["etag"]
+    hub.dispatch([sample("vm-1", START - timedelta(seconds=5))])
+    after = await cache.serve("open", "vm-1", now, make_producer(produced), db=None,
+                              if_none_match=late.headers["etag"])
+    assert after.status_code == 200
+    assert cache.stats()["backfills"] == 2
+
+@pytest.mark.asyncio
+async def test_open_window_bypasses_cache_without_fanout_subscription(redis, latest_queries):
+    hub = StreamHub(client=redis, fanout=True)
+    cache = ResponseCache(hub=hub)
+    produced = []
+    end = datetime.now(timezone.utc)
+    response = await cache.serve("k", "vm-1", end, make_producer(produced), db=None)
+    assert "etag" not in response.headers
+    assert cache.stats()["bypassed"] == 1
+
+    # Watermarks are dropped when the subscription (re)starts
+    hub.subscribed_since = 1.0
+    await cache.serve("k", "vm-1", end, make_producer(produced), db=None)
+    hub.subscribed_since = 2.0
+    await cache.serve("k", "vm-1", end, make_producer(produced), db=None)
+    assert latest_queries == ["vm-1", "vm-1"]
@@ -0,0 +1,122 @@
+# services/monitoring/tests/test_rollups.py
+from datetime import datetime, timezone
+
+import pytest
+
+from src.core.rollups import RollupWorker
+from src.crud.metrics import MetricsCRUD
+
+def make_row(ts, cpu, memory=None):
+    return {
+        "resource_id": "vm-1",
+        "resource_type": "vm",
+        "cpu_usage": cpu,
+        "memory_usage": memory,
+        "disk_usage": 10.0,
+        "network_in": 1.0,
+        "network_out": 2.0,
+        "timestamp": ts,
+    }
+
+def test_batches_fold_into_per_bucket_partials():
+    worker = RollupWorker()
+    worker.enabled = True
+    worker.add_rows([
+        make_row(datetime(2026, 1, 1, 10, 0, 5, tzinfo=timezone.utc), 10.0, 50.0),
+        make_row(datetime(2026, 1, 1, 10, 0, 35, tzinfo=timezone.utc), 30.0),
+    ])
+    worker.add_rows([make_row(datetime(2026, 1, 1, 10, 1, 5, tzinfo=timezone.utc), 90.0)])
+
+    rows = {
+        (granularity, bucket): partial.to_row(resource_id, bucket)
+        for (granularity, resource_id, bucket), partial in worker._pending.items()
+    }
+    minute = datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc).timestamp()
+    hour = datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc).timestamp()
+
+    first_minute = rows[("1m", minute)]
+    assert first_minute["sample_count"] == 2
+    assert first_minute["cpu_usage_avg"] == 20.0
+    assert first_minute["cpu_usage_max"] == 30.0
+    assert first_minute["memory_usage_avg"] == 50.0
+    # Averages carry the number of non-null samples they are over
+    assert (first_minute["cpu_usage_count"], first_minute["memory_usage_count"]) == (2, 1)
+
+    assert rows[("1h", hour)]["sample_count"] == 3
+    assert rows[("1h", hour)]["cpu_usage_min"] == 10.0
+    assert len([key for key in rows if key[0] == "1m"]) == 2
+
+def test_rollup_averages_are_weighted_by_their_own_sample_counts():
+    from sqlalchemy import create_engine, insert, select
+
+    from src.crud.metrics import _rollup_aggregate_expression
+    from src.models.metrics import ROLLUP_TABLES, rollup_metadata
+
+    table = ROLLUP_TABLES["1m"][1]
+    engine = create_engine("sqlite://")
+    rollup_metadata.create_all(engine, tables=[table])
+    worker = RollupWorker()
+    worker.enabled = True
+    # Memory is missing from two of the three samples in the first minute
+    worker.add_rows([
+        make_row(datetime(2026, 1, 1, 10, 0, 5, tzinfo=timezone.utc), 10.0, 90.0),
+        make_row(datetime(2026, 1, 1, 10, 0, 25, tzinfo=timezone.utc), 10.0),
+        make_row(datetime(2026, 1, 1, 10, 0, 45, tzinfo=timezone.utc), 10.0),
+        make_row(datetime(2026, 1, 1, 10, 1, 5, tzinfo=timezone.utc), 10.0, 30.0),
+    ])
+    rows = [
+        partial.to_row(resource_id, bucket)
+        for (granularity, resource_id, bucket), partial in worker._pending.items()
+        if granularity == "1m"
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(table), rows)
+        average = conn.execute(select(_rollup_aggregate_expression("avg", table, "memory_usage"))).scalar()
+        empty = conn.execute(select(_rollup_aggregate_expression("avg", table, "memory_usage")).where(
+            table.c.memory_usage_count == 0
+        )).scalar()
+
+    # One sample of 90 and one of 30, not 90 counted three times
+    assert average == 60.0
+    assert empty is None
+
+def test_disabled_worker_ignores_rows():
+    worker = RollupWorker()
+    worker.add_rows([make_row(datetime.now(timezone.utc), 10.0)])
+    assert worker._pending == {}
+
+@pytest.mark.asyncio
+async def test_failed_flush_merges_partials_back_and_commits_all_granularities_once(monkeypatch):
+    calls = []
+
+    class Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def commit(self):
+            calls.append("commit")
+
+    async def upsert_rollups(db, granularity, rows, commit=True):
+        if not calls:
+            calls.append("failed")
+            raise ConnectionError("database unavailable")
+        calls.append((granularity, commit, rows[0]["sample_count"], rows[0]["cpu_usage_max"]))
+
+    monkeypatch.setattr("src.core.rollups.AsyncSessionLocal", Session)
+    monkeypatch.setattr(MetricsCRUD, "upsert_rollups", upsert_rollups)
+    worker = RollupWorker()
+    worker.enabled = True
+    worker.add_rows([make_row(datetime(2026, 1, 1, 10, 0, 5, tzinfo=timezone.utc), 10.0)])
+
+    with pytest.raises(ConnectionError):
+        await worker.flush()
+    # Arrives while the failed flush was in flight
+    worker.add_rows([make_row(datetime(2026, 1, 1, 10, 0, 35, tzinfo=timezone.utc), 30.0)])
+    await worker.flush()
+
+    assert sorted(calls[1:-1]) == [("1d", False, 2, 30.0), ("1h", False, 2, 30.0), ("1m", False, 2, 30.0)]
+    assert calls[-1] == "commit"
+    assert worker._pending == {}
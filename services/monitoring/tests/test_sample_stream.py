@@ -0,0 +1,108 @@
+# services/monitoring/tests/test_sample_stream.py
+import gzip
+import json
+import pytest
+
+from src.core.sample_stream import (
+    SampleStreamError,
+    iter_decompressed,
+    iter_json_array,
+    iter_ndjson,
+    validate_samples,
+)
+
+def make_sample(i):
+    return {
+        "resource_id": f"vm-{i}",
+        "resource_type": "vm",
+        "cpu_usage": 10.0 + i,
+        "memory_usage": 20.0,
+        "disk_usage": 30.0,
+        "network_in": 1.0,
+        "network_out": 2.0,
+    }
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+async def collect(items):
+    return [item async for item in items]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+async def test_json_array_is_parsed_across_chunk_boundaries(chunk_size):
+    body = json.dumps([make_sample(i) for i in range(5)]).encode()
+    items = await collect(iter_json_array(chunked(body, chunk_size)))
+
+    assert [index for index, _, _ in items] == list(range(5))
+    assert items[3][1]["resource_id"] == "vm-3"
+
+@pytest.mark.asyncio
+async def test_empty_json_array():
+    assert await collect(iter_json_array(chunked(b" [ ] ", 2))) == []
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [b'{"resource_id": "x"}', b'[{"a": 1},', b'[{"a": 1}] x'])
+async def test_malformed_json_array_is_rejected(body):
+    with pytest.raises(SampleStreamError):
+        await collect(iter_json_array(chunked(body, 3)))
+
+@pytest.mark.asyncio
+async def test_ndjson_reports_bad_lines_without_failing():
+    lines = [json.dumps(make_sample(0)), "{not json", "", json.dumps(make_sample(2))]
+    body = "\n".join(lines).encode()
+    items = await collect(iter_ndjson(chunked(body, 5)))
+
+    assert [(index, error is None) for index, _, error in items] == [(0, True), (1, False), (2, True)]
+
+@pytest.mark.asyncio
+async def test_gzip_body_is_decompressed_incrementally():
+    lines = "".join(json.dumps(make_sample(i)) + "\n" for i in range(200)).encode()
+    items = await collect(iter_ndjson(iter_decompressed(chunked(gzip.compress(lines), 64), "gzip")))
+
+    assert len(items) == 200
+    assert items[199][1]["resource_id"] == "vm-199"
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [b"not gzip at all", gzip.compress(b"[]")[:-6]])
+async def test_corrupt_or_truncated_gzip_is_rejected(body):
+    with pytest.raises(SampleStreamError):
+        await collect(iter_decompressed(chunked(body, 4), "gzip"))
+
+def test_validate_samples_reports_item_positions():
+    bad = make_sample(1)
+    bad["cpu_usage"] = 150
+    rows, errors = validate_samples([(0, make_sample(0)), (1, bad), (2, make_sample(2))])
+
+    assert [row["resource_id"] for row in rows] == ["vm-0", "vm-2"]
+    assert all(row["timestamp"] is not None for row in rows)
+    assert errors[0]["index"] == 1
+    assert errors[0]["errors"][0]["loc"] == ["cpu_usage"]
+
+def test_batch_endpoint_commits_and_publishes_each_chunk(client, monkeypatch):
+    from src.config import settings
+    from src.core.ingestion import metrics_ingestor
+    from src.crud.metrics import MetricsCRUD
+
+    written, published = [], []
+
+    async def create_metrics_bulk(db, rows):
+        written.append(len(rows))
+        return list(range(len(rows)))
+
+    async def publish(rows):
+        published.append([row["resource_id"] for row in rows])
+
+    monkeypatch.setattr(settings, "INGEST_BATCH_SIZE", 2)
+    monkeypatch.setattr(MetricsCRUD, "create_metrics_bulk", create_metrics_bulk)
+    monkeypatch.setattr(metrics_ingestor, "publish", publish)
+    body = b"".join(json.dumps(make_sample(i)).encode() + b"\n" for i in range(5))
+
+    response = client.post(
+        "/api/v1/monitoring/metrics/batch", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.json() == {"accepted": 5, "rejected": 0, "errors": []}
+    assert written == [2, 2, 1]
+    assert published == [["vm-0", "vm-1"], ["vm-2", "vm-3"], ["vm-4"]]
@@ -0,0 +1,102 @@
+# services/monitoring/tests/test_series_format.py
+from datetime import datetime, timedelta, timezone
+import orjson
+import pytest
+
+from src.core.series_format import (
+    UnsupportedFormat, encode, merge_series, negotiate, rows_to_columns, tuples_to_columns
+)
+from src.crud.metrics import MetricsCRUD
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+ROWS = [(START + timedelta(seconds=i), float(i), None if i == 1 else 50.0) for i in range(3)]
+COLUMNS = ("cpu_usage", "memory_usage")
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, "json"),
+    ("*/*", "json"),
+    ("application/json", "json"),
+    ("application/vnd.cloudscale.columnar+json", "columnar"),
+    ("application/json;q=0.5, application/vnd.cloudscale.columnar+json", "columnar"),
+    ("text/html, */*;q=0.8", "json"),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+def test_negotiate_rejects_unknown_types():
+    with pytest.raises(UnsupportedFormat):
+        negotiate("text/csv")
+    with pytest.raises(UnsupportedFormat):
+        negotiate(None, "parquet")
+
+def test_tuples_and_rows_transpose_alike():
+    series = tuples_to_columns(ROWS, COLUMNS)
+    assert series["cpu_usage"] == [0.0, 1.0, 2.0]
+    assert series["memory_usage"] == [50.0, None, 50.0]
+    rows = [dict(zip(("timestamp", *COLUMNS), row)) for row in ROWS]
+    assert rows_to_columns(rows, COLUMNS) == series
+    assert tuples_to_columns([], COLUMNS) == {"timestamp": [], "cpu_usage": [], "memory_usage": []}
+
+def test_msgpack_round_trip():
+    msgpack = pytest.importorskip("msgpack")
+    decoded = msgpack.unpackb(encode(tuples_to_columns(ROWS, COLUMNS), "msgpack"), timestamp=3)
+    assert decoded["timestamp"][0] == START
+    assert decoded["memory_usage"] == [50.0, None, 50.0]
+
+def test_arrow_round_trip():
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    table = pyarrow.ipc.open_stream(encode(tuples_to_columns(ROWS, COLUMNS), "arrow")).read_all()
+    assert table.column_names == ["timestamp", *COLUMNS]
+    assert table.column("memory_usage").null_count == 1
+    assert table.column("timestamp")[0].as_py() == START
+
+def test_columnar_response(client, monkeypatch):
+    async def get_metrics_columns(db, resource_id, start_time, end_time, columns):
+        return ROWS
+
+    monkeypatch.setattr(MetricsCRUD, "get_metrics_columns", get_metrics_columns)
+    response = client.get(
+        "/api/v1/monitoring/metrics/vm-unknown",
+        params={"columns": list(COLUMNS)},
+        headers={"Accept": "application/vnd.cloudscale.columnar+json"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.cloudscale.columnar+json"
+    assert response.headers["vary"] == "Accept"
+    body = orjson.loads(response.content)
+    assert body["cpu_usage"] == [0.0, 1.0, 2.0]
+    assert body["timestamp"][0] == START.isoformat()
+
+    response = client.get("/api/v1/monitoring/metrics/vm-unknown", headers={"Accept": "text/csv"})
+    assert response.status_code == 406
+
+def test_history_negotiates_formats_for_downsampled_series(client, monkeypatch):
+    t = [START + timedelta(seconds=i) for i in range(3)]
+    # LTTB keeps different points per column
+    downsampled = {
+        "cpu_usage": {"timestamp": [t[0], t[2]], "values": [1.0, 3.0]},
+        "memory_usage": {"timestamp": [t[0], t[1]], "values": [50.0, 60.0]},
+    }
+    assert merge_series(downsampled) == {
+        "timestamp": t, "cpu_usage": [1.0, None, 3.0], "memory_usage": [50.0, 60.0, None]
+    }
+
+    async def get_metrics_downsampled(db, resource_id, start_time, end_time, max_points, columns, fill, horizon):
+        return downsampled
+
+    monkeypatch.setattr(MetricsCRUD, "get_metrics_downsampled", get_metrics_downsampled)
+    params = {"max_points": 10, "columns": list(COLUMNS), "start_time": START.isoformat(),
+              "end_time": (START + timedelta(minutes=1)).isoformat()}
+    response = client.get("/api/v1/monitoring/metrics/vm-history/history", params=params,
+                          headers={"Accept": "application/vnd.cloudscale.columnar+json"})
+    assert response.headers["content-type"] == "application/vnd.cloudscale.columnar+json"
+    assert orjson.loads(response.content)["cpu_usage"] == [1.0, None, 3.0]
+
+    # JSON keeps the per-column shape and the echoed query
+    body = client.get("/api/v1/monitoring/metrics/vm-history/history", params=params).json()
+    assert body["max_points"] == 10 and body["series"]["cpu_usage"]["values"] == [1.0, 3.0]
+
+    response = client.get("/api/v1/monitoring/metrics/vm-history/history", params=params,
+                          headers={"Accept": "text/csv"})
+    assert response.status_code == 406
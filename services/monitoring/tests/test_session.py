@@ -0,0 +1,71 @@
+# services/monitoring/tests/test_session.py
+import asyncio
+import time
+from datetime import timedelta
+import pytest
+
+from src.core.session import SessionManager
+
+@pytest.mark.asyncio
+async def test_get_with_refresh_slides_expiry_in_one_round_trip(redis):
+    manager = SessionManager(client=redis)
+    manager.local.max_size = 0
+    manager.session_ttl = timedelta(seconds=0.05)
+    session_id = await manager.create_session({"id": 1, "username": "admin"})
+
+    redis.commands.clear()
+    for _ in range(3):
+        time.sleep(0.03)
+        assert await manager.get_session(session_id, refresh=True) == {"id": 1, "username": "admin"}
+    # Without the refreshes the session would have expired by now
+    assert redis.commands == ["GETEX"] * 3
+
+@pytest.mark.asyncio
+async def test_delete_and_refresh_missing_session(redis):
+    manager = SessionManager(client=redis)
+    session_id = await manager.create_session({"id": 1})
+
+    assert await manager.refresh_session(session_id) is True
+    await manager.delete_session(session_id)
+    assert await manager.get_session(session_id) is None
+    assert await manager.get_session(session_id, refresh=True) is None
+    assert await manager.refresh_session(session_id) is False
+
+@pytest.mark.asyncio
+async def test_local_hits_coalesce_refreshes(redis):
+    manager = SessionManager(client=redis)
+    manager.refresh_interval = 0.05
+    session_id = await manager.create_session({"id": 1})
+
+    redis.commands.clear()
+    for _ in range(10):
+        assert await manager.get_session(session_id, refresh=True) == {"id": 1}
+    assert redis.commands == []
+
+    time.sleep(0.06)
+    for _ in range(10):
+        assert await manager.get_session(session_id, refresh=True) == {"id": 1}
+    assert redis.commands == ["EXPIRE"]
+
+    stats = manager.stats()
+    assert stats["hit_ratio"] == 1.0
+    assert stats["redis_ops_saved"] == 19
+
+@pytest.mark.asyncio
+async def test_delete_invalidates_other_workers(redis):
+    worker_a = SessionManager(client=redis)
+    worker_b = SessionManager(client=redis)
+    listener = asyncio.create_task(worker_b.start())
+    await asyncio.sleep(0)
+
+    session_id = await worker_a.create_session({"id": 1})
+    assert await worker_b.get_session(session_id) == {"id": 1}
+    assert await worker_b.get_session(session_id) == {"id": 1}
+    assert worker_b.hits == 1
+
+    await worker_a.delete_session(session_id)
+    await asyncio.sleep(0.01)
+    assert await worker_b.get_session(session_id) is None
+
+    await worker_b.stop()
+    await listener
@@ -0,0 +1,85 @@
+# services/monitoring/tests/test_stepwise.py
+from datetime import datetime, timedelta, timezone
+import pytest
+
+from src.config import settings
+from src.core.stepwise import hold_segments, locf_buckets, locf_points
+from src.crud.metrics import MetricsCRUD
+
+# 10 until t=150, then 70 until t=200, then silent (horizon 100 ends it at 300)
+POINTS = [(-30.0, 10.0), (150.0, 70.0), (200.0, 70.0)]
+
+def test_hold_segments_carry_values_forward_within_the_horizon():
+    assert hold_segments(POINTS, 0, 400, 100) == [(0, 70.0, 10.0), (150.0, 200.0, 70.0), (200.0, 300.0, 70.0)]
+
+@pytest.mark.parametrize("agg, expected", [
+    ("avg", {0: 10.0, 60: 10.0, 120: (30 * 10 + 30 * 70) / 60, 180: 70.0, 240: 70.0, 300: 70.0}),
+    ("min", {0: 10.0, 60: 10.0, 120: 10.0, 180: 70.0, 240: 70.0, 300: 70.0}),
+    ("last", {0: 10.0, 60: 10.0, 120: 70.0, 180: 70.0, 240: 70.0, 300: 70.0}),
+])
+def test_locf_buckets_are_time_weighted(agg, expected):
+    assert locf_buckets(POINTS, 0, 330, 60, agg, 200) == expected
+
+def test_locf_buckets_leave_gaps_past_the_horizon():
+    buckets = locf_buckets(POINTS, 0, 400, 60, "avg", 100)
+    assert buckets[60] == 10.0  # held until t=70
+    assert 300 not in buckets and 360 not in buckets
+
+def test_locf_points_span_the_window():
+    assert locf_points(POINTS, 0, 400, 100) == [
+        (0, 10.0), (70.0, 10.0), (150.0, 70.0), (200.0, 70.0), (300.0, 70.0)
+    ]
+
+@pytest.mark.parametrize("resource_id, adaptive, patterns, fill", [
+    ("host-locf", False, [], "locf"),
+    # locf is the default for resources stored with deadband suppression:
+    # an agent listed in METRICS_LOCF_RESOURCES, and its sub-resources
+    ("host-locf", False, ["host-*"], None),
+    ("host-locf:cpu0", False, ["host-*"], None),
+    # and the collector's own resource under adaptive collection
+    ("system", True, [], None),
+])
+def test_history_fill_locf_reconstructs_suppressed_buckets(client, monkeypatch, resource_id, adaptive, patterns, fill):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    monkeypatch.setattr(settings, "METRICS_ADAPTIVE_COLLECTION", adaptive)
+    monkeypatch.setattr(settings, "METRICS_LOCF_RESOURCES", patterns)
+
+    async def get_metrics_held(db, resource_id, start_time, end_time, horizon, columns):
+        # One sample from before the window, then a single change
+        return [(start - timedelta(seconds=30), 10.0), (start + timedelta(seconds=150), 70.0)]
+
+    monkeypatch.setattr(MetricsCRUD, "get_metrics_held", get_metrics_held)
+    response = client.get(f"/api/v1/monitoring/metrics/{resource_id}/history", params={
+        "bucket": "1m",
+        **({"fill": fill} if fill else {}),
+        "columns": ["cpu_usage"],
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(seconds=240)).isoformat(),
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["fill"] == "locf"
+    assert body["cpu_usage"] == [10.0, 10.0, 40.0, 70.0]
+    assert len(body["timestamp"]) == 4
+
+def test_history_of_fixed_interval_resources_reads_rollups_under_adaptive_collection(client, monkeypatch):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    monkeypatch.setattr(settings, "METRICS_ADAPTIVE_COLLECTION", True)
+    monkeypatch.setattr(settings, "METRICS_LOCF_RESOURCES", ["web-*"])
+    seen = {}
+
+    async def get_metrics_bucketed(db, resource_id, start_time, end_time, bucket, agg, columns, fill, horizon):
+        seen["fill"] = fill
+        return {"timestamp": [], "cpu_usage": []}
+
+    monkeypatch.setattr(MetricsCRUD, "get_metrics_bucketed", get_metrics_bucketed)
+    response = client.get("/api/v1/monitoring/metrics/vm-pushed/history", params={
+        "bucket": "1d",
+        "columns": ["cpu_usage"],
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(days=30)).isoformat(),
+    })
+
+    assert response.status_code == 200
+    assert response.json()["fill"] is None and seen["fill"] is None
@@ -0,0 +1,59 @@
+# services/monitoring/tests/test_streaming.py
+import asyncio
+from datetime import datetime, timezone
+import pytest
+
+from src.core.streaming import StreamHub, StreamSubscriber
+
+def make_row(resource_id, cpu, second=0):
+    return {
+        "id": second,
+        "resource_id": resource_id,
+        "resource_type": "vm",
+        "cpu_usage": cpu,
+        "timestamp": datetime(2026, 1, 1, 10, 0, second, tzinfo=timezone.utc),
+    }
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_coalesced_to_latest_per_resource():
+    subscriber = StreamSubscriber(["vm-1", "vm-2"], max_pending=4)
+    subscriber.offer([make_row("vm-1", 10.0 + i, i) for i in range(5)])
+    subscriber.offer([make_row("vm-2", 50.0, 6), make_row("vm-3", 99.0, 7)])
+
+    batch, dropped = await subscriber.next_batch(timeout=0.1)
+    assert [(row["resource_id"], row["cpu_usage"]) for row in batch] == [("vm-1", 14.0), ("vm-2", 50.0)]
+    assert dropped == 4
+    assert await subscriber.next_batch(timeout=0.01) == ([], 0)
+
+@pytest.mark.asyncio
+async def test_samples_fan_out_to_connections_on_every_worker(redis):
+    worker_a = StreamHub(client=redis, fanout=True)
+    worker_b = StreamHub(client=redis, fanout=True)
+    listeners = [asyncio.create_task(worker_a.start()), asyncio.create_task(worker_b.start())]
+    await asyncio.sleep(0.01)
+
+    on_a = worker_a.subscribe(["vm-1"])
+    on_b = worker_b.subscribe(["vm-1"])
+    await worker_a.publish([make_row("vm-1", 42.0), make_row("vm-2", 1.0)])
+
+    for subscriber in (on_a, on_b):
+        batch, _ = await subscriber.next_batch(timeout=1.0)
+        assert batch == [{
+            "id": 0, "resource_id": "vm-1", "resource_type": "vm",
+            "cpu_usage": 42.0, "timestamp": "2026-01-01T10:00:00+00:00",
+        }]
+    assert redis.commands.count("PUBLISH") == 1
+
+    for hub in (worker_a, worker_b):
+        await hub.stop()
+    await asyncio.gather(*listeners)
+
+@pytest.mark.asyncio
+async def test_hub_delivers_locally_without_redis(redis):
+    hub = StreamHub(client=redis, fanout=False)
+    subscriber = hub.subscribe(["vm-1"])
+    await hub.publish([make_row("vm-1", 42.0)])
+
+    batch, _ = await subscriber.next_batch(timeout=0.1)
+    assert batch[0]["cpu_usage"] == 42.0
+    assert redis.commands == []